@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+括号条件回溯的病态输入
+comparison() 遇到 "(" 时先按括号条件试探解析，失败或括号后跟关系运算符时回溯重新解析；
+没有记忆化时嵌套括号的每一层都会重复内层的工作。
+按嵌套深度逐步加倍，统计 ASTParser.parse() 的耗时和每加倍一次的增长倍数
+（线性时约为 2，指数增长时会迅速变大）
+
+用法:
+    python benchmarks/bench_backtracking.py [最大深度] [单次超时秒数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser
+
+
+def paren_relop(depth: int) -> str:
+    """((((a + b)))) > c：括号内是算术表达式，括号后才出现关系运算符"""
+    return "(" * depth + "a + b" + ")" * depth + " > c"
+
+
+def paren_condition(depth: int) -> str:
+    """((((a > b)))) ：括号内是条件"""
+    return "(" * depth + "a > b" + ")" * depth
+
+
+def chained(depth: int) -> str:
+    """(((a + 1 > 0) + 1 > 0) ...：每层都先按条件成功、再因关系运算符回溯"""
+    text = "a"
+    for _ in range(depth):
+        text = f"({text} + 1)"
+    return f"{text} > 0"
+
+
+def logical(depth: int) -> str:
+    """(a > b and (a > b and (... c < d)))：嵌套的逻辑条件"""
+    return "(a > b and " * depth + "c < d" + ")" * depth
+
+
+SHAPES = {
+    'paren_relop': paren_relop,
+    'paren_condition': paren_condition,
+    'chained': chained,
+    'logical': logical,
+}
+
+
+def parse_time(condition: str) -> float:
+    source = f"program p; var a, b, c, d, x: integer; begin if {condition} then x := 1 end."
+    tokens = Lexer(source).tokenize()
+    start = time.perf_counter()
+    parser = ASTParser(tokens, source)
+    parser.parse()
+    elapsed = time.perf_counter() - start
+    assert not parser.errors, parser.errors[0]
+    return elapsed
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    # 递归下降解析器每层括号约占 6 个 Python 栈帧
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), max_depth * 12 + 1000))
+
+    print(f"{'形态':<18}{'深度':>6}{'耗时(ms)':>12}{'增长':>8}")
+    for name, make in SHAPES.items():
+        previous = None
+        depth = 2
+        while depth <= max_depth:
+            elapsed = parse_time(make(depth))
+            growth = f"{elapsed / previous:.1f}x" if previous else ""
+            print(f"{name:<18}{depth:>6}{elapsed * 1000:>12.3f}{growth:>8}")
+            if elapsed > timeout:
+                print(f"{name:<18}超过 {timeout:g}s，停止加深")
+                break
+            previous = elapsed
+            depth *= 2
+
+
+if __name__ == "__main__":
+    main()
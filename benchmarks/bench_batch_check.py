@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+批量语法检查的并行加速
+生成一批 Mini 源文件，比较 check_files() 在不同进程数下的耗时和 files/s，
+以及按输入顺序 / 按完成顺序输出时得到第一个结果的时间；最后对比磁盘缓存命中时的耗时
+
+用法:
+    python benchmarks/bench_batch_check.py [文件数] [单个文件大小KB] [最大进程数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser_ast import disk_cache
+from src.batch_check import check_files
+from benchmarks.bench_lexer import generate_source
+
+
+def run(paths, workers: int, ordered: bool = True, use_cache: bool = False):
+    """返回 (得到第一个结果的秒数, 总秒数)；默认不使用磁盘缓存，测量实际检查的耗时"""
+    start = time.perf_counter()
+    first = None
+    for result in check_files(paths, workers=workers, ordered=ordered, use_cache=use_cache):
+        assert result.ok, result.errors[:1]
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index in range(count):
+            paths.append(os.path.join(tmp, f"{index}.mini"))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                f.write(generate_source(size_kb * 1024, seed=index))
+        print(f"{count} 个文件 x {size_kb} KB，CPU 核数 {os.cpu_count()}")
+
+        print(f"{'进程数':<8}{'顺序':<10}{'首个(ms)':>10}{'总计(s)':>10}{'files/s':>10}{'加速':>8}")
+        serial = None
+        workers = 1
+        while workers <= max_workers:
+            for ordered in ((True, False) if workers > 1 else (True,)):
+                first, total = run(paths, workers, ordered)
+                serial = serial or total
+                print(f"{workers:<8}{'输入' if ordered else '完成':<10}{first * 1000:>10.1f}"
+                      f"{total:>10.3f}{count / total:>10.0f}{serial / total:>7.2f}x")
+            workers *= 2
+
+        disk_cache.directory = os.path.join(tmp, 'cache')
+        run(paths, 1, use_cache=True)
+        first, total = run(paths, 1, use_cache=True)
+        print(f"磁盘缓存命中（1 个进程）: {total:.3f}s，{count / total:.0f} files/s，"
+              f"{serial / total:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+批量词法分析的并行加速
+生成一批 Mini 源文件，比较逐个 Lexer(..., engine='regex').tokenize() 与 lex_files() 在不同进程数下的耗时，
+并对比工作进程传回 pickle 的 Token 列表与二进制 Token 缓冲区的数据量
+
+用法:
+    python benchmarks/bench_batch_lexer.py [文件数] [单个文件大小KB] [最大进程数]
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.batch_lexer import lex_files
+from benchmarks.bench_lexer import generate_source
+
+
+def lex_serial(paths):
+    """逐个读取并分析（与 lex_files 使用相同的引擎），返回 Token 总数"""
+    total = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            total += len(Lexer(f.read(), engine='regex').tokenize())
+    return total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index in range(count):
+            paths.append(os.path.join(tmp, f"{index}.mini"))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                f.write(generate_source(size_kb * 1024, seed=index))
+
+        with open(paths[0], encoding='utf-8') as f:
+            tokens = Lexer(f.read()).tokenize()
+        pickled = len(pickle.dumps(tokens, pickle.HIGHEST_PROTOCOL))
+        with open(paths[0], encoding='utf-8') as f:
+            packed = len(Lexer(f.read()).tokenize_buffer().to_bytes())
+        print(f"{count} 个文件 x {size_kb} KB；单个文件传回数据: "
+              f"pickle(List[Token]) {pickled / 1024:.0f} KB, TokenBuffer {packed / 1024:.0f} KB")
+
+        start = time.perf_counter()
+        token_count = lex_serial(paths)
+        serial = time.perf_counter() - start
+        print(f"{'方式':<14}{'耗时(s)':>10}{'Token/s':>14}{'加速':>8}")
+        print(f"{'逐个分析':<14}{serial:>10.3f}{token_count / serial:>14,.0f}{1:>8.2f}x")
+
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            results = lex_files(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert sum(len(result.tokens) for result in results) == token_count
+            label = f"lex_files({workers})"
+            print(f"{label:<14}{elapsed:>10.3f}{token_count / elapsed:>14,.0f}"
+                  f"{serial / elapsed:>8.2f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
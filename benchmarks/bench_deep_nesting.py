@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+深层嵌套的语法分析
+比较递归下降的 ASTParser 与显式栈的 IterativeASTParser：
+普通程序的解析耗时，以及嵌套 begin / if / 括号逐渐加深时两者能否完成解析
+
+用法:
+    python benchmarks/bench_deep_nesting.py [源码大小KB] [最大嵌套深度]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser
+from src.parser_iterative import IterativeASTParser
+from benchmarks.bench_lexer import generate_source
+
+
+def nested(kind: str, depth: int) -> str:
+    """生成嵌套 depth 层的程序"""
+    if kind == 'begin':
+        body = "begin " * depth + "x := 1" + " end" * depth
+    elif kind == 'if':
+        body = "if x > 0 then " * depth + "x := 1"
+    else:
+        body = "x := " + "(" * depth + "1" + ")" * depth
+    return f"program deep; var x: integer; begin {body} end."
+
+
+def parse(parser_class, source: str):
+    """返回 (耗时秒, 结果)；结果为 'ok'、首个错误信息或异常名"""
+    tokens = Lexer(source).tokenize()
+    start = time.perf_counter()
+    try:
+        parser = parser_class(tokens, source)
+        ast = parser.parse()
+        outcome = 'ok' if ast is not None else parser.errors[0].split('\n')[0]
+    except RecursionError:
+        outcome = 'RecursionError'
+    return time.perf_counter() - start, outcome
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    source = generate_source(size_kb * 1024)
+    print(f"普通程序: {len(source)} 字符，取 3 次最佳")
+    for parser_class in (ASTParser, IterativeASTParser):
+        best = min(parse(parser_class, source)[0] for _ in range(3))
+        print(f"  {parser_class.__name__:<20}{best * 1000:>10.1f} ms")
+
+    print(f"\n{'嵌套':<8}{'深度':>8}  {'ASTParser':<24}{'IterativeASTParser'}")
+    depths = [depth for depth in (100, 1000, 10000) if depth < max_depth] + [max_depth]
+    for depth in depths:
+        for kind in ('begin', 'if', 'paren'):
+            source = nested(kind, depth)
+            _, recursive = parse(ASTParser, source)
+            elapsed, iterative = parse(IterativeASTParser, source)
+            print(f"{kind:<8}{depth:>8}  {recursive:<24}{iterative} ({elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+磁盘缓存的冷、热路径耗时
+模拟每次都是新进程（清空进程内的 parse_cache）：比较 parse_to_ast 完整分析（不使用缓存）
+与命中 disk_cache（读一个文件并反序列化）的耗时，缓存写在临时目录中
+
+用法:
+    python benchmarks/bench_disk_cache.py [重复次数] [源码大小KB ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser_ast import parse_to_ast, parse_cache, disk_cache
+from benchmarks.bench_lexer import generate_source
+from tests.test_parser_modes import corpus
+
+
+def best_time(run, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        parse_cache.clear()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(arg) for arg in sys.argv[2:]] or [1, 10, 100, 900]
+
+    workloads = [(f"{size_kb} KB", [generate_source(size_kb * 1024)]) for size_kb in sizes]
+    workloads.append((f"语料 {len(corpus())} 个", corpus()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        disk_cache.directory = directory
+        print(f"{'输入':<14}{'完整分析(ms)':>14}{'磁盘命中(ms)':>14}{'加速':>8}")
+        for name, sources in workloads:
+            cold = best_time(lambda: [parse_to_ast(source, use_cache=False) for source in sources],
+                             repeat)
+            for source in sources:
+                parse_to_ast(source, use_disk_cache=True)   # 写入磁盘缓存
+            warm = best_time(lambda: [parse_to_ast(source, use_disk_cache=True) for source in sources],
+                             repeat)
+            print(f"{name:<14}{cold * 1000:>14.2f}{warm * 1000:>14.2f}{cold / warm:>7.1f}x")
+        info = disk_cache.info()
+        print(f"\n缓存文件 {info['size']} 个，共 {info['bytes'] / 1048576:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
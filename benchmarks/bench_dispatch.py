@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+按 Token 种类分派的语法规则
+比较现在按分派表（STATEMENT_RULES / FACTOR_RULES）选择规则的 statement()/factor()，
+与原来逐个比较 Token 种类的 if/elif 链（ChainRules，同步集每次出错时新建 set）的纯语法分析耗时：
+测试语料（含错误程序）、一个大的生成程序和表达式密集的程序，Token 预先生成；
+ASTParser 和 SyntaxRecognizer 各比较一次
+
+用法:
+    python benchmarks/bench_dispatch.py [大程序KB] [重复次数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer, TokenType
+from src.parser_ast import ASTParser
+from src.parser_recognizer import SyntaxRecognizer
+from benchmarks.bench_lexer import generate_source
+from benchmarks.bench_expressions import expression_source
+from tests.test_parser_modes import corpus
+
+
+class ChainRules:
+    """原来的 statement()/factor()：按顺序逐个比较 Token 种类"""
+
+    def statement(self):
+        if self.check(TokenType.IDENTIFIER):
+            return self.assignment_stmt()
+        elif self.check(TokenType.IF):
+            return self.if_stmt()
+        elif self.check(TokenType.WHILE):
+            return self.while_stmt()
+        elif self.check(TokenType.BEGIN):
+            return self.block()
+        elif self.check(TokenType.WRITE):
+            return self.write_stmt()
+        elif self.check(TokenType.READ):
+            return self.read_stmt()
+        elif self.check(TokenType.END, TokenType.SEMICOLON):
+            return self.EmptyStatement()
+        else:
+            if not self.check(TokenType.END, TokenType.EOF):
+                self.error(f"无效的语句开始: '{self.current_token.value}'")
+                self.synchronize({TokenType.SEMICOLON, TokenType.END, TokenType.ELSE})
+            return self.EmptyStatement()
+
+    def factor(self):
+        if self.check(TokenType.IDENTIFIER):
+            name, line, column = self.current_lexeme()
+            self.advance()
+            return self.Variable(name=name, symbol_id=self.names.intern(name), line=line, column=column)
+        if self.check(TokenType.INTEGER) or self.check(TokenType.REAL):
+            value, line, column = self.current_lexeme()
+            self.advance()
+            return self.Number(value=float(value), line=line, column=column)
+        if self.check(TokenType.STRING):
+            value, line, column = self.current_lexeme()
+            self.advance()
+            return self.String(value=value, line=line, column=column)
+        if self.check(TokenType.TRUE) or self.check(TokenType.FALSE):
+            value = self.current_type is TokenType.TRUE
+            _, line, column = self.current_lexeme()
+            self.advance()
+            return self.Boolean(value=value, line=line, column=column)
+        if self.current_type is TokenType.LPAREN:
+            return self.parenthesized_factor()
+        if self.check(TokenType.MINUS):
+            return self.negated_factor()
+        self.error(f"表达式错误: 期望标识符、数字或表达式，但得到 '{self.current_token.value}'")
+        return None
+
+
+class ChainASTParser(ChainRules, ASTParser):
+    pass
+
+
+class ChainRecognizer(ChainRules, SyntaxRecognizer):
+    pass
+
+
+def best_time(parser_classes, inputs, repeat: int):
+    """各语法分析器解析全部输入的最佳耗时（秒），交替运行以减少负载波动的影响"""
+    best = [None] * len(parser_classes)
+    for _ in range(repeat):
+        for index, parser_class in enumerate(parser_classes):
+            start = time.perf_counter()
+            for tokens, source in inputs:
+                parser_class(tokens, source).parse()
+            elapsed = time.perf_counter() - start
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+    program = generate_source(size_kb * 1024)
+    expressions = expression_source(size_kb * 1024 // 2)
+    workloads = [
+        (f"语料 {len(corpus())} 个", [(Lexer(source).tokenize(), source) for source in corpus()]),
+        (f"生成程序 {size_kb} KB", [(Lexer(program).tokenize(), program)]),
+        (f"表达式 {size_kb // 2} KB", [(Lexer(expressions).tokenize(), expressions)]),
+    ]
+
+    # 两种实现的结果必须相同
+    for tokens, source in workloads[0][1]:
+        for chain, table in ((ChainASTParser, ASTParser), (ChainRecognizer, SyntaxRecognizer)):
+            expected, actual = chain(tokens, source), table(tokens, source)
+            assert (expected.parse() is None) == (actual.parse() is None)
+            assert expected.errors == actual.errors
+
+    print(f"重复 {repeat} 次取最佳（Token 预先生成，只计语法分析）")
+    print(f"{'输入':<18}{'语法分析器':<18}{'if/elif 链(ms)':>15}{'分派表(ms)':>12}{'加速':>8}")
+    for name, inputs in workloads:
+        for label, chain, table in (("ASTParser", ChainASTParser, ASTParser),
+                                    ("SyntaxRecognizer", ChainRecognizer, SyntaxRecognizer)):
+            before, after = best_time((chain, table), inputs, repeat)
+            print(f"{name:<18}{label:<18}{before * 1000:>15.2f}{after * 1000:>12.2f}"
+                  f"{before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
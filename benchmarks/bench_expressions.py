@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+表达式密集代码的语法分析速度
+生成以长算术表达式和多层 and/or/not 条件为主的程序，Token 序列预先生成，
+只统计 ASTParser.parse() 的耗时（Tokens/s 和每个操作数的平均耗时）
+
+用法:
+    python benchmarks/bench_expressions.py [源码大小KB] [重复次数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer, TokenType
+from src.parser_ast import ASTParser
+from benchmarks.bench_lexer import generate_source
+
+NAMES = ['x', 'y', 'total', 'counter', 'value_1', 'tmp']
+ARITHMETIC = ['+', '-', '*', '/']
+RELATIONAL = ['<', '<=', '>', '>=', '=', '<>']
+
+
+def arithmetic(rng, operands: int) -> str:
+    """含 operands 个操作数的算术表达式，随机加括号和负号"""
+    parts = []
+    for index in range(operands):
+        operand = rng.choice(NAMES) if rng.random() < 0.6 else str(rng.randint(0, 999))
+        if rng.random() < 0.1:
+            operand = '-' + operand
+        parts.append(operand)
+        if index < operands - 1:
+            parts.append(rng.choice(ARITHMETIC))
+    text = ' '.join(parts)
+    return f"({text})" if rng.random() < 0.3 else text
+
+
+def condition(rng, comparisons: int) -> str:
+    """由 comparisons 个比较经 and/or/not 连接的条件"""
+    parts = []
+    for index in range(comparisons):
+        compare = f"{arithmetic(rng, rng.randint(1, 4))} {rng.choice(RELATIONAL)} {arithmetic(rng, rng.randint(1, 4))}"
+        if rng.random() < 0.2:
+            compare = f"not {compare}"
+        parts.append(compare)
+        if index < comparisons - 1:
+            parts.append(rng.choice(['and', 'or']))
+    return ' '.join(parts)
+
+
+def expression_source(size: int, seed: int = 0) -> str:
+    """生成约 size 个字符、以表达式为主的程序"""
+    rng = random.Random(seed)
+    parts = [f"program exprs;\nvar {', '.join(NAMES)}: integer;\nbegin\n"]
+    length = len(parts[0])
+    while length < size:
+        target = rng.choice(NAMES)
+        kind = rng.randint(0, 2)
+        if kind == 0:
+            stmt = f"    {target} := {arithmetic(rng, rng.randint(4, 16))};\n"
+        elif kind == 1:
+            stmt = (f"    if {condition(rng, rng.randint(1, 4))} then "
+                    f"{target} := {arithmetic(rng, 3)} else {target} := {arithmetic(rng, 2)};\n")
+        else:
+            stmt = f"    while {condition(rng, rng.randint(1, 3))} do {target} := {arithmetic(rng, 3)};\n"
+        parts.append(stmt)
+        length += len(stmt)
+    parts.append("    x := 0\nend.\n")
+    return ''.join(parts)
+
+
+OPERANDS = (TokenType.IDENTIFIER, TokenType.INTEGER, TokenType.REAL, TokenType.STRING,
+            TokenType.TRUE, TokenType.FALSE)
+
+
+def bench(tokens, source: str, repeat: int) -> float:
+    """返回 parse() 的最佳耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser = ASTParser(tokens, source)
+        ast = parser.parse()
+        elapsed = time.perf_counter() - start
+        assert ast is not None, parser.get_result()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{'语料':<12}{'Tokens':>10}{'操作数':>10}{'耗时(ms)':>12}{'Tokens/s':>14}{'µs/操作数':>12}")
+    for name, make in (('expressions', expression_source), ('mixed', generate_source)):
+        source = make(size_kb * 1024)
+        tokens = Lexer(source).tokenize()
+        operands = sum(1 for token in tokens if token.type in OPERANDS)
+        elapsed = bench(tokens, source, repeat)
+        print(f"{name:<12}{len(tokens):>10}{operands:>10}{elapsed * 1000:>12.1f}"
+              f"{len(tokens) / elapsed:>14,.0f}{elapsed / operands * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+推送式词法分析的首个诊断延迟
+模拟按固定大小分块、以固定速率到达的输入，比较先收齐再 Lexer(...).tokenize()
+与边接收边 Lexer.feed() 得到第一个词法错误的时间，以及两者的总耗时
+
+用法:
+    python benchmarks/bench_feed.py [源码大小KB] [块大小KB] [到达速率MB/s]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer, TokenType
+from benchmarks.bench_lexer import generate_source
+
+
+def arrivals(source: str, chunk: int, rate: float):
+    """按到达速率（字符/秒）依次产生 (到达时刻, 块)"""
+    for start in range(0, len(source), chunk):
+        yield (start + chunk) / rate, source[start:start + chunk]
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 900
+    chunk_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    rate_mb = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    # 在前 10% 处放一个非法字符，作为第一个诊断
+    source = generate_source(size_kb * 1024)
+    split = source.index('\n', len(source) // 10) + 1
+    source = source[:split] + "    x := 1 @ 2;\n" + source[split:]
+    chunk, rate = chunk_kb * 1024, rate_mb * 1024 * 1024
+    receive = len(source) / rate
+    print(f"源代码 {len(source)} 字符，{chunk_kb} KB 一块，到达速率 {rate_mb} MB/s（接收共 {receive:.3f}s）")
+
+    # 先收齐再分析：诊断时刻 = 接收完毕 + 整篇分析到错误处
+    start = time.perf_counter()
+    first = None
+    for token in Lexer(source, engine='regex').iter_tokens():
+        if first is None and token.type == TokenType.ERROR:
+            first = time.perf_counter() - start
+    whole_total = receive + time.perf_counter() - start
+    whole_first = receive + first
+
+    # 边接收边分析：每块在到达时刻（或上一块分析完时）送入 feed()
+    lexer = Lexer("")
+    clock = 0.0
+    push_first = None
+    for arrived, text in arrivals(source, chunk, rate):
+        clock = max(clock, arrived)
+        start = time.perf_counter()
+        tokens = lexer.feed(text)
+        clock += time.perf_counter() - start
+        if push_first is None and any(t.type == TokenType.ERROR for t in tokens):
+            push_first = clock
+    start = time.perf_counter()
+    lexer.close()
+    push_total = clock + time.perf_counter() - start
+
+    print(f"{'方式':<12}{'首个诊断(s)':>14}{'总耗时(s)':>12}")
+    print(f"{'收齐后分析':<12}{whole_first:>14.3f}{whole_total:>12.3f}")
+    print(f"{'feed()':<12}{push_first:>14.3f}{push_total:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
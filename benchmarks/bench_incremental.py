@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+增量语法分析与整篇重新分析的对比
+在不同大小的源文件中随机修改一条赋值语句右部的数字，比较
+reparse()（含 Lexer.apply_edit()）与 Lexer(source).tokenize() + ASTParser.parse() 的耗时
+
+用法:
+    python benchmarks/bench_incremental.py [编辑次数] [源码大小KB ...]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser
+from src.parser_incremental import IncrementalParser, reparse
+from benchmarks.bench_lexer import generate_source
+
+
+def main():
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sizes = [int(arg) for arg in sys.argv[2:]] or [10, 100, 900]
+
+    rng = random.Random(0)
+    print(f"{'大小(KB)':<10}{'Tokens':>10}{'整篇(ms/次)':>14}{'增量(ms/次)':>14}{'加速':>8}")
+    for size_kb in sizes:
+        source = generate_source(size_kb * 1024)
+        lexer = Lexer(source)
+        parser = IncrementalParser(lexer.tokenize(), source)
+        ast = parser.parse()
+        assert ast is not None, parser.get_result()
+        spans = parser.spans
+
+        incremental = 0.0
+        for _ in range(edits):
+            numbers = [match.span() for match in re.finditer(r"(?<=:= )\d+", lexer.source)]
+            begin, end = rng.choice(numbers)
+            start = time.perf_counter()
+            ast, errors = reparse(lexer, ast, spans, begin, end - begin, str(rng.randrange(1000)))
+            incremental += time.perf_counter() - start
+            assert ast is not None and not errors, errors[:1]
+        incremental /= edits
+
+        repeat = 3
+        full = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ASTParser(Lexer(lexer.source).tokenize(), lexer.source).parse()
+            elapsed = time.perf_counter() - start
+            full = elapsed if full is None else min(full, elapsed)
+        print(f"{size_kb:<10}{len(lexer.tokens):>10,}{full * 1000:>14.2f}"
+              f"{incremental * 1000:>14.3f}{full / incremental:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+逐条产出顶层语句的流式解析
+对不同长度的程序（Token 均由 Lexer.iter_tokens() 流式产生），比较
+ASTParser.parse() 与 ASTParser.iter_statements()（每条语句取出后即丢弃）
+得到第一条语句的时间、总耗时和解析期间的峰值内存
+
+用法:
+    python benchmarks/bench_iter_statements.py [源码大小KB ...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser
+from benchmarks.bench_lexer import generate_source
+
+
+def run_parse(source: str):
+    """返回 (得到第一条语句的秒数, 总秒数)"""
+    start = time.perf_counter()
+    ast = ASTParser(Lexer(source).iter_tokens(), source).parse()
+    elapsed = time.perf_counter() - start
+    assert ast is not None
+    return elapsed, elapsed
+
+
+def run_iter(source: str):
+    """返回 (得到第一条语句的秒数, 总秒数)"""
+    start = time.perf_counter()
+    parser = ASTParser(Lexer(source).iter_tokens(), source)
+    first = None
+    for _ in parser.iter_statements():
+        if first is None:
+            first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    assert not parser.errors
+    return first, elapsed
+
+
+def peak_memory(run, source: str) -> int:
+    """run(source) 期间新分配内存的峰值（字节）"""
+    tracemalloc.start()
+    run(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 900]
+
+    print(f"{'大小(KB)':<10}{'方式':<17}{'首条(ms)':>10}{'总计(ms)':>10}{'峰值内存(MB)':>14}")
+    for size_kb in sizes:
+        source = generate_source(size_kb * 1024)
+        runs = (("parse()", run_parse), ("iter_statements()", run_iter))
+        best = {}
+        for _ in range(3):
+            # 交替运行以减少负载波动的影响
+            for name, run in runs:
+                result = run(source)
+                best[name] = min(best.get(name, result), result)
+        for name, run in runs:
+            first, total = best[name]
+            peak = peak_memory(run, source)
+            print(f"{size_kb:<10}{name:<17}{first * 1000:>10.2f}{total * 1000:>10.1f}"
+                  f"{peak / 1048576:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+词法分析引擎吞吐量对比
+生成数 MB 的 Mini 源程序，分别用各个 Lexer 引擎进行词法分析并统计速度
+
+用法:
+    python benchmarks/bench_lexer.py [总大小MB] [重复次数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+
+
+def generate_source(size: int, seed: int = 0) -> str:
+    """生成约 size 个字符的 Mini 程序（混合赋值、条件、循环、注释和字符串）"""
+    rng = random.Random(seed)
+    names = ['x', 'y', 'total', 'counter', 'value_1', 'tmp']
+    parts = ["program bench;\nvar x, y, total, counter, value_1, tmp: integer;\nbegin\n"]
+    length = len(parts[0])
+    while length < size:
+        a, b, c = rng.choice(names), rng.choice(names), rng.choice(names)
+        n = rng.randint(0, 99999)
+        kind = rng.randint(0, 5)
+        if kind == 0:
+            stmt = f"    {a} := ({b} + {n}) * {c} - {n} / 7;\n"
+        elif kind == 1:
+            stmt = f"    if {a} <= {b} then {c} := {c} + 1 else {c} := {c} - 1;\n"
+        elif kind == 2:
+            stmt = f"    while {a} <> {n} do begin {a} := {a} + 1 end;\n"
+        elif kind == 3:
+            stmt = f"    {{ 块注释 {n} }} write('value of {a}: {n}');\n"
+        elif kind == 4:
+            stmt = f"    // 单行注释 {n}\n    {a} := {n}.{n % 100};\n"
+        else:
+            stmt = f"    if ({a} > {b}) and not ({c} = {n}) then read({a});\n"
+        parts.append(stmt)
+        length += len(stmt)
+    parts.append("    x := 0\nend.\n")
+    return ''.join(parts)
+
+
+def bench_engine(engine: str, sources, repeat: int):
+    """返回 (最佳耗时秒, Token 数)"""
+    best = None
+    token_count = 0
+    for _ in range(repeat):
+        token_count = 0
+        start = time.perf_counter()
+        for source in sources:
+            token_count += len(Lexer(source, engine=engine).tokenize())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, token_count
+
+
+def main():
+    total_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # 单个源文件受 Lexer.MAX_SOURCE_LENGTH 限制，按多个文件生成
+    chunk = int(Lexer.MAX_SOURCE_LENGTH * 0.9)
+    total_chars = int(total_mb * 1024 * 1024)
+    sources = []
+    seed = 0
+    while sum(len(s) for s in sources) < total_chars:
+        sources.append(generate_source(min(chunk, total_chars - sum(len(s) for s in sources)), seed))
+        seed += 1
+    size_mb = sum(len(s.encode('utf-8')) for s in sources) / (1024 * 1024)
+
+    print(f"语料: {len(sources)} 个文件, {size_mb:.2f} MB, 重复 {repeat} 次取最佳")
+    print(f"{'引擎':<8}{'耗时(s)':>10}{'Tokens':>12}{'Tokens/s':>14}{'MB/s':>10}")
+    baseline = None
+    for engine in Lexer.ENGINES:
+        elapsed, count = bench_engine(engine, sources, repeat)
+        baseline = baseline or elapsed
+        print(f"{engine:<8}{elapsed:>10.3f}{count:>12}{count / elapsed:>14.0f}"
+              f"{size_mb / elapsed:>10.2f}   x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
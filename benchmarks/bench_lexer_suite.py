@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+词法分析器基准测试套件
+按几种典型形态生成压力语料，统计各 Lexer 引擎的 Tokens/s 和 MB/s，
+结果可保存为 JSON，并与之前保存的结果比较以发现性能回退
+
+语料:
+    mixed        赋值、条件、循环、注释和字符串混合的普通程序
+    short_tokens 大量无空白分隔的短 Token
+    long_strings 长度接近 MAX_STRING_LENGTH 的字符串字面量
+    comments     以块注释和单行注释为主
+    long_idents  长度接近 MAX_IDENTIFIER_LENGTH 的标识符
+    long_numbers 位数接近 MAX_NUMBER_LENGTH 的数字
+
+用法:
+    python benchmarks/bench_lexer_suite.py [--size KB] [--repeat N] [--corpus 名称 ...]
+                                           [--json 结果.json] [--compare 基准.json] [--tolerance 0.1]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from benchmarks.bench_lexer import generate_source
+
+
+def fill(size: int, make_piece, seed: int) -> str:
+    """重复调用 make_piece(rng) 拼接出约 size 个字符的程序"""
+    rng = random.Random(seed)
+    parts = ["program stress;\nbegin\n"]
+    length = len(parts[0])
+    while length < size:
+        piece = make_piece(rng)
+        parts.append(piece)
+        length += len(piece)
+    parts.append("x := 0\nend.\n")
+    return ''.join(parts)
+
+
+def identifier(rng, length: int) -> str:
+    first = rng.choice(string.ascii_letters + '_')
+    rest = ''.join(rng.choices(string.ascii_letters + string.digits + '_', k=length - 1))
+    return first + rest
+
+
+def short_tokens(size: int, seed: int = 0) -> str:
+    operators = ['+', '-', '*', '/', '<', '>', '=', '<=', '>=', '<>']
+
+    def piece(rng):
+        a, b, c = rng.choice('abcxyz'), rng.choice('abcxyz'), rng.choice('abcxyz')
+        return f"{a}:={b}{rng.choice(operators)}({c}{rng.choice(operators)}{rng.randint(0, 9)});"
+    return fill(size, piece, seed)
+
+
+def long_strings(size: int, seed: int = 0) -> str:
+    limit = Lexer.MAX_STRING_LENGTH
+
+    def piece(rng):
+        body = ''.join(rng.choices(string.ascii_letters + ' ,.中文', k=rng.randint(limit // 2, limit)))
+        return f"write('{body}');\n"
+    return fill(size, piece, seed)
+
+
+def comments(size: int, seed: int = 0) -> str:
+    def piece(rng):
+        text = ''.join(rng.choices(string.ascii_letters + ' 注释', k=rng.randint(20, 400)))
+        if rng.random() < 0.5:
+            return f"{{ {text}\n  {text} }}\n"
+        return f"// {text}\nx := x + 1;\n"
+    return fill(size, piece, seed)
+
+
+def long_idents(size: int, seed: int = 0) -> str:
+    limit = Lexer.MAX_IDENTIFIER_LENGTH
+
+    def piece(rng):
+        a = identifier(rng, rng.randint(limit - 16, limit))
+        b = identifier(rng, rng.randint(limit - 16, limit))
+        return f"{a} := {b} + 1;\n"
+    return fill(size, piece, seed)
+
+
+def long_numbers(size: int, seed: int = 0) -> str:
+    limit = Lexer.MAX_NUMBER_LENGTH
+
+    def piece(rng):
+        digits = ''.join(rng.choices(string.digits, k=rng.randint(limit - 8, limit - 2)))
+        point = rng.randint(1, len(digits) - 1)
+        return f"x := {digits[:point]}.{digits[point:]} + {digits};\n"
+    return fill(size, piece, seed)
+
+
+CORPORA = {
+    'mixed': generate_source,
+    'short_tokens': short_tokens,
+    'long_strings': long_strings,
+    'comments': comments,
+    'long_idents': long_idents,
+    'long_numbers': long_numbers,
+}
+
+
+def bench(source: str, engine: str, repeat: int):
+    """返回 (最佳耗时秒, Token 数)"""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(Lexer(source, engine=engine).tokenize())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def run_suite(names, size: int, repeat: int):
+    """运行所选语料，返回结果记录列表"""
+    results = []
+    for name in names:
+        source = CORPORA[name](size)
+        mb = len(source.encode('utf-8')) / (1024 * 1024)
+        for engine in Lexer.ENGINES:
+            elapsed, count = bench(source, engine, repeat)
+            results.append({
+                'corpus': name, 'engine': engine, 'chars': len(source),
+                'mb': round(mb, 4), 'tokens': count, 'seconds': elapsed,
+                'tokens_per_sec': count / elapsed, 'mb_per_sec': mb / elapsed,
+            })
+    return results
+
+
+def compare(results, baseline_path: str, tolerance: float, size: int):
+    """与之前保存的结果比较 Tokens/s，返回回退超过 tolerance 的 (语料, 引擎, 比值) 列表"""
+    with open(baseline_path, encoding='utf-8') as f:
+        report = json.load(f)
+    baseline = {(r['corpus'], r['engine']): r for r in report['results']}
+    regressions = []
+    print(f"\n与 {baseline_path} 比较（Tokens/s 比值，低于 {1 - tolerance:.2f} 视为回退）")
+    if report.get('size') != size:
+        print(f"注意: 基准结果的语料大小为 {report.get('size')} 字符，本次为 {size} 字符")
+    for result in results:
+        old = baseline.get((result['corpus'], result['engine']))
+        if old is None:
+            continue
+        ratio = result['tokens_per_sec'] / old['tokens_per_sec']
+        flag = "  <-- 回退" if ratio < 1 - tolerance else ""
+        print(f"{result['corpus']:<14}{result['engine']:<8}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append((result['corpus'], result['engine'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="词法分析器基准测试套件")
+    parser.add_argument('--size', type=int, default=256, help="每个语料的大小（KB），默认 256")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数（取最佳），默认 3")
+    parser.add_argument('--corpus', nargs='+', choices=sorted(CORPORA), default=list(CORPORA),
+                        help="只运行指定的语料")
+    parser.add_argument('--json', help="把结果保存为 JSON 文件")
+    parser.add_argument('--compare', help="与之前保存的 JSON 结果比较")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="允许的 Tokens/s 下降比例，默认 0.1")
+    args = parser.parse_args()
+    size = min(args.size * 1024, Lexer.MAX_SOURCE_LENGTH - 1024)
+
+    print(f"每个语料约 {size // 1024} KB，重复 {args.repeat} 次取最佳")
+    print(f"{'语料':<14}{'引擎':<8}{'MB':>8}{'Tokens':>10}{'耗时(s)':>10}{'Tokens/s':>14}{'MB/s':>8}")
+    results = run_suite(args.corpus, size, args.repeat)
+    for r in results:
+        print(f"{r['corpus']:<14}{r['engine']:<8}{r['mb']:>8.2f}{r['tokens']:>10}{r['seconds']:>10.3f}"
+              f"{r['tokens_per_sec']:>14,.0f}{r['mb_per_sec']:>8.2f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'size': size,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.json}")
+
+    if args.compare and compare(results, args.compare, args.tolerance, size):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
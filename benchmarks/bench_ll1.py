@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+表驱动 LL(1) 分析器与递归下降分析器的吞吐量
+1. 由文法生成 FIRST/FOLLOW 集和分析表的耗时（每个进程只需一次）
+2. 表达式密集和混合两种语料（Token 预先生成）上 ASTParser、IterativeASTParser
+   和 LL1Parser 的 parse() 耗时与 Tokens/s
+3. 深层嵌套的程序能否完成解析
+
+用法:
+    python benchmarks/bench_ll1.py [源码大小KB] [重复次数] [嵌套深度]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.ll1_grammar import Grammar, MINI_GRAMMAR
+from src.parser_ast import ASTParser
+from src.parser_iterative import IterativeASTParser
+from src.parser_ll1 import LL1Parser, load_tables
+from benchmarks.bench_deep_nesting import nested, parse
+from benchmarks.bench_expressions import expression_source
+from benchmarks.bench_lexer import generate_source
+
+PARSERS = (ASTParser, IterativeASTParser, LL1Parser)
+
+
+def best_times(tokens, source: str, repeat: int):
+    """各分析器 parse() 的最佳耗时（秒），交替运行以减少负载波动的影响"""
+    best = [None] * len(PARSERS)
+    for _ in range(repeat):
+        for index, parser_class in enumerate(PARSERS):
+            start = time.perf_counter()
+            parser = parser_class(tokens, source)
+            ast = parser.parse()
+            elapsed = time.perf_counter() - start
+            assert ast is not None, parser.get_result()
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+
+    start = time.perf_counter()
+    grammar = Grammar.parse(MINI_GRAMMAR)
+    load_tables(LL1Parser, grammar)
+    elapsed = time.perf_counter() - start
+    entries = sum(len(row) for row in grammar.table.values())
+    print(f"生成分析表: {len(grammar.nonterminals)} 个非终结符，{len(grammar.productions)} 条产生式，"
+          f"{entries} 个表项，{elapsed * 1000:.1f} ms\n")
+
+    print(f"{'语料':<12}{'分析器':<22}{'耗时(ms)':>10}{'Tokens/s':>14}{'相对':>8}")
+    for name, make in (('expressions', expression_source), ('mixed', generate_source)):
+        source = make(size_kb * 1024)
+        tokens = Lexer(source).tokenize()
+        times = best_times(tokens, source, repeat)
+        for parser_class, elapsed in zip(PARSERS, times):
+            print(f"{name:<12}{parser_class.__name__:<22}{elapsed * 1000:>10.1f}"
+                  f"{len(tokens) / elapsed:>14,.0f}{times[0] / elapsed:>7.2f}x")
+
+    print(f"\n嵌套深度 {depth}")
+    for kind in ('begin', 'if', 'paren'):
+        source = nested(kind, depth)
+        outcomes = []
+        for parser_class in PARSERS:
+            elapsed, outcome = parse(parser_class, source)
+            outcomes.append(f"{outcome} ({elapsed * 1000:.1f} ms)" if outcome == 'ok' else outcome)
+        print(f"  {kind:<6}" + "  ".join(f"{cls.__name__}: {text}"
+                                          for cls, text in zip(PARSERS, outcomes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+只做语法检查的开销
+1. 大量互不相同的小程序：原来经 parse_to_ast 构建 AST 和符号表再判断的 parse_from_source，
+   与现在用 SyntaxRecognizer 的 parse_from_source 的每次调用耗时
+2. 一个大程序（Token 预先生成）：ASTParser.parse() 与 SyntaxRecognizer.parse() 的耗时和内存峰值
+
+用法:
+    python benchmarks/bench_recognizer.py [小程序个数] [大程序KB] [重复次数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser, parse_to_ast, parse_from_source
+from src.parser_recognizer import SyntaxRecognizer
+from benchmarks.bench_expressions import expression_source
+from benchmarks.bench_reuse import PROGRAMS
+
+
+def via_ast(source: str) -> str:
+    """原来的 parse_from_source：构建 AST 和符号表后判断"""
+    ast, errors, _ = parse_to_ast(source, enable_semantic_check=False, use_cache=False)
+    if errors:
+        return "\n".join(errors)
+    return "该程序符合语法要求。" if ast else "解析失败"
+
+
+def best_per_call(funcs, sources, repeat: int):
+    """各函数最佳的每次调用耗时（微秒），交替运行以减少负载波动的影响"""
+    best = [None] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.perf_counter()
+            for source in sources:
+                func(source)
+            elapsed = (time.perf_counter() - start) / len(sources) * 1e6
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best
+
+
+def parse_cost(parser_class, tokens, source: str, repeat: int):
+    """返回 (最佳耗时秒, 内存峰值字节)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_class(tokens, source).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    parser_class(tokens, source).parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 7
+
+    sources = [PROGRAMS[n % len(PROGRAMS)].replace("{n}", str(n)) for n in range(calls)]
+    assert all(via_ast(s) == parse_from_source(s) for s in sources[:len(PROGRAMS)])
+    old, new = best_per_call([via_ast, parse_from_source], sources, repeat)
+    print(f"{calls} 个小程序，每次调用（µs）")
+    print(f"  {'构建 AST 后判断':<20}{old:>10.1f}")
+    print(f"  {'SyntaxRecognizer':<20}{new:>10.1f}{old / new:>8.2f}x")
+
+    source = expression_source(size_kb * 1024)
+    tokens = Lexer(source).tokenize()
+    print(f"\n大程序: {len(source)} 字符，{len(tokens)} 个 Token，只计语法分析")
+    base = None
+    for parser_class in (ASTParser, SyntaxRecognizer):
+        elapsed, peak = parse_cost(parser_class, tokens, source, repeat)
+        speedup = f"{base / elapsed:>8.2f}x" if base else ""
+        base = base or elapsed
+        print(f"  {parser_class.__name__:<20}{elapsed * 1000:>10.1f} ms{peak / 1024 / 1024:>10.1f} MB{speedup}")
+
+
+if __name__ == "__main__":
+    main()
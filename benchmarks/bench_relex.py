@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+增量词法分析与整篇重新分析的对比
+在大文件的随机位置模拟逐字符输入，比较 Lexer.apply_edit() 与 Lexer(source).tokenize() 的耗时
+
+用法:
+    python benchmarks/bench_relex.py [源码大小KB] [编辑次数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from benchmarks.bench_lexer import generate_source
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 900
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    source = generate_source(size_kb * 1024)
+    rng = random.Random(0)
+    print(f"源代码: {len(source)} 字符, {edits} 次单字符编辑")
+    print(f"{'引擎':<8}{'整篇(ms/次)':>14}{'增量(ms/次)':>14}{'加速':>8}")
+    for engine in Lexer.ENGINES:
+        lexer = Lexer(source, engine=engine)
+        lexer.tokenize()
+        incremental = 0.0
+        for _ in range(edits):
+            offset = rng.randrange(len(lexer.source))
+            if rng.random() < 0.5:
+                edit = (offset, 0, rng.choice("xyz1 ;+("))
+            else:
+                edit = (offset, 1, "")
+            start = time.perf_counter()
+            lexer.apply_edit(*edit)
+            incremental += time.perf_counter() - start
+
+        start = time.perf_counter()
+        repeat = 3
+        for _ in range(repeat):
+            Lexer(lexer.source, engine=engine).tokenize()
+        full = (time.perf_counter() - start) / repeat
+        incremental /= edits
+        print(f"{engine:<8}{full * 1000:>14.2f}{incremental * 1000:>14.3f}"
+              f"{full / incremental:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+小程序的单次调用开销
+反复分析 5 行的小程序，比较每次新建 Lexer/ASTParser/SemanticAnalyzer
+与 reset() 复用同一个 Analyzer 的每次调用耗时
+
+用法:
+    python benchmarks/bench_reuse.py [调用次数] [重复次数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import Analyzer
+
+PROGRAMS = [
+    "program p{n};\nvar x, y: integer;\nbegin\n  x := {n}; y := x * 2\nend.",
+    "program q{n};\nvar s: string; b: boolean;\nbegin\n  s := 'v{n}'; b := true\nend.",
+    "program r{n};\nvar i: integer;\nbegin\n  i := 0; while i < {n} do i := i + 1\nend.",
+    "program t{n};\nvar a, b: real;\nbegin\n  a := {n}.5; if a > 1.0 then b := a / 2 else write(a)\nend.",
+]
+
+
+def fresh(source: str, engine: str):
+    """每次新建全部对象（reset() 之前 analyze_source 的做法）"""
+    return Analyzer(engine).analyze(source)
+
+
+def best_per_call(funcs, sources, repeat: int):
+    """各函数最佳的每次调用耗时（微秒）；各函数交替运行，减少机器负载波动的影响"""
+    best = [None] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.perf_counter()
+            for source in sources:
+                func(source)
+            elapsed = (time.perf_counter() - start) / len(sources) * 1e6
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    sources = [PROGRAMS[n % len(PROGRAMS)].replace("{n}", str(n)) for n in range(calls)]
+
+    print(f"{calls} 个 5 行程序，重复 {repeat} 次取最佳（微秒/次）")
+    print(f"{'引擎':<8}{'每次新建':>10}{'reset 复用':>12}{'节省':>8}")
+    for engine in Lexer.ENGINES:
+        analyzer = Analyzer(engine)
+        new, reused = best_per_call([lambda source: fresh(source, engine), analyzer.analyze],
+                                    sources, repeat)
+        print(f"{engine:<8}{new:>10.1f}{reused:>12.1f}{(new - reused) / new:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
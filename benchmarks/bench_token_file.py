@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Token 文件格式对比
+同一 Token 流分别保存为旧版文本格式和二进制格式，比较文件大小、保存和加载耗时
+
+用法:
+    python benchmarks/bench_token_file.py [源码大小KB] [重复次数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from src.parser_ast import ASTParser, read_text_token_file
+from src.token_buffer import TokenBuffer
+from benchmarks.bench_lexer import generate_source
+
+
+def save_text(tokens, path):
+    """旧版 save_tokens_to_file 的文本格式"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for token in tokens:
+            f.write(f"{token.type.name}\t{token.value}\t{token.line}\t{token.column}\n")
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 900
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    source = generate_source(size_kb * 1024)
+    lexer = Lexer(source, engine='regex')
+    tokens = lexer.tokenize()
+    print(f"Token 数: {len(tokens)}，重复 {repeat} 次取最佳")
+    print(f"{'格式':<8}{'大小(MB)':>10}{'保存(s)':>10}{'加载(s)':>10}{'加载+解析(s)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "tokens.txt")
+        binary_path = os.path.join(tmp, "tokens.bin")
+        formats = (
+            ("text", text_path, lambda: save_text(tokens, text_path),
+             lambda: read_text_token_file(text_path)),
+            ("binary", binary_path, lambda: lexer.save_tokens_to_file(binary_path),
+             lambda: TokenBuffer.load(binary_path)),
+        )
+        for name, path, save, load in formats:
+            save_time = best_time(save, repeat)
+            load_time = best_time(load, repeat)
+            total_time = best_time(lambda: ASTParser(load()).parse(), repeat)
+            size = os.path.getsize(path) / 1048576
+            print(f"{name:<8}{size:>10.2f}{save_time:>10.3f}{load_time:>10.3f}{total_time:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
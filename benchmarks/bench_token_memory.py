@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Token 存储的内存占用对比
+对约 N 个 Token 的输入分别构建 Token 列表和列式 TokenBuffer，统计每个 Token 的平均字节数
+
+用法:
+    python benchmarks/bench_token_memory.py [Token 数]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer
+from benchmarks.bench_lexer import generate_source
+
+
+def measure(build):
+    """返回 (build() 的结果, 结果保留的字节数)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, retained
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # 生成语料约每 4.5 个字符一个 Token；超过 MAX_SOURCE_LENGTH 时通过 from_path 分块分析
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".mini", delete=False) as f:
+        f.write(generate_source(int(target * 4.6)))
+    try:
+        tokens, list_bytes = measure(lambda: Lexer.from_path(f.name).tokenize())
+        count = len(tokens)
+        del tokens
+        buffer, buffer_bytes = measure(lambda: Lexer.from_path(f.name).tokenize_buffer())
+        assert len(buffer) == count
+    finally:
+        os.unlink(f.name)
+
+    print(f"Token 数: {count}（不同的值 {len(buffer.strings)} 个）")
+    print(f"{'存储方式':<14}{'总计(MB)':>10}{'字节/Token':>12}")
+    for name, size in (("List[Token]", list_bytes), ("TokenBuffer", buffer_bytes)):
+        print(f"{name:<14}{size / 1048576:>10.1f}{size / count:>12.1f}")
+    print(f"TokenBuffer 各列: {buffer.nbytes() / count:.1f} 字节/Token，"
+          f"节省 x{list_bytes / buffer_bytes:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,47 +20,58 @@ def print_banner():
 def print_usage():
     """打印使用说明"""
     print("\n使用方法:")
-    print("  1. 从源文件分析:")
-    print("     python main.py <source_file>")
+    print("  1. 从源文件分析（-v 同时显示源代码和前 20 个 Token）:")
+    print("     python main.py [-v] <source_file>")
     print("  2. 从 Token 文件分析:")
     print("     python main.py -t <token_file>")
     print("  3. 交互式输入:")
     print("     python main.py -i")
     print("  4. 运行测试:")
     print("     python main.py --test")
+    print("  5. 批量并行检查（目录或通配符，逐行输出 JSON）:")
+    print("     python main.py --batch [--workers N] [--unordered] [--semantic] <路径>...")
+    print("  以上各项都可加 --no-cache：不读写磁盘上的分析结果缓存")
     print("\n示例:")
     print("  python main.py example.txt")
-    print("  python main.py -t tokens.txt")
+    print("  python main.py -t tokens.bin")
     print("  python main.py -i")
+    print("  python main.py --batch data 'tests/**/*.mini'")
 
 
-def analyze_source_file(filepath: str):
-    """分析源代码文件"""
+def analyze_source_file(filepath: str, use_cache: bool = True, verbose: bool = False):
+    """
+    分析源代码文件
+    
+    结果经磁盘缓存（use_cache 为假时不读写），命中时不再做词法和语法分析；
+    verbose 为真时先显示源代码和前 20 个 Token（需要额外做一次词法分析）
+    """
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             source_code = f.read()
         
         print(f"\n正在分析文件: {filepath}")
         print("-" * 70)
-        print("源代码:")
-        print(source_code)
-        print("-" * 70)
-        
-        # 词法分析
-        print("\n【词法分析】")
-        lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
         
-        print(f"Token 总数: {len(tokens)}")
-        print("Token 流:")
-        for i, token in enumerate(tokens[:20]):  # 只显示前20个
-            print(f"  {i+1}. {token}")
-        if len(tokens) > 20:
-            print(f"  ... (还有 {len(tokens) - 20} 个 tokens)")
+        if verbose:
+            print("源代码:")
+            print(source_code)
+            print("-" * 70)
+            
+            # 词法分析
+            print("\n【词法分析】")
+            lexer = Lexer(source_code)
+            tokens = lexer.tokenize()
+            
+            print(f"Token 总数: {len(tokens)}")
+            print("Token 流:")
+            for i, token in enumerate(tokens[:20]):  # 只显示前20个
+                print(f"  {i+1}. {token}")
+            if len(tokens) > 20:
+                print(f"  ... (还有 {len(tokens) - 20} 个 tokens)")
         
         # 语法分析
         print("\n【语法分析】")
-        result = parse_from_source(source_code)
+        result = parse_from_source(source_code, use_disk_cache=use_cache)
         print(result)
         
         return result
@@ -135,6 +146,46 @@ def run_tests():
         print("错误: 无法导入测试模块 tests/test_cases.py")
 
 
+def run_batch(arguments, use_cache: bool = True):
+    """
+    批量并行检查：每个文件输出一行 JSON，最后一行是汇总；有文件未通过时退出码为 1
+    
+    use_cache 为假时主进程和工作进程都不读写磁盘缓存（--no-cache）
+    """
+    import argparse
+    import json
+    import time
+    from src.batch_check import check_files, expand_paths
+    
+    parser = argparse.ArgumentParser(prog="main.py --batch",
+                                     description="并行检查多个 Mini 源文件，输出 JSON Lines")
+    parser.add_argument("paths", nargs="+", help="源文件、目录或通配符（** 匹配多层目录）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认为 CPU 核数）")
+    parser.add_argument("--chunksize", type=int, default=8, help="每个工作进程一次领取的文件数")
+    parser.add_argument("--unordered", action="store_true", help="按完成顺序而不是输入顺序输出")
+    parser.add_argument("--semantic", action="store_true", help="同时做语义检查")
+    options = parser.parse_args(arguments)
+    
+    start = time.perf_counter()
+    paths = expand_paths(options.paths)
+    counts = {"ok": 0, "error": 0, "failed": 0}
+    try:
+        results = check_files(paths, workers=options.workers, chunksize=options.chunksize,
+                              semantic=options.semantic, ordered=not options.unordered,
+                              use_cache=use_cache)
+        for result in results:
+            counts[result.status] += 1
+            print(result.to_json(), flush=True)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"summary": True, "files": len(paths), **counts,
+                      "seconds": round(elapsed, 3),
+                      "files_per_second": round(len(paths) / elapsed, 1) if elapsed else None},
+                     ensure_ascii=False))
+    return counts["ok"] == len(paths)
+
+
 def run_demo():
     """运行示例程序"""
     print("\n运行示例程序...")
@@ -194,6 +245,19 @@ end.
 
 def main():
     """主函数"""
+    use_cache = '--no-cache' not in sys.argv
+    if not use_cache:
+        sys.argv.remove('--no-cache')
+    verbose = False
+    for flag in ('-v', '--verbose'):
+        if flag in sys.argv:
+            sys.argv.remove(flag)
+            verbose = True
+    
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        # 批量模式只输出 JSON Lines
+        sys.exit(0 if run_batch(sys.argv[2:], use_cache) else 1)
+    
     print_banner()
     
     if len(sys.argv) == 1:
@@ -221,7 +285,7 @@ def main():
             elif choice == '4':
                 filepath = input("请输入文件路径: ").strip()
                 if filepath:
-                    analyze_source_file(filepath)
+                    analyze_source_file(filepath, use_cache, verbose)
             elif choice == '0':
                 print("\n感谢使用！")
                 break
@@ -254,7 +318,7 @@ def main():
     
     else:
         # 分析源文件
-        analyze_source_file(sys.argv[1])
+        analyze_source_file(sys.argv[1], use_cache, verbose)
 
 
 if __name__ == "__main__":
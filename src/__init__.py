@@ -3,11 +3,19 @@ Mini 语言语法分析器 - 核心模块
 包含词法分析器、语法分析器、AST、符号表和解释器
 """
 
-from .lexer import Lexer, Token, TokenType
+from .lexer import Lexer, Token, TokenType, NameTable
+from .token_buffer import TokenBuffer
+from .batch_lexer import lex_files, LexResult
 from .parser_ast import (
     ASTParser, parse_to_ast, parse_and_print_ast,
-    parse_from_source, parse_from_file
+    parse_from_source, parse_from_file, parse_cache, disk_cache, Analyzer
 )
+from .parser_iterative import IterativeASTParser
+from .parser_recognizer import SyntaxRecognizer
+from .parser_ll1 import LL1Parser
+from .parser_incremental import IncrementalParser, reparse
+from .result_cache import LRUCache, DiskCache
+from .batch_check import check_files, expand_paths, CheckResult
 from .ast_nodes import (
     ASTNode, Program, Block, Statement, Expression,
     Assignment, IfStatement, WhileStatement, EmptyStatement,
@@ -26,10 +34,13 @@ __description__ = "Mini Language Parser - Enhanced with AST generation, symbol t
 
 __all__ = [
     # Lexer
-    'Lexer', 'Token', 'TokenType',
+    'Lexer', 'Token', 'TokenType', 'TokenBuffer', 'NameTable', 'lex_files', 'LexResult',
     # Parser
     'ASTParser', 'parse_from_source', 'parse_from_file',
-    'parse_to_ast', 'parse_and_print_ast',
+    'parse_to_ast', 'parse_and_print_ast', 'parse_cache', 'LRUCache', 'Analyzer',
+    'disk_cache', 'DiskCache', 'check_files', 'expand_paths', 'CheckResult',
+    'IterativeASTParser', 'SyntaxRecognizer', 'LL1Parser',
+    'IncrementalParser', 'reparse',
     # AST Nodes
     'ASTNode', 'Program', 'Block', 'Statement', 'Expression',
     'Assignment', 'IfStatement', 'WhileStatement', 'EmptyStatement',
@@ -50,6 +50,7 @@ class VarDecl(ASTNode):
     """单个变量声明"""
     name: str = ""
     var_type: str = "integer"  # 'integer', 'real', 'boolean'
+    symbol_id: int = -1        # 名字表中的 ID（-1 表示未分配）
 
 
 @dataclass
@@ -75,6 +76,7 @@ class Assignment(Statement):
     """赋值语句: identifier := expression"""
     variable: str = ""
     expression: 'Expression' = None
+    symbol_id: int = -1        # variable 在名字表中的 ID（-1 表示未分配）
 
 
 @dataclass
@@ -108,6 +110,7 @@ class WriteStatement(Statement):
 class ReadStatement(Statement):
     """输入语句: read(identifier)"""
     variable: str = ""
+    symbol_id: int = -1        # variable 在名字表中的 ID（-1 表示未分配）
 
 
 # ==================== 表达式 ====================
@@ -155,6 +158,7 @@ class Boolean(Expression):
 class Variable(Expression):
     """变量引用"""
     name: str = ""
+    symbol_id: int = -1        # 名字表中的 ID（-1 表示未分配）
 
 
 # ==================== AST 访问器基类 ====================
@@ -0,0 +1,156 @@
+"""
+批量语法检查
+用进程池并行检查多个源文件（目录或通配符），逐个产出每个文件的状态和诊断信息，
+供 main.py --batch 以 JSON Lines 输出
+"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+from .parser_ast import parse_to_ast, recognize_source, disk_cache
+
+
+# 每个工作进程一次领取的文件数
+DEFAULT_CHUNKSIZE = 8
+
+
+@dataclass
+class CheckResult:
+    """单个文件的检查结果"""
+    path: str
+    status: str                              # ok、error（有诊断信息）或 failed（无法读取或分析）
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0                     # 读取和检查的耗时
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def to_json(self) -> str:
+        """一行 JSON（JSON Lines 格式）"""
+        return json.dumps({'path': self.path, 'status': self.status, 'errors': self.errors,
+                           'seconds': round(self.seconds, 6)}, ensure_ascii=False)
+
+
+def check_file(path: str, semantic: bool = False, use_cache: bool = False) -> CheckResult:
+    """
+    检查一个文件（在工作进程中执行）
+
+    semantic 为假时只做词法和语法检查（与 parse_from_source 相同），
+    为真时再做语义检查（与 parse_to_ast 相同）；use_cache 为真时结果经过 disk_cache。
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return CheckResult(path, 'failed', [f"读取文件失败: {e}"], time.perf_counter() - start)
+    try:
+        if semantic:
+            ast, errors, _ = parse_to_ast(source, use_disk_cache=use_cache)
+            if ast is None and not errors:
+                errors = ["解析失败"]
+        else:
+            recognized, errors = recognize_source(source, use_disk_cache=use_cache)
+            if not recognized and not errors:
+                errors = ["解析失败"]
+    except ValueError as e:
+        # 如源代码超过 Lexer.MAX_SOURCE_LENGTH
+        return CheckResult(path, 'failed', [f"无法分析: {e}"], time.perf_counter() - start)
+    return CheckResult(path, 'error' if errors else 'ok', list(errors),
+                       time.perf_counter() - start)
+
+
+def check_chunk(paths: List[str], semantic: bool, use_cache: bool) -> List[CheckResult]:
+    """检查一组文件（工作进程的一次任务）"""
+    return [check_file(path, semantic, use_cache) for path in paths]
+
+
+def configure_worker(directory: Optional[str], max_bytes: int):
+    """
+    工作进程的初始化：使用与主进程相同的 disk_cache 目录和容量
+    （spawn 方式启动的工作进程重新导入本包，不继承主进程中的修改）
+    """
+    disk_cache.directory = directory
+    disk_cache.max_bytes = max_bytes
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """
+    把文件、目录和通配符展开为文件列表
+
+    目录递归包含其中的全部文件（跳过以 . 开头的文件和目录），通配符支持 **；
+    各参数展开的结果排序后依次拼接，重复的文件只保留第一次出现。
+    不存在且不含通配符的路径原样保留，检查时报告读取失败。
+    """
+    paths: List[str] = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = []
+            for root, dirs, files in os.walk(pattern):
+                dirs[:] = [name for name in dirs if not name.startswith('.')]
+                found.extend(os.path.join(root, name) for name in files
+                             if not name.startswith('.'))
+        elif any(char in pattern for char in '*?['):
+            found = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+        else:
+            found = [pattern]
+        for path in sorted(found):
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def check_files(paths: Iterable[str], workers: Optional[int] = None,
+                chunksize: int = DEFAULT_CHUNKSIZE, semantic: bool = False,
+                ordered: bool = True, use_cache: bool = False) -> Iterator[CheckResult]:
+    """
+    并行检查多个文件，逐个产出 CheckResult
+
+    Args:
+        paths: 源文件路径（目录和通配符先用 expand_paths() 展开）
+        workers: 工作进程数，默认为 CPU 核数；为 1 时在当前进程中逐个检查
+        chunksize: 每个工作进程一次领取的文件数，文件多而小时调大可减少调度开销
+        semantic: 是否做语义检查（见 check_file）
+        ordered: 为真时按输入顺序产出，否则按完成顺序产出（第一个结果更早到达）
+        use_cache: 是否读写 disk_cache（工作进程使用与当前进程相同的缓存设置）
+
+    某个文件读取失败或有错误不影响其他文件。
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers 必须为正数")
+    if chunksize < 1:
+        raise ValueError("chunksize 必须为正数")
+
+    return run_checks(paths, workers, chunksize, semantic, ordered, use_cache)
+
+
+def run_checks(paths: List[str], workers: int, chunksize: int, semantic: bool,
+               ordered: bool, use_cache: bool) -> Iterator[CheckResult]:
+    """check_files() 的生成器部分（参数已检查）"""
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield check_file(path, semantic, use_cache)
+        return
+
+    chunks = [paths[start:start + chunksize] for start in range(0, len(paths), chunksize)]
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                   initializer=configure_worker,
+                                   initargs=(disk_cache.directory, disk_cache.max_bytes))
+    try:
+        futures = [executor.submit(check_chunk, chunk, semantic, use_cache) for chunk in chunks]
+        for future in (futures if ordered else as_completed(futures)):
+            yield from future.result()
+    finally:
+        # 调用方提前停止迭代时不再启动剩余的任务
+        executor.shutdown(cancel_futures=True)
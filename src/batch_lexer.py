@@ -0,0 +1,90 @@
+"""
+批量词法分析
+用进程池并行分析多个源文件，工作进程以二进制 Token 缓冲区返回结果
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from .lexer import Lexer, TokenType
+from .token_buffer import TokenBuffer
+from .parser_ast import lexical_error_message
+
+
+# 每个工作进程一次领取的文件数
+DEFAULT_CHUNKSIZE = 8
+
+
+@dataclass
+class LexResult:
+    """单个文件的词法分析结果"""
+    path: str
+    tokens: Optional[TokenBuffer] = None    # 读取或分析失败时为 None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def lex_file(path: str, engine: str = 'regex') -> Tuple[str, Optional[bytes], List[str]]:
+    """
+    分析一个文件（在工作进程中执行）
+
+    返回 (path, TokenBuffer.to_bytes() 的结果, 错误信息列表)。
+    只传回一段 bytes 和少量错误字符串，避免逐个 pickle Token 对象。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return path, None, [f"读取文件失败: {e}"]
+    try:
+        buffer = Lexer(source, engine=engine).tokenize_buffer()
+    except ValueError as e:
+        # 如源代码超过 Lexer.MAX_SOURCE_LENGTH
+        return path, None, [f"无法分析: {e}"]
+    errors = [lexical_error_message(buffer[index])
+              for index in buffer.indices(TokenType.ERROR)]
+    return path, buffer.to_bytes(), errors
+
+
+def lex_files(paths: Iterable[str], workers: Optional[int] = None,
+              chunksize: int = DEFAULT_CHUNKSIZE, engine: str = 'regex') -> List[LexResult]:
+    """
+    并行分析多个文件，按输入顺序返回 LexResult 列表
+
+    Args:
+        paths: 源文件路径
+        workers: 工作进程数，默认为 CPU 核数；为 1 时在当前进程中逐个分析
+        chunksize: 每个工作进程一次领取的文件数，文件多而小时调大可减少调度开销
+        engine: 词法分析引擎（见 Lexer.ENGINES）；默认的 regex 引擎直接写入缓冲区，不创建 Token 对象
+
+    某个文件读取失败或含有词法错误不影响其他文件，错误记录在对应结果的 errors 中。
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers 必须为正数")
+    if chunksize < 1:
+        raise ValueError("chunksize 必须为正数")
+    if engine not in Lexer.ENGINES:
+        raise ValueError(f"未知的词法分析引擎: {engine}（可选: {', '.join(Lexer.ENGINES)}）")
+
+    engines = [engine] * len(paths)
+    if workers == 1 or len(paths) <= 1:
+        raw = map(lex_file, paths, engines)
+        return [unpack_result(item) for item in raw]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        raw = executor.map(lex_file, paths, engines, chunksize=chunksize)
+        return [unpack_result(item) for item in raw]
+
+
+def unpack_result(item: Tuple[str, Optional[bytes], List[str]]) -> LexResult:
+    """把 lex_file() 的返回值还原为 LexResult"""
+    path, data, errors = item
+    tokens = TokenBuffer.from_bytes(data) if data is not None else None
+    return LexResult(path, tokens, errors)
@@ -3,8 +3,9 @@ Mini 语言解释器
 遍历 AST 并执行程序
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 from .ast_nodes import *
+from .lexer import NameTable
 from .symbol_table import SymbolType
 
 
@@ -17,17 +18,30 @@ class RuntimeError(Exception):
 
 
 class Interpreter(ASTVisitor):
-    """AST 解释器"""
+    """
+    AST 解释器
+    
+    变量值按名字表 ID 保存在 self.values 中，global_scope 由它生成；
+    AST 和符号表只读，因此可以直接执行 parse_to_ast 缓存中共享的结果。
+    """
     
     # 限制常量
     MAX_LOOP_ITERATIONS = 10000
     MAX_RECURSION_DEPTH = 100
     MAX_OUTPUT_LINES = 1000
     
+    # self.values 中未定义变量的占位值
+    UNSET = object()
+    
     def __init__(self, symbol_table: 'ScopedSymbolTable' = None, debug: bool = False):
-        self.global_scope: Dict[str, Any] = {}  # 全局变量存储
         self.debug = debug
         self.symbol_table = symbol_table
+        self.names = symbol_table.names if symbol_table is not None else NameTable()
+        self.values: List[Any] = [self.UNSET] * len(self.names)  # 全局变量存储（按 ID）
+        # self.values 每个下标对应的变量名，前 len(self.names) 个与名字表一致
+        self.slot_names: List[str] = list(self.names.names)
+        # 名字表中没有的名字 -> 下标；名字表可能在缓存中共享，执行时不往其中登记
+        self.extra_names: Dict[str, int] = {}
         self.output_buffer = []  # 输出缓冲区
         
         # 运行时跟踪
@@ -35,6 +49,31 @@ class Interpreter(ASTVisitor):
         self.recursion_depth = 0
         self.output_line_count = 0
     
+    @property
+    def global_scope(self) -> Dict[str, Any]:
+        """全局变量：变量名 -> 值"""
+        return {name: value for name, value in zip(self.slot_names, self.values)
+                if value is not self.UNSET}
+    
+    def slot(self, name: str, symbol_id: int) -> int:
+        """
+        变量在 self.values 中的下标
+        
+        symbol_id 只在属于 self.names 时直接使用；没有 symbol_id 的节点（如手工构造的 AST）
+        和来自其他名字表的 ID 按名字查找。名字表中没有的名字登记在 self.extra_names 中，
+        分配 self.values 末尾之后的下标。
+        """
+        names = self.names
+        if not 0 <= symbol_id < len(names) or names.names[symbol_id] != name:
+            symbol_id = names.get(name)
+            if symbol_id is None:
+                symbol_id = self.extra_names.get(name)
+                if symbol_id is None:
+                    symbol_id = self.extra_names[name] = len(self.values)
+                    self.values.append(self.UNSET)
+                    self.slot_names.append(name)
+        return symbol_id
+    
     def log(self, message: str):
         """调试日志输出"""
         if self.debug:
@@ -81,7 +120,7 @@ class Interpreter(ASTVisitor):
             'string': ''
         }
         default_value = default_values.get(node.var_type, 0)
-        self.global_scope[node.name] = default_value
+        self.values[self.slot(node.name, node.symbol_id)] = default_value
         self.log(f"声明变量: {node.name} = {default_value} ({node.var_type})")
     
     def visit_Block(self, node: Block):
@@ -94,7 +133,10 @@ class Interpreter(ASTVisitor):
     def visit_Assignment(self, node: Assignment):
         """执行赋值语句"""
         value = node.expression.accept(self)
-        self.global_scope[node.variable] = value
+        symbol_id = node.symbol_id
+        if not 0 <= symbol_id < len(self.values) or self.slot_names[symbol_id] != node.variable:
+            symbol_id = self.slot(node.variable, symbol_id)
+        self.values[symbol_id] = value
         self.log(f"赋值: {node.variable} = {value}")
     
     def visit_IfStatement(self, node: IfStatement):
@@ -191,7 +233,7 @@ class Interpreter(ASTVisitor):
         try:
             # 获取变量的类型
             var_name = node.variable
-            symbol = self.symbol_table.lookup(var_name) if self.symbol_table else None
+            symbol = self.symbol_table.resolve(var_name, node.symbol_id) if self.symbol_table else None
             
             # 提示用户输入
             user_input = input(f"请输入 {var_name} 的值: ").strip()
@@ -225,7 +267,7 @@ class Interpreter(ASTVisitor):
                         value = user_input
             
             # 将值存入全局作用域
-            self.global_scope[var_name] = value
+            self.values[self.slot(var_name, node.symbol_id)] = value
             self.log(f"读取输入: {var_name} = {value}")
             
         except ValueError as e:
@@ -333,20 +375,25 @@ class Interpreter(ASTVisitor):
     
     def visit_Variable(self, node: Variable):
         """获取变量值"""
-        if node.name not in self.global_scope:
+        symbol_id = node.symbol_id
+        if not 0 <= symbol_id < len(self.values) or self.slot_names[symbol_id] != node.name:
+            symbol_id = self.slot(node.name, symbol_id)
+        value = self.values[symbol_id]
+        if value is self.UNSET:
             raise RuntimeError(f"变量 '{node.name}' 未定义", node)
-        value = self.global_scope[node.name]
         self.log(f"读取变量: {node.name} = {value}")
         return value
 
 
 # ==================== 便捷函数 ====================
 
-def run_program(source_code: str, debug: bool = False) -> tuple[Dict[str, Any], str]:
-    """解析并执行程序"""
+def run_program(source_code: str, debug: bool = False,
+                use_cache: bool = True) -> tuple[Dict[str, Any], str]:
+    """解析并执行程序（解析结果经 parse_cache 和 disk_cache 缓存，每次都重新执行）"""
     from .parser_ast import parse_to_ast
     
-    ast, errors, symbol_table = parse_to_ast(source_code)
+    ast, errors, symbol_table = parse_to_ast(source_code, use_cache=use_cache,
+                                             use_disk_cache=use_cache)
     
     if errors:
         error_msg = "\n".join(errors)
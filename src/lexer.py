@@ -4,8 +4,10 @@ Mini 语言词法分析器
 """
 
 import re
+from array import array
+from bisect import bisect_right
 from enum import Enum, auto
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class TokenType(Enum):
@@ -68,21 +70,148 @@ class TokenType(Enum):
     ERROR = auto()
 
 
+class LineIndex:
+    """
+    行起始偏移表：按需把字符偏移换算为行号和列号
+    
+    对内存中的源代码，首次查询时才扫描换行建立索引；
+    分块分析文件时由 feed() 随读入的文本增量建立（此时不保留源代码）。
+    """
+    
+    def __init__(self, source: Optional[str] = ""):
+        self.source = source
+        self.starts: Optional[array] = None   # 每行起始偏移
+        self.length = 0                       # feed() 已读入的字符数
+        if source is None:
+            self.starts = array('q', [0])
+    
+    def build(self):
+        """扫描整个源代码建立索引"""
+        starts = array('q', [0])
+        find = self.source.find
+        index = find('\n')
+        while index >= 0:
+            starts.append(index + 1)
+            index = find('\n', index + 1)
+        self.starts = starts
+    
+    def feed(self, text: str):
+        """追加一段文本（分块模式）"""
+        starts = self.starts
+        base = self.length
+        find = text.find
+        index = find('\n')
+        while index >= 0:
+            starts.append(base + index + 1)
+            index = find('\n', index + 1)
+        self.length += len(text)
+    
+    def position(self, offset: int) -> Tuple[int, int]:
+        """偏移 -> (行号, 列号)，均从 1 开始"""
+        if self.starts is None:
+            self.build()
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+    
+    def line_count(self) -> int:
+        """行数"""
+        if self.starts is None:
+            self.build()
+        return len(self.starts)
+    
+    def line_text(self, line_number: int) -> str:
+        """第 line_number 行的文本（不含换行符）；不保留源代码时返回空串"""
+        if not self.source or not 0 < line_number <= self.line_count():
+            return ""
+        start = self.starts[line_number - 1]
+        if line_number < len(self.starts):
+            return self.source[start:self.starts[line_number] - 1]
+        return self.source[start:]
+
+
+class NameTable:
+    """
+    名字表：一次编译中出现的每个不同标识符对应一个从 0 开始的连续整数 ID
+    
+    Lexer 在词法分析时登记标识符，同名标识符的 Token 共享同一个字符串对象；
+    AST 节点、符号表和解释器用 ID 代替名字进行查找。
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+    
+    def intern(self, name: str) -> int:
+        """返回 name 的 ID，首次出现时分配新 ID"""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol_id
+    
+    def get(self, name: str) -> Optional[int]:
+        """name 的 ID，未登记时返回 None"""
+        return self.ids.get(name)
+    
+    def name(self, symbol_id: int) -> str:
+        """ID 对应的名字"""
+        return self.names[symbol_id]
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
 class Token:
-    """Token 类"""
-    def __init__(self, token_type: TokenType, value: str, line: int, column: int):
+    """
+    Token 类
+    
+    Lexer 产生的 Token 只记录起始偏移 offset、词素长度 length 和共享的
+    LineIndex，行号、列号在访问时才计算；直接以 Token(type, value, line, column)
+    构造时使用给定的位置。
+    """
+    __slots__ = ('type', 'value', 'offset', 'length', 'lines', 'fixed_position')
+    
+    def __init__(self, token_type: TokenType, value: str, line: int = 0, column: int = 0,
+                 offset: int = -1, length: int = 0, lines: Optional[LineIndex] = None):
         self.type = token_type
         self.value = value
-        self.line = line
-        self.column = column
+        self.offset = offset
+        self.length = length
+        self.lines = lines
+        self.fixed_position = None if lines is not None else (line, column)
+    
+    @property
+    def position(self) -> Tuple[int, int]:
+        """(行号, 列号)"""
+        if self.lines is not None:
+            return self.lines.position(self.offset)
+        return self.fixed_position
+    
+    @property
+    def line(self) -> int:
+        return self.position[0]
+    
+    @property
+    def column(self) -> int:
+        return self.position[1]
     
     def __repr__(self):
-        return f"Token({self.type.name}, '{self.value}', {self.line}:{self.column})"
+        line, column = self.position
+        return f"Token({self.type.name}, '{self.value}', {line}:{column})"
     
     def __str__(self):
         return f"<{self.type.name}, {self.value}>"
 
 
+def operator_extensions(operators: Dict[str, 'TokenType']) -> Dict[str, Tuple[str, ...]]:
+    """首字符 -> 以它开头的多字符运算符（从长到短），供 scan_token() 做最长匹配"""
+    extensions: Dict[str, Tuple[str, ...]] = {}
+    for operator in sorted(operators, key=len, reverse=True):
+        if len(operator) > 1:
+            extensions[operator[0]] = extensions.get(operator[0], ()) + (operator,)
+    return extensions
+
+
 class Lexer:
     """词法分析器"""
     
@@ -118,16 +247,155 @@ class Lexer:
     MAX_NUMBER_LENGTH = 100
     MAX_SOURCE_LENGTH = 1000000  # 1MB
     
-    def __init__(self, source_code: str):
+    # 分块读取文件时每次读取的字符数
+    CHUNK_SIZE = 65536
+    
+    # 可选的词法分析引擎：
+    #   scan  - 逐字符扫描（默认）
+    #   regex - 单个预编译的正则交替式，少见情况回退到 scan_token()
+    #   dfa   - 由 lexer_dfa.TOKEN_SPEC 编译的表驱动 DFA，少见情况回退到 scan_token()
+    ENGINES = ('scan', 'regex', 'dfa')
+    
+    # 运算符和分隔符。三个引擎都由这张表生成运算符的匹配规则（正则的 OP 分组、
+    # scan_token() 的最长匹配和 lexer_dfa.TOKEN_SPEC），增加运算符只需修改这里。
+    OPERATORS = {
+        '+': TokenType.PLUS,
+        '-': TokenType.MINUS,
+        '*': TokenType.MULTIPLY,
+        '/': TokenType.DIVIDE,
+        '(': TokenType.LPAREN,
+        ')': TokenType.RPAREN,
+        ';': TokenType.SEMICOLON,
+        ',': TokenType.COMMA,
+        '.': TokenType.DOT,
+        ':': TokenType.COLON,
+        ':=': TokenType.ASSIGN,
+        '<': TokenType.LT,
+        '<=': TokenType.LE,
+        '<>': TokenType.NE,
+        '>': TokenType.GT,
+        '>=': TokenType.GE,
+        '=': TokenType.EQ,
+    }
+    
+    OPERATOR_EXTENSIONS = operator_extensions(OPERATORS)
+    
+    # 正则的 OP 分组：多字符运算符按长度从长到短排列（最长匹配），单字符运算符合并为字符类
+    OPERATOR_PATTERN = '|'.join(
+        [re.escape(operator) for operator in sorted(OPERATORS, key=len, reverse=True)
+         if len(operator) > 1]
+        + ['[' + ''.join(re.escape(operator) for operator in OPERATORS if len(operator) == 1) + ']'])
+    
+    # 正则引擎的主模式：前导空白与一个词素合并为一次匹配，分组按优先级排列。
+    # 标识符和数字的否定前瞻阻止回溯到更短的匹配，并把紧跟非 ASCII
+    # 字符的词素交给 SLOW 分支（str.isalnum()/isdigit() 支持 Unicode）。
+    MASTER_PATTERN = re.compile(r'''
+        [ \t\n\r]*
+        (?:
+            (?P<ID>[A-Za-z_][A-Za-z0-9_]*(?![A-Za-z0-9_]|[^\x00-\x7f]))
+          | (?P<NUM>[0-9]+(?:\.[0-9]+(?![0-9]|[^\x00-\x7f])
+                            |(?!\.?[0-9]|\.?[^\x00-\x7f])))
+          | (?P<COMMENT>//[^\n]*\n?|\{[^}]*\}?)
+          | (?P<OP>''' + OPERATOR_PATTERN + r''')
+          | (?P<STR>'[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*'
+                  |"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*")
+          | (?P<SLOW>[0-9A-Za-z_'"]|[^\x00-\x7f])
+          | (?P<ERR>[\s\S])
+          | \Z
+        )
+    ''', re.VERBOSE)
+    
+    # 字符串中除结束引号、换行和转义符以外的连续字符
+    STRING_RUNS = {
+        "'": re.compile(r"[^'\\\n]*"),
+        '"': re.compile(r'[^"\\\n]*'),
+    }
+    
+    def __init__(self, source_code: str, engine: str = 'scan'):
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的词法分析引擎: {engine}（可选: {', '.join(self.ENGINES)}）")
+        self.engine = engine
+        # 词素 -> (Token 类型, 共享的字符串) 的缓存（每个不同的词素只转小写一次），
+        # 以及其中关键字的部分（reset() 后保留）
+        self.words: Dict[str, Tuple[TokenType, str]] = {}
+        self.keyword_words: Dict[str, Tuple[TokenType, str]] = {}
+        self.reset(source_code)
+    
+    def reset(self, source_code: str):
+        """
+        改为分析新的源代码，复用同一个 Lexer（如反复分析大量小程序）
+        
+        之前产生的 Token、Token 列表和名字表不受影响；新的源代码使用新的名字表，
+        词素缓存中只保留关键字。
+        """
         # 边界检查：源代码长度
         if len(source_code) > self.MAX_SOURCE_LENGTH:
             raise ValueError(f"源代码过长（超过 {self.MAX_SOURCE_LENGTH} 字符）")
         
         self.source = source_code if source_code else ""
         self.pos = 0
-        self.line = 1
-        self.column = 1
+        self.base = 0    # self.source[0] 在整个输入中的偏移（分块模式下随窗口移动）
+        self.lines = LineIndex(self.source)
         self.tokens: List[Token] = []
+        
+        # 标识符名字表；缓存中的标识符属于旧的名字表，需要重新登记
+        self.names = NameTable()
+        self.words = self.keyword_words.copy()
+        
+        # 分块词法分析状态（见 from_path 和 feed）
+        self.path: Optional[str] = None
+        self.chunk_size = self.CHUNK_SIZE
+        self.pending_comment: Optional[str] = None  # 跨块注释的结束符
+        self.pending_size = 0   # 窗口中未完成部分至少增长到该长度才重新分析
+        self.chunks: List[str] = []   # 已读入但尚未并入窗口的文本
+        self.chunk_chars = 0
+        self.pushing = False    # 是否处于 feed() 推送模式
+        self.closed = False
+    
+    @classmethod
+    def from_path(cls, path: str, chunk_size: int = None) -> 'Lexer':
+        """
+        从文件分块读取并进行词法分析，不受 MAX_SOURCE_LENGTH 限制
+        
+        文件按 chunk_size 个字符分块解码，只在内存中保留一个滑动窗口，
+        跨块的词素、字符串和注释都能正确处理。使用正则引擎，文件不做换行符转换，
+        Token 流与 Lexer(文件内容, engine='regex') 相同。
+        行起始偏移表随读入增量建立，每行占 8 字节。
+        """
+        lexer = cls("", engine='regex')
+        lexer.path = path
+        lexer.lines = LineIndex(None)
+        if chunk_size is not None:
+            if chunk_size <= 0:
+                raise ValueError("chunk_size 必须为正数")
+            lexer.chunk_size = chunk_size
+        return lexer
+    
+    @property
+    def line(self) -> int:
+        """当前位置的行号"""
+        return self.lines.position(self.base + self.pos)[0]
+    
+    @property
+    def column(self) -> int:
+        """当前位置的列号"""
+        return self.lines.position(self.base + self.pos)[1]
+    
+    def classify_word(self, text: str) -> Tuple[TokenType, str]:
+        """标识符或关键字词素 -> (Token 类型, 值)；标识符登记到名字表"""
+        entry = self.words.get(text)
+        if entry is None:
+            token_type = self.KEYWORDS.get(text.lower(), TokenType.IDENTIFIER)
+            if token_type == TokenType.IDENTIFIER:
+                text = self.names.name(self.names.intern(text))
+                entry = self.words[text] = (token_type, text)
+            else:
+                entry = self.words[text] = self.keyword_words[text] = (token_type, text)
+        return entry
+    
+    def make_token(self, token_type: TokenType, value: str, start: int) -> Token:
+        """以 self.source[start:self.pos] 为词素创建 Token"""
+        return Token(token_type, value, 0, 0, self.base + start, self.pos - start, self.lines)
     
     def current_char(self) -> Optional[str]:
         """获取当前字符"""
@@ -143,13 +411,8 @@ class Lexer:
         return self.source[pos]
     
     def advance(self):
-        """前进一个字符"""
+        """前进一个字符（行列号由 LineIndex 按需计算）"""
         if self.pos < len(self.source):
-            if self.source[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
             self.pos += 1
     
     def skip_whitespace(self):
@@ -158,57 +421,50 @@ class Lexer:
             self.advance()
     
     def skip_comment(self):
-        """跳过注释（支持 // 单行注释和 { } 块注释）"""
+        """跳过注释（支持 // 单行注释和 { } 块注释），用 str.find 整段跳过"""
         if self.current_char() == '/' and self.peek_char() == '/':
-            # 单行注释
-            while self.current_char() and self.current_char() != '\n':
-                self.advance()
-            if self.current_char() == '\n':
-                self.advance()
-            return True
-        
-        if self.current_char() == '{':
+            # 单行注释（连同结尾的换行）
+            end = self.source.find('\n', self.pos + 2)
+        elif self.current_char() == '{':
             # 块注释
-            self.advance()
-            while self.current_char():
-                if self.current_char() == '}':
-                    self.advance()
-                    return True
-                self.advance()
-            return True
-        
-        return False
+            end = self.source.find('}', self.pos + 1)
+        else:
+            return False
+        self.pos = end + 1 if end >= 0 else len(self.source)
+        return True
     
     def read_number(self) -> Token:
         """读取数字（支持整数和浮点数）"""
-        start_line = self.line
-        start_column = self.column
         start_pos = self.pos
-        is_real = False
         
         # 读取整数部分
         while self.current_char() and self.current_char().isdigit():
             # 边界检查：数字长度
             if self.pos - start_pos >= self.MAX_NUMBER_LENGTH:
-                return Token(TokenType.ERROR, 
-                           f"数字过长（超过 {self.MAX_NUMBER_LENGTH} 位）", 
-                           start_line, start_column)
+                return self.make_token(TokenType.ERROR, 
+                                       f"数字过长（超过 {self.MAX_NUMBER_LENGTH} 位）", 
+                                       start_pos)
             self.advance()
         
         # 检查是否有小数点
         if self.current_char() == '.' and self.peek_char() and self.peek_char().isdigit():
-            is_real = True
             self.advance()  # 跳过小数点
             
             # 读取小数部分
             while self.current_char() and self.current_char().isdigit():
                 if self.pos - start_pos >= self.MAX_NUMBER_LENGTH:
-                    return Token(TokenType.ERROR, 
-                               f"数字过长（超过 {self.MAX_NUMBER_LENGTH} 位）", 
-                               start_line, start_column)
+                    return self.make_token(TokenType.ERROR, 
+                                           f"数字过长（超过 {self.MAX_NUMBER_LENGTH} 位）", 
+                                           start_pos)
                 self.advance()
         
         num_str = self.source[start_pos:self.pos]
+        return self.number_token(num_str, self.base + start_pos)
+    
+    def number_token(self, num_str: str, offset: int, make=Token) -> Token:
+        """校验数字词素的取值范围，以 make 生成 INTEGER/REAL 或 ERROR Token"""
+        is_real = '.' in num_str
+        length = len(num_str)
         
         # 边界检查：数值范围
         try:
@@ -216,83 +472,160 @@ class Lexer:
                 value = float(num_str)
                 # 检查是否溢出
                 if value == float('inf') or value == float('-inf'):
-                    return Token(TokenType.ERROR, f"浮点数溢出", start_line, start_column)
+                    return make(TokenType.ERROR, f"浮点数溢出", 0, 0, offset, length, self.lines)
             else:
                 value = int(num_str)
                 # 检查整数范围（假设使用 32 位整数）
                 if value > 2147483647 or value < -2147483648:
-                    return Token(TokenType.ERROR, f"整数超出范围", start_line, start_column)
+                    return make(TokenType.ERROR, f"整数超出范围", 0, 0, offset, length, self.lines)
         except (ValueError, OverflowError):
-            return Token(TokenType.ERROR, f"数字格式错误", start_line, start_column)
+            return make(TokenType.ERROR, f"数字格式错误", 0, 0, offset, length, self.lines)
         
         token_type = TokenType.REAL if is_real else TokenType.INTEGER
-        return Token(token_type, num_str, start_line, start_column)
+        return make(token_type, num_str, 0, 0, offset, length, self.lines)
     
     def read_identifier(self) -> Token:
         """读取标识符或关键字（优化版本）"""
-        start_line = self.line
-        start_column = self.column
         start_pos = self.pos
         
         while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
             # 边界检查：标识符长度
             if self.pos - start_pos >= self.MAX_IDENTIFIER_LENGTH:
-                return Token(TokenType.ERROR, 
-                           f"标识符过长（超过 {self.MAX_IDENTIFIER_LENGTH} 字符）", 
-                           start_line, start_column)
+                return self.make_token(TokenType.ERROR, 
+                                       f"标识符过长（超过 {self.MAX_IDENTIFIER_LENGTH} 字符）", 
+                                       start_pos)
             self.advance()
         
         id_str = self.source[start_pos:self.pos]
         
         # 边界检查：空标识符
         if not id_str:
-            return Token(TokenType.ERROR, "空标识符", start_line, start_column)
+            return self.make_token(TokenType.ERROR, "空标识符", start_pos)
         
         # 检查是否为关键字
-        id_lower = id_str.lower()
-        token_type = self.KEYWORDS.get(id_lower, TokenType.IDENTIFIER)
+        token_type, id_str = self.classify_word(id_str)
         
-        return Token(token_type, id_str, start_line, start_column)
+        return self.make_token(token_type, id_str, start_pos)
     
     def read_string(self) -> Token:
-        """读取字符串字面量"""
-        start_line = self.line
-        start_column = self.column
-        quote_char = self.current_char()  # ' 或 "
-        self.advance()  # 跳过开始引号
+        """
+        读取字符串字面量
         
-        start_pos = self.pos
+        普通字符由 STRING_RUNS 整段匹配，只在引号、换行和转义符处停下逐个处理。
+        """
+        source = self.source
+        end = len(source)
+        quote_pos = self.pos
+        quote_char = source[quote_pos]  # ' 或 "
+        match_run = self.STRING_RUNS[quote_char].match
+        start_pos = pos = quote_pos + 1  # 跳过开始引号
+        limit = start_pos + self.MAX_STRING_LENGTH
         
-        while self.current_char() and self.current_char() != quote_char:
-            # 边界检查：字符串长度
-            if self.pos - start_pos >= self.MAX_STRING_LENGTH:
-                return Token(TokenType.ERROR, 
-                           f"字符串过长（超过 {self.MAX_STRING_LENGTH} 字符）", 
-                           start_line, start_column)
+        while True:
+            run_end = match_run(source, pos).end()
+            
+            # 边界检查：字符串长度（在第一个超出长度且不是结束引号的字符处报错）
+            if run_end >= limit:
+                error_pos = max(pos, limit)
+                if error_pos < run_end or (run_end < end and source[run_end] != quote_char):
+                    self.pos = error_pos
+                    return self.make_token(TokenType.ERROR, 
+                                           f"字符串过长（超过 {self.MAX_STRING_LENGTH} 字符）", 
+                                           quote_pos)
+            
+            self.pos = pos = run_end
+            if pos >= end:
+                # 字符串未闭合
+                return self.make_token(TokenType.ERROR, "未闭合的字符串", quote_pos)
+            
+            char = source[pos]
+            if char == quote_char:
+                break
             
             # 边界检查：不允许字符串跨行（除非转义）
-            if self.current_char() == '\n':
-                return Token(TokenType.ERROR, "字符串不能跨行", start_line, start_column)
+            if char == '\n':
+                return self.make_token(TokenType.ERROR, "字符串不能跨行", quote_pos)
             
-            # 处理转义字符
-            if self.current_char() == '\\':
-                self.advance()
-                if self.current_char():  # 跳过被转义的字符
-                    self.advance()
-            else:
-                self.advance()
+            # 转义字符：跳过反斜杠和被转义的字符
+            pos = min(pos + 2, end)
+        
+        string_value = source[start_pos:pos]
+        self.pos = pos + 1  # 跳过结束引号
+        
+        return self.make_token(TokenType.STRING, string_value, quote_pos)
+    
+    def scan_token(self) -> Token:
+        """
+        从当前位置读取一个 Token（调用前须已跳过空白和注释）
+
+        逐字符引擎的主体，同时也是正则引擎遇到非 ASCII 字符、
+        超长词素等少见情况时的回退路径。
+        """
+        char = self.current_char()
+        start = self.pos
+        
+        # 数字
+        if char.isdigit():
+            return self.read_number()
         
-        if not self.current_char():
-            # 字符串未闭合
-            return Token(TokenType.ERROR, "未闭合的字符串", start_line, start_column)
+        # 标识符或关键字
+        if char.isalpha() or char == '_':
+            return self.read_identifier()
         
-        string_value = self.source[start_pos:self.pos]
-        self.advance()  # 跳过结束引号
+        # 字符串字面量
+        if char in ['"', "'"]:
+            return self.read_string()
+        
+        # 运算符和分隔符：按 OPERATORS 取最长匹配（':' 单独出现时用于变量声明）
+        token_type, value = self.OPERATORS.get(char), char
+        for operator in self.OPERATOR_EXTENSIONS.get(char, ()):
+            if self.source.startswith(operator, start):
+                token_type, value = self.OPERATORS[operator], operator
+                break
+        if token_type is None:
+            # 未知字符
+            token_type = TokenType.ERROR
         
-        return Token(TokenType.STRING, string_value, start_line, start_column)
+        for _ in value:
+            self.advance()
+        return self.make_token(token_type, value, start)
     
     def tokenize(self) -> List[Token]:
         """执行词法分析，返回 Token 列表"""
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+    
+    def tokenize_buffer(self) -> 'TokenBuffer':
+        """执行词法分析，结果存入列式 TokenBuffer（正则引擎不创建 Token 对象）"""
+        from .token_buffer import TokenBuffer
+        buffer = TokenBuffer(self.lines)
+        for _ in self.iter_tokens(make=buffer.add):
+            pass
+        return buffer
+    
+    def iter_tokens(self, make=Token) -> Iterator[Token]:
+        """
+        按需逐个产生 Token（以 EOF 结尾），不在词法分析器中保留 Token 列表
+        
+        与 ASTParser 的流式模式配合使用时，内存占用只与前瞻窗口有关。
+        make 是与 Token 构造函数参数相同的可调用对象，产生的是它的返回值；
+        传入 TokenBuffer.add 时词素直接写入缓冲区的各列。
+        """
+        if self.pushing:
+            raise ValueError("推送模式下请使用 feed()/close()")
+        if self.path is not None:
+            return self._iter_file(make)
+        if self.engine == 'regex':
+            return self._iter_window(True, make)
+        if self.engine == 'dfa':
+            return self._iter_dfa(make)
+        if make is Token:
+            return self._iter_scan()
+        return (make(token.type, token.value, 0, 0, token.offset, token.length, token.lines)
+                for token in self._iter_scan())
+    
+    def _iter_scan(self) -> Iterator[Token]:
+        """逐字符引擎"""
         while self.pos < len(self.source):
             self.skip_whitespace()
             
@@ -303,99 +636,316 @@ class Lexer:
             if self.skip_comment():
                 continue
             
-            char = self.current_char()
-            start_line = self.line
-            start_column = self.column
-            
-            # 数字
-            if char.isdigit():
-                self.tokens.append(self.read_number())
-                continue
+            yield self.scan_token()
+        
+        # 添加 EOF token
+        yield self.make_token(TokenType.EOF, '', self.pos)
+    
+    def _iter_file(self, make=Token) -> Iterator[Token]:
+        """逐块读取 self.path，在滑动窗口上运行正则引擎"""
+        # newline='' 保留 '\r\n' 和 '\r'，偏移和行列号与整串分析文件内容一致
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield from self._push(chunk, make)
+        yield from self._flush(make)
+    
+    def _push(self, text: str, make=Token) -> Iterator[Token]:
+        """追加一段输入，产生窗口中已经完整的 Token（分块读取文件和 feed() 共用）"""
+        self.lines.feed(text)
+        self.chunks.append(text)
+        self.chunk_chars += len(text)
+        if len(self.source) - self.pos + self.chunk_chars < self.pending_size:
+            return
+        # 丢弃已分析的部分，窗口只保留未完成的尾部
+        self.slide_window(''.join(self.chunks))
+        self.chunks.clear()
+        self.chunk_chars = 0
+        yield from self._iter_window(False, make)
+        # 尾部词素未完成时，等窗口至少翻倍再重试，保证总开销线性
+        self.pending_size = 2 * (len(self.source) - self.pos)
+    
+    def _flush(self, make=Token) -> Iterator[Token]:
+        """输入结束：分析窗口中剩余的部分并产生 EOF Token"""
+        self.slide_window(''.join(self.chunks))
+        self.chunks.clear()
+        self.chunk_chars = 0
+        yield from self._iter_window(True, make)
+    
+    def feed(self, chunk: str) -> List[Token]:
+        """
+        推送式词法分析：追加一段输入，返回其中已经完整的 Token
+        
+        用于边接收边分析（管道、套接字等）。被块边界截断的标识符、数字、
+        ':=' '<=' '<>' 等运算符、字符串和注释会留到后续输入到达后再产生，
+        输入结束时调用 close() 取得剩余的 Token 和 EOF。
+        只能用于以空源代码创建的 Lexer，使用正则引擎，全部 Token 与
+        Lexer(完整输入, engine='regex').tokenize() 相同；Token 不保留在 self.tokens 中。
+        """
+        if self.closed:
+            raise ValueError("词法分析器已经 close()，不能再 feed()")
+        if not self.pushing:
+            if self.path is not None or self.source or self.tokens:
+                raise ValueError("只有以空源代码创建的 Lexer 才能使用 feed()")
+            self.pushing = True
+            self.lines = LineIndex(None)
+        return list(self._push(chunk))
+    
+    def close(self) -> List[Token]:
+        """结束 feed() 的输入，返回剩余的 Token（以 EOF 结尾）"""
+        if self.closed:
+            raise ValueError("词法分析器已经 close()")
+        if not self.pushing:
+            self.feed("")
+        self.closed = True
+        return list(self._flush())
+    
+    def slide_window(self, text: str):
+        """丢弃窗口中已分析的部分并追加新文本"""
+        self.base += self.pos
+        self.source = self.source[self.pos:] + text
+        self.pos = 0
+    
+    def _iter_window(self, final: bool, make=Token) -> Iterator[Token]:
+        """
+        正则引擎：每个词素只做一次 C 层匹配，Token 只记录偏移
+        
+        非 ASCII 字符、超长词素和非法字符串交给 scan_token() 处理，
+        以保证两种引擎产生完全相同的 Token 流。
+        
+        final 为 False 时 self.source 只是输入的一个窗口：可能被窗口末尾截断的
+        词素留待更多输入到达后再分析，未结束的注释记录在 pending_comment 中，
+        已读部分直接丢弃。final 为 True 时分析到末尾并产生 EOF Token。
+        """
+        source = self.source
+        finditer = self.MASTER_PATTERN.finditer
+        words = self.words
+        classify_word = self.classify_word
+        operators = self.OPERATORS
+        max_identifier = self.MAX_IDENTIFIER_LENGTH
+        max_number = self.MAX_NUMBER_LENGTH
+        lines = self.lines
+        base = self.base
+        end = len(source)
+        pos = self.pos
+        
+        # 上一块末尾未结束的注释
+        if self.pending_comment is not None:
+            close = source.find(self.pending_comment, pos)
+            pos = end if close < 0 else close + 1
+            if close >= 0 or final:
+                self.pending_comment = None
+        
+        resume = self.pending_comment is None
+        while resume:
+            resume = False
+            for m in finditer(source, pos):
+                kind = m.lastgroup
+                if kind is None:
+                    pos = m.end()
+                    break
+                pos = m.start(kind)
+                
+                text = m.group(kind)
+                if not final and m.end() + 1 >= end:
+                    # 词素紧邻窗口末尾：标识符、数字和运算符可能还会延长
+                    if (kind == 'OP' or (kind == 'ID' and len(text) <= max_identifier)
+                            or (kind == 'NUM' and len(text) <= max_number)):
+                        break
+                    if kind == 'COMMENT':
+                        terminator = '}' if text[0] == '{' else '\n'
+                        if text[-1] != terminator:
+                            # 注释延续到下一块
+                            self.pending_comment = terminator
+                
+                if kind == 'ID' and len(text) <= max_identifier:
+                    token_type, text = words.get(text) or classify_word(text)
+                    yield make(token_type, text, 0, 0, base + pos, len(text), lines)
+                elif kind == 'OP':
+                    yield make(operators[text], text, 0, 0, base + pos, len(text), lines)
+                elif kind == 'NUM' and len(text) <= max_number:
+                    yield self.number_token(text, base + pos, make)
+                elif kind == 'STR' and len(text) - 2 < self.MAX_STRING_LENGTH:
+                    yield make(TokenType.STRING, text[1:-1], 0, 0, base + pos, len(text), lines)
+                elif kind == 'ERR':
+                    yield make(TokenType.ERROR, text, 0, 0, base + pos, 1, lines)
+                elif kind != 'COMMENT':
+                    # 回退到逐字符扫描，再从新位置继续匹配
+                    self.pos = pos
+                    token = self.scan_token()
+                    if not final and self.pos + 1 >= end:
+                        # 扫描触及窗口末尾（如未闭合的字符串），等待更多输入
+                        break
+                    if make is not Token:
+                        token = make(token.type, token.value, 0, 0,
+                                     token.offset, token.length, lines)
+                    yield token
+                    pos = self.pos
+                    resume = True
+                    break
+                pos = m.end()
+        
+        self.pos = pos
+        if final:
+            yield make(TokenType.EOF, '', 0, 0, base + pos, 0, lines)
+    
+    def _iter_dfa(self, make=Token) -> Iterator[Token]:
+        """
+        表驱动 DFA 引擎：源代码先整体转换为字符类序列，每个字符只做一次查表
+        
+        驱动循环按最长匹配运行 DFA，记录最后一个接受状态。非 ASCII 字符、
+        超长词素、非法字符和非法字符串交给 scan_token() 处理，
+        以保证与其他引擎产生完全相同的 Token 流。
+        """
+        from . import lexer_dfa
+        dfa = lexer_dfa.load_tables()
+        table = dfa.table
+        accept = dfa.accept
+        start = dfa.start
+        other = dfa.other
+        SKIP, WORD, NUMBER, STRING = (lexer_dfa.SKIP, lexer_dfa.WORD,
+                                      lexer_dfa.NUMBER, lexer_dfa.STRING)
+        source = self.source
+        codes = dfa.encode(source)
+        words = self.words
+        classify_word = self.classify_word
+        operators = self.OPERATORS
+        max_identifier = self.MAX_IDENTIFIER_LENGTH
+        max_number = self.MAX_NUMBER_LENGTH
+        max_string = self.MAX_STRING_LENGTH
+        lines = self.lines
+        end = len(source)
+        pos = self.pos
+        
+        while pos < end:
+            state = start
+            index = pos
+            kind = 0
+            last = pos
+            while True:
+                state = table[state + codes[index]]
+                if not state:
+                    break
+                index += 1
+                if accept[state]:
+                    kind = accept[state]
+                    last = index
             
-            # 标识符或关键字
-            if char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier())
+            if kind == SKIP:
+                pos = last
                 continue
-            
-            # 字符串字面量
-            if char in ['"', "'"]:
-                self.tokens.append(self.read_string())
+            length = last - pos
+            if kind == WORD:
+                if length <= max_identifier and codes[last] != other:
+                    token_type, text = words.get(source[pos:last]) or classify_word(source[pos:last])
+                    yield make(token_type, text, 0, 0, pos, length, lines)
+                    pos = last
+                    continue
+            elif kind == NUMBER:
+                # 紧跟非 ASCII 字符（或 '.' 加非 ASCII 字符）时 scan_token() 可能读入更多数字
+                if length <= max_number and codes[last] != other and not (
+                        source[last:last + 1] == '.' and codes[last + 1] == other
+                        and '.' not in source[pos:last]):
+                    yield self.number_token(source[pos:last], pos, make)
+                    pos = last
+                    continue
+            elif kind == STRING:
+                if length - 2 < max_string:
+                    yield make(TokenType.STRING, source[pos + 1:last - 1], 0, 0, pos, length, lines)
+                    pos = last
+                    continue
+            elif kind:
+                yield make(operators[source[pos:last]], source[pos:last], 0, 0, pos, length, lines)
+                pos = last
                 continue
             
-            # 运算符和分隔符
-            if char == '+':
-                self.tokens.append(Token(TokenType.PLUS, '+', start_line, start_column))
-                self.advance()
-            elif char == '-':
-                self.tokens.append(Token(TokenType.MINUS, '-', start_line, start_column))
-                self.advance()
-            elif char == '*':
-                self.tokens.append(Token(TokenType.MULTIPLY, '*', start_line, start_column))
-                self.advance()
-            elif char == '/':
-                self.tokens.append(Token(TokenType.DIVIDE, '/', start_line, start_column))
-                self.advance()
-            elif char == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', start_line, start_column))
-                self.advance()
-            elif char == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', start_line, start_column))
-                self.advance()
-            elif char == ';':
-                self.tokens.append(Token(TokenType.SEMICOLON, ';', start_line, start_column))
-                self.advance()
-            elif char == ',':
-                self.tokens.append(Token(TokenType.COMMA, ',', start_line, start_column))
-                self.advance()
-            elif char == '.':
-                self.tokens.append(Token(TokenType.DOT, '.', start_line, start_column))
-                self.advance()
-            elif char == ':':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.ASSIGN, ':=', start_line, start_column))
-                    self.advance()
-                    self.advance()
-                else:
-                    # 单独的冒号（用于变量声明）
-                    self.tokens.append(Token(TokenType.COLON, ':', start_line, start_column))
-                    self.advance()
-            elif char == '<':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.LE, '<=', start_line, start_column))
-                    self.advance()
-                    self.advance()
-                elif self.peek_char() == '>':
-                    self.tokens.append(Token(TokenType.NE, '<>', start_line, start_column))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.LT, '<', start_line, start_column))
-                    self.advance()
-            elif char == '>':
-                if self.peek_char() == '=':
-                    self.tokens.append(Token(TokenType.GE, '>=', start_line, start_column))
-                    self.advance()
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.GT, '>', start_line, start_column))
-                    self.advance()
-            elif char == '=':
-                self.tokens.append(Token(TokenType.EQ, '=', start_line, start_column))
-                self.advance()
+            # 回退到逐字符扫描
+            self.pos = pos
+            token = self.scan_token()
+            if make is not Token:
+                token = make(token.type, token.value, 0, 0, token.offset, token.length, lines)
+            yield token
+            pos = self.pos
+        
+        self.pos = pos
+        yield make(TokenType.EOF, '', 0, 0, pos, 0, lines)
+    
+    def apply_edit(self, offset: int, removed: int, inserted: str) -> Tuple[int, int, int]:
+        """
+        把源代码中 [offset, offset + removed) 替换为 inserted，增量更新 self.tokens
+        
+        只从编辑点之前最后一个完整 Token 的末尾开始重新分析，一旦新 Token
+        与编辑区之后的某个旧 Token 对齐（词法分析在 Token 边界处没有状态）就停止，
+        之后的旧 Token 只平移偏移。self.tokens 与共享的 LineIndex 都原地更新，
+        结果与 Lexer(新源代码).tokenize() 相同。
+        
+        Returns:
+            (start, old_end, new_end)：原 self.tokens[start:old_end] 被替换为
+            新 self.tokens[start:new_end]
+        """
+        if self.path is not None or self.pushing:
+            raise ValueError("分块分析时不支持增量编辑")
+        source = self.source
+        if not 0 <= offset <= len(source) or removed < 0 or offset + removed > len(source):
+            raise ValueError(f"编辑范围超出源代码: offset={offset}, removed={removed}")
+        new_source = source[:offset] + inserted + source[offset + removed:]
+        if len(new_source) > self.MAX_SOURCE_LENGTH:
+            raise ValueError(f"源代码过长（超过 {self.MAX_SOURCE_LENGTH} 字符）")
+        delta = len(inserted) - removed
+        edit_end = offset + len(inserted)   # 编辑区在新源代码中的结束位置
+        tokens = self.tokens
+        
+        # 第一个可能受影响的 Token：词素之后最多还会检查 2 个字符（如 '1.' 之后是否为数字），
+        # 末尾与编辑点相距不足 2 个字符的 Token 可能被延长或改变
+        low, high = 0, len(tokens)
+        while low < high:
+            mid = (low + high) // 2
+            if tokens[mid].offset + tokens[mid].length + 2 <= offset:
+                low = mid + 1
             else:
-                # 未知字符
-                self.tokens.append(Token(TokenType.ERROR, char, start_line, start_column))
-                self.advance()
+                high = mid
+        start = low
+        restart = tokens[start - 1].offset + tokens[start - 1].length if start else 0
         
-        # 添加 EOF token
-        self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
-        return self.tokens
+        self.source = new_source
+        self.lines.source = new_source
+        self.lines.starts = None     # 行索引在下次查询时重建
+        
+        relexer = Lexer(new_source, engine=self.engine)
+        relexer.lines = self.lines
+        relexer.names = self.names
+        relexer.words = self.words
+        relexer.pos = restart
+        relexed = []
+        old_end = start
+        for token in relexer.iter_tokens():
+            if token.offset >= edit_end:
+                # 跳过编辑区之前的旧 Token，检查能否与旧 Token 对齐
+                old_offset = token.offset - delta
+                while old_end < len(tokens) and tokens[old_end].offset < old_offset:
+                    old_end += 1
+                if old_end < len(tokens) and tokens[old_end].offset == old_offset:
+                    break
+            relexed.append(token)
+        else:
+            old_end = len(tokens)
+        
+        if delta:
+            for index in range(old_end, len(tokens)):
+                tokens[index].offset += delta
+        tokens[start:old_end] = relexed
+        self.pos = len(new_source)
+        return start, old_end, start + len(relexed)
     
     def save_tokens_to_file(self, filename: str):
-        """将 Token 流保存到文件"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            for token in self.tokens:
-                f.write(f"{token.type.name}\t{token.value}\t{token.line}\t{token.column}\n")
+        """将 Token 流保存为二进制 Token 文件（格式见 TokenBuffer）"""
+        from .token_buffer import TokenBuffer
+        buffer = TokenBuffer(self.lines)
+        for token in self.tokens:
+            buffer.add_token(token)
+        buffer.save(filename)
 
 
 def main():
@@ -421,8 +971,8 @@ def main():
         print(token)
     
     # 保存到文件
-    lexer.save_tokens_to_file("tokens.txt")
-    print("\nToken 流已保存到 tokens.txt")
+    lexer.save_tokens_to_file("tokens.bin")
+    print("\nToken 流已保存到 tokens.bin")
 
 
 if __name__ == "__main__":
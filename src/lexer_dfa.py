@@ -0,0 +1,329 @@
+"""
+表驱动 DFA 词法分析器的规则与编译
+声明式的词法规则 TOKEN_SPEC 经 Thompson 构造和子集构造编译为按字符类索引的
+扁平转移表，供 Lexer 的 dfa 引擎使用；编译结果缓存在磁盘上
+"""
+
+import hashlib
+import os
+import re
+import string
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .lexer import Lexer
+from .result_cache import CACHE_ROOT
+
+
+# ==================== 模式 ====================
+# 模式是可比较、可 repr 的嵌套元组，字符集合用 0..128 的符号编号表示，
+# 其中 OTHER (128) 代表所有非 ASCII 字符
+
+OTHER = 128
+SYMBOLS = 129
+
+
+def chars(text: str) -> tuple:
+    """text 中的任一字符"""
+    return ('set', tuple(sorted({ord(char) for char in text})))
+
+
+def not_chars(text: str) -> tuple:
+    """text 以外的任一字符（含非 ASCII 字符）"""
+    excluded = {ord(char) for char in text}
+    return ('set', tuple(symbol for symbol in range(SYMBOLS) if symbol not in excluded))
+
+
+ANY = ('set', tuple(range(SYMBOLS)))
+
+
+def seq(*patterns) -> tuple:
+    return ('seq', patterns)
+
+
+def alt(*patterns) -> tuple:
+    return ('alt', patterns)
+
+
+def star(pattern) -> tuple:
+    return ('star', pattern)
+
+
+def plus(pattern) -> tuple:
+    return seq(pattern, star(pattern))
+
+
+def opt(pattern) -> tuple:
+    return alt(pattern, seq())
+
+
+def literal(text: str) -> tuple:
+    return seq(*(chars(char) for char in text))
+
+
+# ==================== 词法规则 ====================
+
+# 规则类别（DFA 接受状态中记录的值，0 表示不接受）
+SKIP, WORD, NUMBER, STRING, OPERATOR = 1, 2, 3, 4, 5
+
+LETTERS = string.ascii_letters + '_'
+
+
+def string_literal(quote: str) -> tuple:
+    """引号括起、不跨行（转义除外）的字符串"""
+    return seq(literal(quote),
+               star(alt(not_chars(quote + '\\\n'), seq(literal('\\'), ANY))),
+               literal(quote))
+
+
+# (类别, 模式)，按优先级排列：最长匹配，同样长时取靠前的规则。
+# 关键字不区分大小写，作为标识符匹配后由 Lexer.classify_word() 查表区分；
+# 运算符直接取自 Lexer.OPERATORS，增加运算符只需修改该字典。
+TOKEN_SPEC = (
+    (SKIP, plus(chars(' \t\n\r'))),
+    (SKIP, seq(literal('//'), star(not_chars('\n')), opt(literal('\n')))),
+    (SKIP, seq(literal('{'), star(not_chars('}')), opt(literal('}')))),
+    (WORD, seq(chars(LETTERS), star(chars(LETTERS + string.digits)))),
+    (NUMBER, seq(plus(chars(string.digits)), opt(seq(literal('.'), plus(chars(string.digits)))))),
+    (STRING, alt(string_literal("'"), string_literal('"'))),
+) + tuple((OPERATOR, literal(operator)) for operator in sorted(Lexer.OPERATORS))
+
+
+# ==================== 编译 ====================
+
+class DFATables:
+    """
+    编译后的 DFA
+
+    classes 是 256 字节的 bytes.translate 表（字节 -> 字符类，非 ASCII 字符先替换为 0x80），
+    状态以行偏移（状态号 * nclasses）表示，table[状态 + 字符类] 是下一状态，0 为死状态；
+    accept[状态] 是该状态接受的规则类别。最后一个字符类 end 只用作输入末尾的哨兵，
+    任何状态遇到它都转到死状态，因此驱动循环不需要检查越界。
+    """
+
+    def __init__(self, classes: bytes, table: List[int], accept: List[int], nclasses: int):
+        self.classes = classes
+        self.table = table
+        self.accept = accept
+        self.nclasses = nclasses
+        self.start = nclasses               # 状态 1 的行偏移
+        self.other = classes[0x80]          # 非 ASCII 字符的字符类
+        self.end = bytes([nclasses - 1])    # 输入末尾的哨兵
+
+    @property
+    def nstates(self) -> int:
+        return len(self.table) // self.nclasses
+
+    def encode(self, source: str) -> bytes:
+        """把源代码转换为字符类序列（末尾附加哨兵）"""
+        if source.isascii():
+            data = source.encode('ascii')
+        else:
+            data = NON_ASCII.sub('\x80', source).encode('latin-1')
+        return data.translate(self.classes) + self.end
+
+
+NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def build_nfa(spec) -> Tuple[List[List[Tuple[Optional[tuple], int]]], Dict[int, int]]:
+    """Thompson 构造：返回 (各状态的边 [(符号集合或 None 表示 ε, 目标)], 接受状态 -> 规则序号)"""
+    edges: List[List[Tuple[Optional[tuple], int]]] = [[]]   # 状态 0 为起始状态
+
+    def new_state() -> int:
+        edges.append([])
+        return len(edges) - 1
+
+    def build(pattern, start: int) -> int:
+        """从 start 开始构造 pattern，返回结束状态"""
+        kind = pattern[0]
+        if kind == 'set':
+            end = new_state()
+            edges[start].append((pattern[1], end))
+            return end
+        if kind == 'seq':
+            for part in pattern[1]:
+                start = build(part, start)
+            return start
+        if kind == 'alt':
+            end = new_state()
+            for part in pattern[1]:
+                branch = new_state()
+                edges[start].append((None, branch))
+                edges[build(part, branch)].append((None, end))
+            return end
+        if kind == 'star':
+            loop = new_state()
+            edges[start].append((None, loop))
+            edges[build(pattern[1], loop)].append((None, loop))
+            return loop
+        raise ValueError(f"未知的模式: {kind}")
+
+    accepting = {}
+    for index, (_, pattern) in enumerate(spec):
+        begin = new_state()
+        edges[0].append((None, begin))
+        accepting[build(pattern, begin)] = index
+    return edges, accepting
+
+
+def compile_spec(spec=TOKEN_SPEC) -> DFATables:
+    """把词法规则编译为 DFA（子集构造，字符按在各字符集合中的归属划分为等价类）"""
+    edges, accepting = build_nfa(spec)
+
+    # 字符等价类：归属于同样一组字符集合的符号转移完全相同
+    charsets = sorted({symbols for state in edges for symbols, _ in state if symbols is not None})
+    members = [frozenset(symbols) for symbols in charsets]
+    member_of = dict(zip(charsets, members))
+    signatures: Dict[tuple, int] = {}
+    symbol_class = []
+    for symbol in range(SYMBOLS):
+        signature = tuple(symbol in member for member in members)
+        symbol_class.append(signatures.setdefault(signature, len(signatures)))
+    nclasses = len(signatures) + 1          # 最后一类为输入末尾的哨兵
+    representatives = [symbol_class.index(cls) for cls in range(nclasses - 1)]
+
+    def closure(states) -> FrozenSet[int]:
+        stack = list(states)
+        result = set(stack)
+        while stack:
+            for symbols, target in edges[stack.pop()]:
+                if symbols is None and target not in result:
+                    result.add(target)
+                    stack.append(target)
+        return frozenset(result)
+
+    # 状态 0 为死状态，状态 1 为起始状态
+    dead = frozenset()
+    numbering = {dead: 0, closure([0]): 1}
+    order = [dead, closure([0])]
+    rows: List[List[int]] = []
+    accept: List[int] = []
+    for current in order:
+        row = []
+        for symbol in representatives:
+            targets = [target for state in current for symbols, target in edges[state]
+                       if symbols is not None and symbol in member_of[symbols]]
+            following = closure(targets)
+            if following not in numbering:
+                numbering[following] = len(order)
+                order.append(following)
+            row.append(numbering[following])
+        row.append(0)                       # 哨兵
+        rows.append(row)
+        rules = [accepting[state] for state in current if state in accepting]
+        accept.append(spec[min(rules)][0] if rules else 0)
+
+    classes = bytes(symbol_class[min(byte, OTHER)] for byte in range(256))
+    return make_tables(classes, [target * nclasses for row in rows for target in row],
+                       accept, nclasses)
+
+
+def make_tables(classes: bytes, table: List[int], accept: List[int], nclasses: int) -> DFATables:
+    """由转移表和按状态号排列的 accept 构造 DFATables（accept 展开为按行偏移索引）"""
+    accept_rows = [0] * len(table)
+    for state, kind in enumerate(accept):
+        accept_rows[state * nclasses] = kind
+    return DFATables(classes, table, accept_rows, nclasses)
+
+
+# ==================== 磁盘缓存 ====================
+
+# 编译结果的缓存目录；设为 None 时不读写缓存
+CACHE_DIR: Optional[str] = CACHE_ROOT
+
+# 缓存文件格式（小端序）：
+#   文件头  magic, 版本, 规则摘要(16 字节), 状态数, 字符类数
+#   classes 256 字节
+#   table   int32 * 状态数 * 字符类数
+#   accept  uint8 * 状态数
+# 规则摘要不符（规则被修改）或文件损坏时重新编译并覆盖
+MAGIC = b'MDFA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sH16sII')
+
+
+def spec_digest(spec=TOKEN_SPEC) -> bytes:
+    return hashlib.blake2b(repr((FORMAT_VERSION, spec)).encode('utf-8'), digest_size=16).digest()
+
+
+def cache_path(spec=TOKEN_SPEC) -> Optional[str]:
+    if CACHE_DIR is None:
+        return None
+    return os.path.join(CACHE_DIR, f"lexer-dfa-{spec_digest(spec).hex()}.bin")
+
+
+def save_tables(tables: DFATables, path: str, spec=TOKEN_SPEC):
+    """原子地写入缓存文件（先写临时文件再改名；目录与 DiskCache 共用，只允许当前用户访问）"""
+    nclasses = tables.nclasses
+    table = array('i', tables.table)
+    accept = array('B', tables.accept[::nclasses])
+    if sys.byteorder != 'little':
+        table.byteswap()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, spec_digest(spec),
+                                tables.nstates, nclasses))
+            f.write(tables.classes)
+            f.write(table.tobytes())
+            f.write(accept.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_tables(path: str, spec=TOKEN_SPEC) -> Optional[DFATables]:
+    """读取缓存文件；不存在、损坏或与规则不符时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, digest, nstates, nclasses = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or digest != spec_digest(spec):
+        return None
+    pos = HEADER.size
+    size = nstates * nclasses * 4
+    if len(data) != pos + 256 + size + nstates:
+        return None
+    classes = data[pos:pos + 256]
+    table = array('i')
+    table.frombytes(data[pos + 256:pos + 256 + size])
+    if sys.byteorder != 'little':
+        table.byteswap()
+    accept = list(data[pos + 256 + size:])
+    return make_tables(classes, table.tolist(), accept, nclasses)
+
+
+_tables: Optional[DFATables] = None
+
+
+def load_tables() -> DFATables:
+    """
+    取得 TOKEN_SPEC 编译后的 DFA
+
+    进程内只加载一次；优先读取磁盘缓存，没有可用缓存时编译并尝试写入缓存
+    （缓存目录不可写时忽略）。
+    """
+    global _tables
+    if _tables is None:
+        path = cache_path()
+        tables = read_tables(path) if path else None
+        if tables is None:
+            tables = compile_spec()
+            if path:
+                try:
+                    save_tables(tables, path)
+                except OSError:
+                    pass
+        _tables = tables
+    return _tables
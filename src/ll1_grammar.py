@@ -0,0 +1,297 @@
+"""
+LL(1) 分析表生成器
+读取机器可读的 BNF 文法，计算 FIRST/FOLLOW 集并生成预测分析表，供 parser_ll1 的表驱动分析器使用
+
+用法（打印 Mini 文法的 FIRST/FOLLOW 集和分析表）:
+    python -m src.ll1_grammar
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+# 文法记号：
+#   非终结符 -> 符号 ... | 符号 ...     以 | 开头的行是上一条规则的另一个候选式
+#   终结符为 TokenType 的名字（全大写），非终结符为小写名字，ε 表示空串
+#   #名字 是语义动作，分析器把它和文法符号一起压栈，弹出时执行（不影响 FIRST/FOLLOW）
+#   以 // 开头的行是注释
+#
+# 与 docs/GRAMMAR.md 的 EBNF 相同，只是把 { } 和 [ ] 改写为右递归的尾部规则。
+# 那里的 <comparison> ::= <expression> <relop> <expression> | "(" <condition> ")"
+# 两个候选式都可以以 "(" 开头，不是 LL(1) 的；这里把条件和算术表达式合并为一套文法，
+# 括号内一律按 condition 分析，再由语义动作检查操作数的种类（条件或算术表达式），
+# 接受的语言与 ASTParser 相同。
+MINI_GRAMMAR = """
+program     -> PROGRAM IDENTIFIER SEMICOLON var_part block DOT #program
+
+// 变量声明
+var_part    -> VAR #list var_decl SEMICOLON #pop var_more #declarations
+             | #none
+var_more    -> var_decl SEMICOLON #pop var_more
+             | ε
+var_decl    -> IDENTIFIER #names id_more COLON type #var_decl
+id_more     -> COMMA IDENTIFIER #more_names id_more
+             | ε
+type        -> INTEGER_TYPE
+             | REAL_TYPE
+             | BOOLEAN_TYPE
+             | STRING_TYPE
+
+// 语句
+block       -> BEGIN stmt_list END #block
+stmt_list   -> #list statement #append stmt_more
+stmt_more   -> SEMICOLON #pop statement #append stmt_more
+             | ε
+statement   -> IDENTIFIER ASSIGN expression #arithmetic #assign
+             | IF condition #boolean THEN statement else_part #if
+             | WHILE condition #boolean DO statement #while
+             | block
+             | WRITE LPAREN expression #arithmetic RPAREN #write
+             | READ LPAREN IDENTIFIER RPAREN #read
+             | #empty
+else_part   -> ELSE statement #else
+             | #none
+
+// 条件：or < and < not < 关系运算符
+condition   -> conjunct or_tail
+or_tail     -> OR conjunct #binary or_tail
+             | ε
+conjunct    -> negation and_tail
+and_tail    -> AND negation #binary and_tail
+             | ε
+negation    -> NOT relation #not
+             | relation
+relation    -> expression rel_tail
+rel_tail    -> relop expression #binary
+             | ε
+relop       -> LT | LE | GT | GE | EQ | NE
+
+// 算术表达式：+ - < * /
+expression  -> term add_tail
+add_tail    -> addop term #binary add_tail
+             | ε
+addop       -> PLUS | MINUS
+term        -> factor mul_tail
+mul_tail    -> mulop factor #binary mul_tail
+             | ε
+mulop       -> MULTIPLY | DIVIDE
+factor      -> IDENTIFIER #variable
+             | INTEGER #number
+             | REAL #number
+             | STRING #string
+             | TRUE #true
+             | FALSE #false
+             | LPAREN condition RPAREN #group
+             | MINUS factor #negate
+"""
+
+EPSILON = 'ε'
+END_OF_INPUT = 'EOF'
+
+Production = Tuple[str, Tuple[str, ...]]
+
+
+def is_action(symbol: str) -> bool:
+    return symbol.startswith('#')
+
+
+class Grammar:
+    """
+    LL(1) 文法
+
+    productions 是 (左部, 右部符号元组) 的列表，第一条规则的左部为开始符号。
+    构造时计算 FIRST/FOLLOW 集和预测分析表 table[非终结符][终结符] = 产生式序号。
+    FOLLOW 预测的空候选式与以该终结符开头的候选式冲突时选择后者（悬空 else
+    归属最近的 if），其余冲突说明文法不是 LL(1)，抛出 ValueError。
+    """
+
+    def __init__(self, productions: List[Production]):
+        if not productions:
+            raise ValueError("文法为空")
+        self.productions = productions
+        self.start = productions[0][0]
+        self.nonterminals: List[str] = []
+        for lhs, _ in productions:
+            if lhs not in self.nonterminals:
+                self.nonterminals.append(lhs)
+        self.terminals: Set[str] = {symbol for _, rhs in productions for symbol in rhs
+                                    if symbol not in self.nonterminals and not is_action(symbol)}
+        self.terminals.add(END_OF_INPUT)
+        self.nullable = self.compute_nullable()
+        self.first = self.compute_first()
+        self.follow = self.compute_follow()
+        self.conflicts: List[Tuple[str, str, int, int]] = []   # (非终结符, 终结符, 选用, 舍弃)
+        self.table = self.build_table()
+
+    @classmethod
+    def parse(cls, text: str) -> 'Grammar':
+        """解析文法文本（记号见 MINI_GRAMMAR 前的说明）"""
+        productions: List[Production] = []
+        lhs = None
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith('//'):
+                continue
+            if line.startswith('|'):
+                if lhs is None:
+                    raise ValueError(f"第 {number} 行: 候选式之前没有规则")
+                body = line[1:]
+            else:
+                head, arrow, body = line.partition('->')
+                lhs = head.strip()
+                if not arrow or not lhs.isidentifier() or not lhs.islower():
+                    raise ValueError(f"第 {number} 行: 规则应为 '非终结符 -> 符号 ...'")
+            for alternative in body.split('|'):
+                symbols = tuple(symbol for symbol in alternative.split() if symbol != EPSILON)
+                productions.append((lhs, symbols))
+        grammar = cls(productions)
+        undefined = sorted(symbol for symbol in grammar.terminals if symbol.islower())
+        if undefined:
+            raise ValueError(f"未定义的非终结符: {', '.join(undefined)}")
+        return grammar
+
+    # ==================== FIRST / FOLLOW ====================
+
+    def grammar_symbols(self, rhs: Tuple[str, ...]) -> List[str]:
+        return [symbol for symbol in rhs if not is_action(symbol)]
+
+    def compute_nullable(self) -> Set[str]:
+        nullable: Set[str] = set()
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                if lhs not in nullable and all(symbol in nullable
+                                               for symbol in self.grammar_symbols(rhs)):
+                    nullable.add(lhs)
+                    changed = True
+        return nullable
+
+    def first_of(self, symbols: List[str], first: Dict[str, Set[str]] = None) -> Set[str]:
+        """符号串的 FIRST 集（不含 ε；符号串可空时由 sequence_nullable 判断）"""
+        first = self.first if first is None else first
+        result: Set[str] = set()
+        for symbol in symbols:
+            if symbol in self.terminals:
+                result.add(symbol)
+                break
+            result |= first[symbol]
+            if symbol not in self.nullable:
+                break
+        return result
+
+    def sequence_nullable(self, symbols: List[str]) -> bool:
+        return all(symbol in self.nullable for symbol in symbols)
+
+    def compute_first(self) -> Dict[str, Set[str]]:
+        first: Dict[str, Set[str]] = {name: set() for name in self.nonterminals}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                symbols = self.first_of(self.grammar_symbols(rhs), first)
+                if not symbols <= first[lhs]:
+                    first[lhs] |= symbols
+                    changed = True
+        return first
+
+    def compute_follow(self) -> Dict[str, Set[str]]:
+        follow: Dict[str, Set[str]] = {name: set() for name in self.nonterminals}
+        follow[self.start].add(END_OF_INPUT)
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.productions:
+                symbols = self.grammar_symbols(rhs)
+                for index, symbol in enumerate(symbols):
+                    if symbol in self.terminals:
+                        continue
+                    rest = symbols[index + 1:]
+                    addition = self.first_of(rest)
+                    if self.sequence_nullable(rest):
+                        addition = addition | follow[lhs]
+                    if not addition <= follow[symbol]:
+                        follow[symbol] |= addition
+                        changed = True
+        return follow
+
+    # ==================== 分析表 ====================
+
+    def predict(self, index: int) -> Set[str]:
+        """产生式的预测集：FIRST(右部)，右部可空时再加上 FOLLOW(左部)"""
+        lhs, rhs = self.productions[index]
+        symbols = self.grammar_symbols(rhs)
+        result = self.first_of(symbols)
+        if self.sequence_nullable(symbols):
+            result |= self.follow[lhs]
+        return result
+
+    def build_table(self) -> Dict[str, Dict[str, int]]:
+        table: Dict[str, Dict[str, int]] = {name: {} for name in self.nonterminals}
+        for index, (lhs, rhs) in enumerate(self.productions):
+            row = table[lhs]
+            for terminal in self.predict(index):
+                other = row.get(terminal)
+                if other is None:
+                    row[terminal] = index
+                    continue
+                # 只有 FOLLOW 预测的空候选式让位于以该终结符开头的候选式
+                if self.by_follow(other, terminal) and not self.by_follow(index, terminal):
+                    row[terminal] = index
+                    self.conflicts.append((lhs, terminal, index, other))
+                elif self.by_follow(index, terminal) and not self.by_follow(other, terminal):
+                    self.conflicts.append((lhs, terminal, other, index))
+                else:
+                    raise ValueError(f"文法不是 LL(1): {lhs} 在 {terminal} 上有两个候选式 "
+                                     f"{self.format_production(other)} 和 "
+                                     f"{self.format_production(index)}")
+        return table
+
+    def nullable_production(self, name: str) -> Optional[int]:
+        """name 可推导出空串的候选式序号，name 不可空时返回 None"""
+        for index, (lhs, rhs) in enumerate(self.productions):
+            if lhs == name and self.sequence_nullable(self.grammar_symbols(rhs)):
+                return index
+        return None
+
+    def by_follow(self, index: int, terminal: str) -> bool:
+        """产生式是否只因 FOLLOW 集而在 terminal 上被预测"""
+        symbols = self.grammar_symbols(self.productions[index][1])
+        return self.sequence_nullable(symbols) and terminal not in self.first_of(symbols)
+
+    # ==================== 输出 ====================
+
+    def format_production(self, index: int) -> str:
+        lhs, rhs = self.productions[index]
+        return f"{lhs} -> {' '.join(rhs) or EPSILON}"
+
+    def format_tables(self) -> str:
+        """FIRST/FOLLOW 集和分析表的文本形式"""
+        lines = ["FIRST / FOLLOW:"]
+        width = max(len(name) for name in self.nonterminals)
+        for name in self.nonterminals:
+            first = sorted(self.first[name]) + ([EPSILON] if name in self.nullable else [])
+            lines.append(f"  {name:<{width}}  FIRST = {{{', '.join(first)}}}")
+            lines.append(f"  {'':<{width}}  FOLLOW = {{{', '.join(sorted(self.follow[name]))}}}")
+        lines.append("")
+        lines.append("分析表:")
+        for name in self.nonterminals:
+            for terminal, index in sorted(self.table[name].items()):
+                lines.append(f"  M[{name}, {terminal}] = {self.format_production(index)}")
+        for lhs, terminal, chosen, dropped in self.conflicts:
+            lines.append(f"  冲突 M[{lhs}, {terminal}]: 选用 {self.format_production(chosen)}，"
+                         f"舍弃 {self.format_production(dropped)}")
+        return "\n".join(lines)
+
+
+_grammar: Optional[Grammar] = None
+
+
+def mini_grammar() -> Grammar:
+    """Mini 语言的 LL(1) 文法（进程内只生成一次）"""
+    global _grammar
+    if _grammar is None:
+        _grammar = Grammar.parse(MINI_GRAMMAR)
+    return _grammar
+
+
+if __name__ == "__main__":
+    print(mini_grammar().format_tables())
@@ -3,12 +3,61 @@ Mini 语言递归下降语法分析器 (AST 生成版本)
 在解析的同时构建抽象语法树 (AST)
 """
 
-from typing import List, Optional, Set
-from .lexer import Token, TokenType, Lexer
+import os
+import threading
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+from .lexer import Token, TokenType, Lexer, LineIndex, NameTable
+from .token_stream import TokenStream
+from .token_buffer import TokenBuffer
+from .result_cache import LRUCache, DiskCache, CACHE_ROOT, source_hash
 from .ast_nodes import *
 from .symbol_table import Symbol, SymbolType, ScopedSymbolTable, type_string_to_enum
 
 
+# 运算符结合力，越大结合越紧。or/and 只出现在条件中，+ - * / 只出现在算术表达式中；
+# not 是前缀运算符，只作用于其后的一个比较；关系运算符不结合，每个比较恰好有一个
+OR_POWER = 1
+AND_POWER = 2
+NOT_POWER = 3
+RELATIONAL_POWER = 4
+ADDITIVE_POWER = 5
+MULTIPLICATIVE_POWER = 6
+
+# 二元运算符 -> (结合力, 缺少右操作数时的错误信息)
+BINARY_OPERATORS = {
+    TokenType.OR: (OR_POWER, "'or' 运算符后缺少有效的条件表达式"),
+    TokenType.AND: (AND_POWER, "'and' 运算符后缺少有效的条件表达式"),
+    TokenType.LT: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.LE: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.GT: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.GE: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.EQ: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.NE: (RELATIONAL_POWER, "关系运算符后缺少表达式"),
+    TokenType.PLUS: (ADDITIVE_POWER, "运算符 '+'/'-' 后缺少项"),
+    TokenType.MINUS: (ADDITIVE_POWER, "运算符 '+'/'-' 后缺少项"),
+    TokenType.MULTIPLY: (MULTIPLICATIVE_POWER, "运算符 '*'/'/' 后缺少因子"),
+    TokenType.DIVIDE: (MULTIPLICATIVE_POWER, "运算符 '*'/'/' 后缺少因子"),
+}
+
+RELATIONAL_OPERATORS = frozenset(token_type for token_type, (power, _) in BINARY_OPERATORS.items()
+                                 if power == RELATIONAL_POWER)
+
+# 变量类型关键字
+TYPE_KEYWORDS = frozenset({TokenType.INTEGER_TYPE, TokenType.REAL_TYPE,
+                           TokenType.BOOLEAN_TYPE, TokenType.STRING_TYPE})
+
+# 错误恢复的同步集（synchronize() 跳到其中的 Token 或 EOF 为止），预先构造以免每次新建集合
+SYNC_DECLARATIONS = frozenset({TokenType.VAR, TokenType.BEGIN})                   # 程序头之后
+SYNC_BLOCK_END = frozenset({TokenType.DOT, TokenType.SEMICOLON})                  # 缺少 end
+SYNC_STATEMENT = frozenset({TokenType.SEMICOLON, TokenType.END, TokenType.ELSE})  # 无效的语句开始
+SYNC_STATEMENT_END = frozenset({TokenType.SEMICOLON, TokenType.END})              # 语句内部出错
+SYNC_ARGUMENT = frozenset({TokenType.RPAREN, TokenType.SEMICOLON})                # write/read 的参数
+SYNC_THEN = frozenset({TokenType.THEN})
+SYNC_DO = frozenset({TokenType.DO})
+SYNC_BODY = frozenset({TokenType.IDENTIFIER, TokenType.IF, TokenType.WHILE,       # 缺少 then/do
+                       TokenType.BEGIN, TokenType.SEMICOLON})
+
+
 class ParseError(Exception):
     """语法分析错误异常"""
     def __init__(self, message: str, token: Token, source_line: str = ""):
@@ -37,28 +86,121 @@ class ASTParser:
     MAX_NESTING_DEPTH = 50
     MAX_EXPRESSION_DEPTH = 50
     
-    def __init__(self, tokens: List[Token], source_code: str = ""):
+    # AST 节点的构造函数，语法分析函数通过 self 调用；
+    # SyntaxRecognizer 把它们换成不创建对象的 recognized()
+    Program = Program
+    VarDeclarations = VarDeclarations
+    VarDecl = VarDecl
+    Block = Block
+    Assignment = Assignment
+    IfStatement = IfStatement
+    WhileStatement = WhileStatement
+    EmptyStatement = EmptyStatement
+    WriteStatement = WriteStatement
+    ReadStatement = ReadStatement
+    BinaryOp = BinaryOp
+    UnaryOp = UnaryOp
+    Number = Number
+    String = String
+    Boolean = Boolean
+    Variable = Variable
+    
+    # 按当前 Token 种类选择语法规则：Token 种类 -> 方法名（FIRST 集）。
+    # 每个类（包括子类）按方法名取出自己的实现，存入 statement_rules / factor_rules
+    STATEMENT_RULES = {
+        TokenType.IDENTIFIER: 'assignment_stmt',
+        TokenType.IF: 'if_stmt',
+        TokenType.WHILE: 'while_stmt',
+        TokenType.BEGIN: 'block',
+        TokenType.WRITE: 'write_stmt',
+        TokenType.READ: 'read_stmt',
+        TokenType.END: 'empty_stmt',
+        TokenType.SEMICOLON: 'empty_stmt',
+    }
+    FACTOR_RULES = {
+        TokenType.IDENTIFIER: 'variable_factor',
+        TokenType.INTEGER: 'number_factor',
+        TokenType.REAL: 'number_factor',
+        TokenType.STRING: 'string_factor',
+        TokenType.TRUE: 'boolean_factor',
+        TokenType.FALSE: 'boolean_factor',
+        TokenType.LPAREN: 'parenthesized_factor',
+        TokenType.MINUS: 'negated_factor',
+    }
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.build_rule_tables()
+    
+    @classmethod
+    def build_rule_tables(cls):
+        """由 STATEMENT_RULES / FACTOR_RULES 生成本类的分派表（Token 种类 -> 函数）"""
+        cls.statement_rules = {kind: getattr(cls, name) for kind, name in cls.STATEMENT_RULES.items()}
+        cls.factor_rules = {kind: getattr(cls, name) for kind, name in cls.FACTOR_RULES.items()}
+    
+    def __init__(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+                 source_code: str = "", lookahead: int = TokenStream.DEFAULT_LOOKAHEAD,
+                 names: Optional[NameTable] = None):
+        """
+        tokens 可以是 Token 列表、列式 TokenBuffer，也可以是 Token 迭代器
+        （如 Lexer.iter_tokens()）。迭代器会被包装为有界前瞻的 TokenStream（流式模式），
+        此时 self.stream 指向该缓冲区，否则为 None。
+        TokenBuffer 模式下直接读取类型列，只在需要时创建 Token 对象。
+        names 是词法分析时建立的名字表（Lexer.names），省略时新建。
+        """
+        self.lookahead = lookahead
+        self.reset(tokens, source_code, names)
+    
+    def reset(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+              source_code: str = "", names: Optional[NameTable] = None):
+        """
+        改为解析新的 Token 序列，复用同一个 ASTParser（参数含义同构造函数）
+        
+        之前返回的 AST、错误列表和符号表不受影响。
+        """
+        self.stream = None
+        self.buffer = None
+        if isinstance(tokens, TokenBuffer):
+            self.buffer = tokens
+        elif not isinstance(tokens, (list, tuple)):
+            if not isinstance(tokens, TokenStream):
+                tokens = TokenStream(tokens, self.lookahead)
+            self.stream = tokens
         self.tokens = tokens
         self.source_code = source_code
-        self.pos = 0
-        self.current_token = tokens[0] if tokens else None
+        self.pos = -1
+        self.current_type: Optional[TokenType] = None
+        self._current_token: Optional[Token] = None
+        self.advance()
+        self.pos = max(self.pos, 0)
         self.errors: List[str] = []
         self.success = True
         
-        # 符号表
-        self.symbol_table = ScopedSymbolTable()
+        # 符号表（与 AST 节点共用同一个名字表）
+        self.symbol_table = ScopedSymbolTable(names)
+        self.names = self.symbol_table.names
+        
+        # 括号处回溯解析的记忆表 (规则, 位置) -> 结果，见 comparison()
+        self.memo = {}
+        self.speculating = 0
         
         # 递归深度跟踪
         self.recursion_depth = 0
         self.nesting_depth = 0
         self.expression_depth = 0
-        self.source_lines = source_code.split('\n') if source_code else []
+        
+        # 行索引：与 Lexer 共享同一源代码的索引，否则按需新建（不预先切分行）
+        if self.buffer is not None:
+            lines = self.buffer.lines
+        else:
+            lines = self.current_token.lines if self.current_token else None
+        if lines is None or lines.source is not source_code:
+            lines = LineIndex(source_code)
+        self.lines = lines
     
     def get_source_line(self, line_number: int) -> str:
         """获取源代码的特定行"""
-        if 0 < line_number <= len(self.source_lines):
-            return self.source_lines[line_number - 1]
-        return ""
+        return self.lines.line_text(line_number)
     
     def check_recursion_depth(self, context: str = ""):
         """检查递归深度，防止栈溢出"""
@@ -81,33 +223,64 @@ class ASTParser:
             return False
         return True
     
+    @property
+    def current_token(self) -> Optional[Token]:
+        """当前 token（TokenBuffer 模式下首次访问时才创建）"""
+        token = self._current_token
+        if token is None and self.current_type is not None:
+            token = self._current_token = self.tokens[self.pos]
+        return token
+    
+    def current_lexeme(self) -> Tuple[str, int, int]:
+        """当前 token 的 (值, 行号, 列号)；TokenBuffer 模式下直接读取各列"""
+        if self.buffer is not None and self._current_token is None:
+            line, column = self.buffer.position(self.pos)
+            return self.buffer.value(self.pos), line, column
+        token = self.current_token
+        return token.value, token.line, token.column
+    
     def advance(self):
-        """移动到下一个 token"""
-        if self.pos < len(self.tokens) - 1:
-            self.pos += 1
-            self.current_token = self.tokens[self.pos]
+        """移动到下一个 token（停在最后一个 token 上）"""
+        pos = self.pos + 1
+        try:
+            if self.buffer is None:
+                token = self.tokens[pos]
+                token_type = token.type
+            else:
+                token = None
+                token_type = self.buffer.kind(pos)
+        except IndexError:
+            return
+        self.pos = pos
+        self.current_type = token_type
+        self._current_token = token
     
     def peek(self, offset: int = 1) -> Optional[Token]:
         """向前看 offset 个 token"""
-        pos = self.pos + offset
-        if pos < len(self.tokens):
-            return self.tokens[pos]
-        return None
+        try:
+            return self.tokens[self.pos + offset]
+        except IndexError:
+            return None
     
     def check(self, *token_types: TokenType) -> bool:
-        """检查当前 token 是否匹配给定类型（不消费）"""
-        return self.current_token and self.current_token.type in token_types
+        """
+        检查当前 token 是否匹配给定类型（不消费）
+        
+        语法分析函数直接比较 self.current_type（is 或 in 预先构造的 frozenset），
+        不经过这里以免每次调用都打包参数元组
+        """
+        return self.current_type in token_types
     
     def match(self, *token_types: TokenType) -> bool:
         """检查并消费 token（如果匹配）"""
-        if self.check(*token_types):
+        if self.current_type in token_types:
             self.advance()
             return True
         return False
     
     def expect(self, token_type: TokenType, error_msg: str = None) -> Optional[Token]:
         """期望当前 token 为指定类型，否则报错"""
-        if not self.check(token_type):
+        if self.current_type is not token_type:
             if error_msg is None:
                 error_msg = f"期望 {token_type.name}，但得到 {self.current_token.type.name}"
             self.error(error_msg)
@@ -123,9 +296,9 @@ class ASTParser:
         self.errors.append(error_info)
         self.success = False
     
-    def synchronize(self, sync_set: Set[TokenType]):
-        """错误恢复：跳过 token 直到遇到同步集中的 token"""
-        while not self.check(TokenType.EOF) and self.current_token.type not in sync_set:
+    def synchronize(self, sync_set: FrozenSet[TokenType]):
+        """错误恢复：跳过 token 直到遇到同步集（见 SYNC_*）中的 token 或 EOF"""
+        while self.current_type is not TokenType.EOF and self.current_type not in sync_set:
             self.advance()
     
     # ==================== 语法分析函数 (生成 AST) ====================
@@ -134,32 +307,49 @@ class ASTParser:
         """解析入口：<program>"""
         try:
             ast = self.program()
-            if not self.check(TokenType.EOF):
+            if self.current_type is not TokenType.EOF:
                 self.error(f"程序结束后有多余的内容: {self.current_token.value}")
             return ast if self.success else None
         except ParseError as e:
             self.errors.append(str(e))
             return None
     
+    def iter_statements(self) -> Iterator[Statement]:
+        """
+        流式解析入口：主程序语句块中的每条顶层语句一分析完就产出
+        
+        程序头分析完后 self.header 为不含语句块的 Program（程序名和变量声明）。
+        产出的语句与 parse() 返回的 AST 中的相同，解析器不再保留它们，调用方处理完即可丢弃；
+        与 Token 迭代器（流式模式）配合时，得到第一条语句的时间和内存占用都与程序总长度无关。
+        出现语法错误后不再产出语句，但继续分析到程序末尾，迭代结束后 self.errors 与 parse() 相同。
+        """
+        self.header = None
+        try:
+            header = self.program_header()
+            if header is not None:
+                name_token, var_declarations = header
+                self.header = self.Program(name=name_token.value, var_declarations=var_declarations,
+                                           line=name_token.line, column=name_token.column)
+                if self.expect(TokenType.BEGIN, "缺少 'begin'"):
+                    for stmt in self.iter_statement_list():
+                        if self.success:
+                            yield stmt
+                    if not self.expect(TokenType.END, "缺少 'end'"):
+                        self.synchronize(SYNC_BLOCK_END)
+                self.expect(TokenType.DOT, "程序必须以 '.' 结尾")
+            if self.current_type is not TokenType.EOF:
+                self.error(f"程序结束后有多余的内容: {self.current_token.value}")
+        except ParseError as e:
+            self.errors.append(str(e))
+    
     def program(self) -> Optional[Program]:
         """
         <program> ::= "program" IDENTIFIER ";" [<var_declarations>] <block> "."
         """
-        if not self.expect(TokenType.PROGRAM, "程序必须以 'program' 关键字开头"):
-            return None
-        
-        name_token = self.expect(TokenType.IDENTIFIER, "program 后应跟程序名标识符")
-        if not name_token:
+        header = self.program_header()
+        if header is None:
             return None
-        program_name = name_token.value
-        
-        if not self.expect(TokenType.SEMICOLON, "程序名后缺少分号 ';'"):
-            self.synchronize({TokenType.VAR, TokenType.BEGIN})
-        
-        # 可选的变量声明
-        var_declarations = None
-        if self.check(TokenType.VAR):
-            var_declarations = self.var_declarations()
+        name_token, var_declarations = header
         
         # 程序体
         block = self.block()
@@ -167,14 +357,36 @@ class ASTParser:
         if not self.expect(TokenType.DOT, "程序必须以 '.' 结尾"):
             return None
         
-        return Program(
-            name=program_name,
+        return self.Program(
+            name=name_token.value,
             var_declarations=var_declarations,
             block=block,
             line=name_token.line,
             column=name_token.column
         )
     
+    def program_header(self) -> Optional[Tuple[Token, Optional[VarDeclarations]]]:
+        """
+        "program" IDENTIFIER ";" [<var_declarations>]
+        
+        返回 (程序名 Token, 变量声明)，缺少 program 或程序名时返回 None
+        """
+        if not self.expect(TokenType.PROGRAM, "程序必须以 'program' 关键字开头"):
+            return None
+        
+        name_token = self.expect(TokenType.IDENTIFIER, "program 后应跟程序名标识符")
+        if not name_token:
+            return None
+        
+        if not self.expect(TokenType.SEMICOLON, "程序名后缺少分号 ';'"):
+            self.synchronize(SYNC_DECLARATIONS)
+        
+        # 可选的变量声明
+        var_declarations = None
+        if self.current_type is TokenType.VAR:
+            var_declarations = self.var_declarations()
+        return name_token, var_declarations
+    
     def var_declarations(self) -> Optional[VarDeclarations]:
         """
         <var_declarations> ::= "var" <var_decl> { ";" <var_decl> } ";"
@@ -205,8 +417,7 @@ class ASTParser:
             
             # 期望类型
             type_token = None
-            if self.check(TokenType.INTEGER_TYPE, TokenType.REAL_TYPE, 
-                         TokenType.BOOLEAN_TYPE, TokenType.STRING_TYPE):
+            if self.current_type in TYPE_KEYWORDS:
                 type_token = self.current_token
                 self.advance()
             else:
@@ -216,25 +427,32 @@ class ASTParser:
             # 创建声明节点并添加到符号表
             var_type = type_token.value.lower()
             for var_name, line, col in var_names:
-                decl = VarDecl(name=var_name, var_type=var_type, line=line, column=col)
+                symbol_id = self.names.intern(var_name)
+                decl = self.VarDecl(name=var_name, var_type=var_type, symbol_id=symbol_id,
+                               line=line, column=col)
                 declarations.append(decl)
                 
                 # 添加到符号表
-                symbol_type = type_string_to_enum(var_type)
-                if symbol_type:
-                    symbol = Symbol(var_name, symbol_type, line, col)
-                    if not self.symbol_table.define(symbol):
-                        self.error(f"变量 '{var_name}' 重复声明")
+                if not self.declare(var_name, var_type, symbol_id, line, col):
+                    self.error(f"变量 '{var_name}' 重复声明")
             
             # 期望分号
             if not self.expect(TokenType.SEMICOLON, "变量声明后期望 ';'"):
                 break
             
             # 如果下一个不是标识符，结束声明
-            if not self.check(TokenType.IDENTIFIER):
+            if self.current_type is not TokenType.IDENTIFIER:
                 break
         
-        return VarDeclarations(declarations=declarations)
+        return self.VarDeclarations(declarations=declarations)
+    
+    def declare(self, name: str, var_type: str, symbol_id: int, line: int, column: int) -> bool:
+        """把变量登记到符号表，重复声明时返回 False"""
+        symbol_type = type_string_to_enum(var_type)
+        if symbol_type:
+            symbol = Symbol(name, symbol_type, line, column, symbol_id=symbol_id)
+            return self.symbol_table.define(symbol)
+        return True
     
     def block(self) -> Optional[Block]:
         """
@@ -246,35 +464,36 @@ class ASTParser:
         statements = self.statement_list()
         
         if not self.expect(TokenType.END, "缺少 'end'"):
-            self.synchronize({TokenType.DOT, TokenType.SEMICOLON})
+            self.synchronize(SYNC_BLOCK_END)
         
-        return Block(statements=statements)
+        return self.Block(statements=statements)
     
     def statement_list(self) -> List[Statement]:
         """
         <statement_list> ::= <statement> { ";" <statement> }
         """
-        statements = []
-        
+        return list(self.iter_statement_list())
+    
+    def iter_statement_list(self) -> Iterator[Statement]:
+        """逐条产出 <statement_list> 中的语句"""
         # 处理空语句块
-        if self.check(TokenType.END):
-            return statements
+        if self.current_type is TokenType.END:
+            return
         
         stmt = self.statement()
         if stmt:
-            statements.append(stmt)
+            yield stmt
         
         # 处理后续语句
-        while self.match(TokenType.SEMICOLON):
+        while self.current_type is TokenType.SEMICOLON:
+            self.advance()
             # 检查是否为语句块结束（允许末尾多余分号）
-            if self.check(TokenType.END):
+            if self.current_type is TokenType.END:
                 break
             
             stmt = self.statement()
             if stmt:
-                statements.append(stmt)
-        
-        return statements
+                yield stmt
     
     def statement(self) -> Optional[Statement]:
         """
@@ -285,27 +504,20 @@ class ASTParser:
                       | <write_stmt>
                       | <read_stmt>
                       | ε
+        
+        按当前 Token 种类在 statement_rules 中查找规则
         """
-        if self.check(TokenType.IDENTIFIER):
-            return self.assignment_stmt()
-        elif self.check(TokenType.IF):
-            return self.if_stmt()
-        elif self.check(TokenType.WHILE):
-            return self.while_stmt()
-        elif self.check(TokenType.BEGIN):
-            return self.block()
-        elif self.check(TokenType.WRITE):
-            return self.write_stmt()
-        elif self.check(TokenType.READ):
-            return self.read_stmt()
-        elif self.check(TokenType.END, TokenType.SEMICOLON):
-            # 空语句
-            return EmptyStatement()
-        else:
-            if not self.check(TokenType.END, TokenType.EOF):
-                self.error(f"无效的语句开始: '{self.current_token.value}'")
-                self.synchronize({TokenType.SEMICOLON, TokenType.END, TokenType.ELSE})
-            return EmptyStatement()
+        rule = self.statement_rules.get(self.current_type)
+        if rule is not None:
+            return rule(self)
+        if self.current_type is not TokenType.EOF:
+            self.error(f"无效的语句开始: '{self.current_token.value}'")
+            self.synchronize(SYNC_STATEMENT)
+        return self.EmptyStatement()
+    
+    def empty_stmt(self) -> Optional[EmptyStatement]:
+        """空语句（当前 Token 为 end 或 ;，不消费）"""
+        return self.EmptyStatement()
     
     def assignment_stmt(self) -> Optional[Assignment]:
         """
@@ -317,18 +529,19 @@ class ASTParser:
         var_name = var_token.value
         
         if not self.expect(TokenType.ASSIGN, "赋值语句缺少 ':=' 运算符"):
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
             return None
         
         expr = self.expression()
         if not expr:
             self.error("赋值语句右侧表达式错误")
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
             return None
         
-        return Assignment(
+        return self.Assignment(
             variable=var_name,
             expression=expr,
+            symbol_id=self.names.intern(var_name),
             line=var_token.line,
             column=var_token.column
         )
@@ -344,21 +557,21 @@ class ASTParser:
         condition = self.condition()
         if not condition:
             self.error("if 语句条件表达式错误")
-            self.synchronize({TokenType.THEN})
+            self.synchronize(SYNC_THEN)
         
         if not self.expect(TokenType.THEN, "if 语句缺少 'then'"):
-            self.synchronize({TokenType.IDENTIFIER, TokenType.IF, TokenType.WHILE, 
-                            TokenType.BEGIN, TokenType.SEMICOLON})
+            self.synchronize(SYNC_BODY)
             return None
         
         then_stmt = self.statement()
         
         # 可选的 else 部分
         else_stmt = None
-        if self.match(TokenType.ELSE):
+        if self.current_type is TokenType.ELSE:
+            self.advance()
             else_stmt = self.statement()
         
-        return IfStatement(
+        return self.IfStatement(
             condition=condition,
             then_statement=then_stmt,
             else_statement=else_stmt,
@@ -377,16 +590,15 @@ class ASTParser:
         condition = self.condition()
         if not condition:
             self.error("while 语句条件表达式错误")
-            self.synchronize({TokenType.DO})
+            self.synchronize(SYNC_DO)
         
         if not self.expect(TokenType.DO, "while 语句缺少 'do'"):
-            self.synchronize({TokenType.IDENTIFIER, TokenType.IF, TokenType.WHILE, 
-                            TokenType.BEGIN, TokenType.SEMICOLON})
+            self.synchronize(SYNC_BODY)
             return None
         
         body = self.statement()
         
-        return WhileStatement(
+        return self.WhileStatement(
             condition=condition,
             body=body,
             line=while_token.line,
@@ -402,19 +614,19 @@ class ASTParser:
             return None
         
         if not self.expect(TokenType.LPAREN, "write 语句后期望 '('"):
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
             return None
         
         expr = self.expression()
         if not expr:
             self.error("write 语句中缺少表达式")
-            self.synchronize({TokenType.RPAREN, TokenType.SEMICOLON})
+            self.synchronize(SYNC_ARGUMENT)
             return None
         
         if not self.expect(TokenType.RPAREN, "write 语句缺少 ')'"):
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
         
-        return WriteStatement(
+        return self.WriteStatement(
             expression=expr,
             line=write_token.line,
             column=write_token.column
@@ -429,81 +641,59 @@ class ASTParser:
             return None
         
         if not self.expect(TokenType.LPAREN, "read 语句后期望 '('"):
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
             return None
         
         var_token = self.expect(TokenType.IDENTIFIER, "read 语句中期望变量名")
         if not var_token:
-            self.synchronize({TokenType.RPAREN, TokenType.SEMICOLON})
+            self.synchronize(SYNC_ARGUMENT)
             return None
         
         var_name = var_token.value
         
         if not self.expect(TokenType.RPAREN, "read 语句缺少 ')'"):
-            self.synchronize({TokenType.SEMICOLON, TokenType.END})
+            self.synchronize(SYNC_STATEMENT_END)
         
-        return ReadStatement(
+        return self.ReadStatement(
             variable=var_name,
+            symbol_id=self.names.intern(var_name),
             line=read_token.line,
             column=read_token.column
         )
     
-    def condition(self) -> Optional[Expression]:
+    def condition(self, min_power: int = OR_POWER) -> Optional[Expression]:
         """
         <condition> ::= <or_term> { "or" <or_term> }
-        """
-        left = self.or_term()
-        if not left:
-            return None
+        <or_term>   ::= <not_term> { "and" <not_term> }
+        <not_term>  ::= [ "not" ] <comparison>
         
-        while self.check(TokenType.OR):
+        按 BINARY_OPERATORS 中的结合力做优先级爬升，只接受结合力在
+        [min_power, NOT_POWER) 之间的运算符（即 or 和 and），均为左结合
+        """
+        if self.current_type is TokenType.NOT:
             op_token = self.current_token
             self.advance()
-            right = self.or_term()
-            if not right:
-                self.error("'or' 运算符后缺少有效的条件表达式")
+            operand = self.comparison()
+            if not operand:
+                return None
+            left = self.UnaryOp(op=op_token, operand=operand)
+        else:
+            left = self.comparison()
+            if not left:
                 return None
-            left = BinaryOp(left=left, op=op_token, right=right)
-        
-        return left
-    
-    def or_term(self) -> Optional[Expression]:
-        """
-        <or_term> ::= <and_term> { "and" <and_term> }
-        """
-        left = self.and_term()
-        if not left:
-            return None
         
-        while self.check(TokenType.AND):
+        while True:
+            entry = BINARY_OPERATORS.get(self.current_type)
+            if entry is None or not min_power <= entry[0] < NOT_POWER:
+                return left
+            power, message = entry
             op_token = self.current_token
             self.advance()
-            right = self.and_term()
+            right = self.condition(power + 1)
             if not right:
-                self.error("'and' 运算符后缺少有效的条件表达式")
-                return None
-            left = BinaryOp(left=left, op=op_token, right=right)
-        
-        return left
-    
-    def and_term(self) -> Optional[Expression]:
-        """
-        <and_term> ::= <not_term>
-        """
-        return self.not_term()
-    
-    def not_term(self) -> Optional[Expression]:
-        """
-        <not_term> ::= [ "not" ] <comparison>
-        """
-        if self.match(TokenType.NOT):
-            op_token = self.tokens[self.pos - 1]  # 获取刚消费的 NOT token
-            operand = self.comparison()
-            if not operand:
+                self.error(message)
                 return None
-            return UnaryOp(op=op_token, operand=operand)
-        
-        return self.comparison()
+            left = self.BinaryOp(left=left, op=op_token, right=right)
     
     def comparison(self) -> Optional[Expression]:
         """
@@ -520,101 +710,131 @@ class ASTParser:
         
         We check if after parsing an expression and closing paren, there's a relop.
         If yes, it's case 1. If no, we need to reparse as condition.
+        
+        回溯会让嵌套括号的每一层重复解析内层，因此以 "(" 开头的 comparison() 和
+        factor() 的结果按 (规则, 位置) 记忆化（packrat），保证解析时间与输入长度成线性
         """
-        # Special handling for parenthesized conditions
-        # We need to distinguish (x > 0) from (x + y)
-        if self.check(TokenType.LPAREN):
-            # Save position for potential backtracking
-            saved_pos = self.pos
-            saved_token = self.current_token
-            saved_errors_count = len(self.errors)
-            saved_success = self.success
-            
+        if self.current_type is not TokenType.LPAREN:
+            return self.relation()
+        
+        key = ('comparison', self.pos)
+        entry = self.memo.get(key)
+        if entry is not None:
+            return self.recall(entry)
+        errors_count = len(self.errors)
+        self.speculating += 1
+        try:
+            result = self.parenthesized_comparison()
+        finally:
+            self.speculating -= 1
+        self.remember(key, result, errors_count)
+        return result
+    
+    def parenthesized_comparison(self) -> Optional[Expression]:
+        """以 "(" 开头的 <comparison>：先试探 "(" <condition> ")"，不成立时回溯"""
+        # Save position for potential backtracking
+        saved_pos = self.pos
+        saved_type = self.current_type
+        saved_token = self._current_token
+        saved_errors_count = len(self.errors)
+        saved_success = self.success
+        
+        # In streaming mode, pin the tokens we may need to rewind over
+        if self.stream is not None:
+            self.stream.mark(saved_pos)
+        try:
             # Try to parse as parenthesized condition first
             self.advance()  # consume '('
             cond = self.condition()
             
-            if cond and self.check(TokenType.RPAREN):
+            if cond and self.current_type is TokenType.RPAREN:
                 self.advance()  # consume ')'
                 # Check if there's a relop after the closing paren
                 # If yes, this was actually an expression, not a condition
-                if self.check(TokenType.LT, TokenType.LE, TokenType.GT, 
-                             TokenType.GE, TokenType.EQ, TokenType.NE):
-                    # Backtrack - this is actually (expr) relop (expr)
-                    self.pos = saved_pos
-                    self.current_token = saved_token
-                    # Remove any errors added during the failed parse
-                    self.errors = self.errors[:saved_errors_count]
-                    self.success = saved_success
-                    # Fall through to parse as expression
-                else:
+                if self.current_type not in RELATIONAL_OPERATORS:
                     # This is a valid parenthesized condition
                     return cond
-            else:
-                # Failed to parse as condition, backtrack
-                self.pos = saved_pos
-                self.current_token = saved_token
-                self.errors = self.errors[:saved_errors_count]
-                self.success = saved_success
-                # Fall through to parse as expression
-        
-        # Parse as: <expression> <relop> <expression>
+            
+            # Backtrack - this is actually (expr) relop (expr),
+            # or it failed to parse as a condition
+            self.pos = saved_pos
+            self.current_type = saved_type
+            self._current_token = saved_token
+            # Remove any errors added during the failed parse
+            self.errors = self.errors[:saved_errors_count]
+            self.success = saved_success
+            # Fall through to parse as expression
+        finally:
+            if self.stream is not None:
+                self.stream.release(saved_pos)
+        
+        return self.relation()
+    
+    def relation(self) -> Optional[Expression]:
+        """<expression> <relop> <expression>"""
         left = self.expression()
         if not left:
             return None
         
         # Check for relational operator
-        if self.check(TokenType.LT, TokenType.LE, TokenType.GT, 
-                     TokenType.GE, TokenType.EQ, TokenType.NE):
+        if self.current_type in RELATIONAL_OPERATORS:
             op_token = self.current_token
             self.advance()
             right = self.expression()
             if not right:
-                self.error("关系运算符后缺少表达式")
+                self.error(BINARY_OPERATORS[op_token.type][1])
                 return None
-            return BinaryOp(left=left, op=op_token, right=right)
+            return self.BinaryOp(left=left, op=op_token, right=right)
         else:
             # No relational operator found
             self.error("条件表达式缺少关系运算符")
             return None
     
-    def expression(self) -> Optional[Expression]:
-        """
-        <expression> ::= <term> { ("+" | "-") <term> }
+    def recall(self, entry) -> Optional[Expression]:
+        """重放记忆化的解析结果：跳到当时的结束位置并补记当时产生的错误"""
+        result, self.pos, self.current_type, self._current_token, errors = entry
+        if errors:
+            self.errors.extend(errors)
+            self.success = False
+        return result
+    
+    def remember(self, key: Tuple[str, int], result: Optional[Expression], errors_count: int):
         """
-        left = self.term()
-        if not left:
-            return None
-        
-        while self.check(TokenType.PLUS, TokenType.MINUS):
-            op_token = self.current_token
-            self.advance()
-            right = self.term()
-            if not right:
-                self.error("运算符 '+'/'-' 后缺少项")
-                return None
-            left = BinaryOp(left=left, op=op_token, right=right)
+        记录 key 处的解析结果
         
-        return left
+        只有在括号条件的试探中（speculating > 0）才可能回溯到同一位置，
+        最外层试探结束后清空记忆表，使其大小不超过最长的回溯片段
+        """
+        if self.speculating:
+            self.memo[key] = (result, self.pos, self.current_type, self._current_token,
+                              self.errors[errors_count:])
+        elif self.memo:
+            self.memo.clear()
     
-    def term(self) -> Optional[Expression]:
+    def expression(self, min_power: int = ADDITIVE_POWER) -> Optional[Expression]:
         """
-        <term> ::= <factor> { ("*" | "/") <factor> }
+        <expression> ::= <term> { ("+" | "-") <term> }
+        <term>       ::= <factor> { ("*" | "/") <factor> }
+        
+        按 BINARY_OPERATORS 中的结合力做优先级爬升，只接受结合力不小于
+        min_power 的运算符（关系和逻辑运算符的结合力都更小），均为左结合
         """
         left = self.factor()
         if not left:
             return None
         
-        while self.check(TokenType.MULTIPLY, TokenType.DIVIDE):
+        while True:
+            entry = BINARY_OPERATORS.get(self.current_type)
+            if entry is None or entry[0] < min_power:
+                return left
+            power, message = entry
             op_token = self.current_token
             self.advance()
-            right = self.factor()
+            right = self.expression(power + 1)
             if not right:
-                self.error("运算符 '*'/'/' 后缺少因子")
+                self.error(message)
                 return None
-            left = BinaryOp(left=left, op=op_token, right=right)
-        
-        return left
+            left = self.BinaryOp(left=left, op=op_token, right=right)
     
     def factor(self) -> Optional[Expression]:
         """
@@ -623,65 +843,67 @@ class ASTParser:
                    | TRUE | FALSE
                    | "(" <expression> ")"
                    | "-" <factor>
-        """
-        # 标识符（变量）
-        if self.check(TokenType.IDENTIFIER):
-            token = self.current_token
-            self.advance()
-            
-            return Variable(name=token.value, line=token.line, column=token.column)
-        
-        # 整数
-        if self.check(TokenType.INTEGER):
-            token = self.current_token
-            self.advance()
-            return Number(value=float(token.value), line=token.line, column=token.column)
-        
-        # 浮点数
-        if self.check(TokenType.REAL):
-            token = self.current_token
-            self.advance()
-            return Number(value=float(token.value), line=token.line, column=token.column)
-        
-        # 字符串
-        if self.check(TokenType.STRING):
-            token = self.current_token
-            self.advance()
-            return String(value=token.value, line=token.line, column=token.column)
-        
-        # 布尔值
-        if self.check(TokenType.TRUE):
-            token = self.current_token
-            self.advance()
-            return Boolean(value=True, line=token.line, column=token.column)
-        
-        if self.check(TokenType.FALSE):
-            token = self.current_token
-            self.advance()
-            return Boolean(value=False, line=token.line, column=token.column)
-        
-        # 括号表达式
-        if self.match(TokenType.LPAREN):
-            expr = self.expression()
-            if not expr:
-                self.error("括号内表达式错误")
-                return None
-            if not self.expect(TokenType.RPAREN, "表达式缺少右括号 ')'"):
-                return None
-            return expr
         
-        # 负号
-        if self.match(TokenType.MINUS):
-            op_token = self.tokens[self.pos - 1]
-            operand = self.factor()
-            if not operand:
-                return None
-            return UnaryOp(op=op_token, operand=operand)
+        按当前 Token 种类在 factor_rules 中查找规则
+        """
+        rule = self.factor_rules.get(self.current_type)
+        if rule is not None:
+            return rule(self)
         
         # 错误情况
         self.error(f"表达式错误: 期望标识符、数字或表达式，但得到 '{self.current_token.value}'")
         return None
     
+    def variable_factor(self) -> Optional[Variable]:
+        """标识符（变量）"""
+        name, line, column = self.current_lexeme()
+        self.advance()
+        return self.Variable(name=name, symbol_id=self.names.intern(name), line=line, column=column)
+    
+    def number_factor(self) -> Optional[Number]:
+        """整数或浮点数"""
+        value, line, column = self.current_lexeme()
+        self.advance()
+        return self.Number(value=float(value), line=line, column=column)
+    
+    def string_factor(self) -> Optional[String]:
+        """字符串"""
+        value, line, column = self.current_lexeme()
+        self.advance()
+        return self.String(value=value, line=line, column=column)
+    
+    def boolean_factor(self) -> Optional[Boolean]:
+        """布尔值 true / false"""
+        value = self.current_type is TokenType.TRUE
+        _, line, column = self.current_lexeme()
+        self.advance()
+        return self.Boolean(value=value, line=line, column=column)
+    
+    def parenthesized_factor(self) -> Optional[Expression]:
+        """括号表达式（记忆化，见 comparison()）"""
+        key = ('factor', self.pos)
+        entry = self.memo.get(key)
+        if entry is not None:
+            return self.recall(entry)
+        errors_count = len(self.errors)
+        self.advance()
+        expr = self.expression()
+        if not expr:
+            self.error("括号内表达式错误")
+        elif not self.expect(TokenType.RPAREN, "表达式缺少右括号 ')'"):
+            expr = None
+        self.remember(key, expr, errors_count)
+        return expr
+    
+    def negated_factor(self) -> Optional[Expression]:
+        """负号"""
+        op_token = self.current_token
+        self.advance()
+        operand = self.factor()
+        if not operand:
+            return None
+        return self.UnaryOp(op=op_token, operand=operand)
+    
     def get_result(self) -> str:
         """获取分析结果"""
         if self.success and len(self.errors) == 0:
@@ -690,49 +912,195 @@ class ASTParser:
             return "\n".join(self.errors)
 
 
+
+ASTParser.build_rule_tables()
+
+
 # ==================== 便捷函数 ====================
 
-def parse_to_ast(source_code: str, enable_semantic_check: bool = True) -> tuple[Optional[Program], List[str], ScopedSymbolTable]:
+def lexical_error_message(token: Token) -> str:
+    """格式化 ERROR Token 对应的词法错误信息"""
+    return f"词法错误 [行{token.line}:列{token.column}]: 无法识别的字符 '{token.value}'"
+
+
+# parse_to_ast 的结果缓存，键为 (源代码哈希, 是否语义检查)；parse_cache.resize(0) 可关闭缓存
+parse_cache = LRUCache()
+
+# 跨进程共享的磁盘缓存，位于进程内缓存之后。只在调用时传入 use_disk_cache=True 才使用
+# （main.py 和 run_program 默认使用），库函数默认不读写；
+# 设置环境变量 MINI_PARSER_NO_CACHE 或 disk_cache.resize(0) 可全部关闭
+disk_cache = DiskCache(None if os.environ.get('MINI_PARSER_NO_CACHE')
+                       else os.path.join(CACHE_ROOT, 'results'))
+
+
+_compiler_version: Optional[str] = None
+
+
+def compiler_version() -> str:
+    """
+    编译器版本：版本号加上本包各模块的修改时间和大小（与 __pycache__ 校验源文件的方式相同），
+    修改分析器代码后旧的磁盘缓存项不再命中。进程内只计算一次。
+    """
+    global _compiler_version
+    if _compiler_version is None:
+        from . import __version__
+        package = os.path.dirname(os.path.abspath(__file__))
+        with os.scandir(package) as scan:
+            stamps = sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                            for entry in scan if entry.name.endswith('.py'))
+        _compiler_version = f"{__version__}-{source_hash(repr(stamps))}"
+    return _compiler_version
+
+
+def disk_cache_key(digest: str, kind) -> tuple:
+    """磁盘缓存的键：(编译器版本, 源代码哈希, 结果种类)"""
+    return (compiler_version(), digest, kind)
+
+
+def parse_to_ast(source_code: str, enable_semantic_check: bool = True,
+                 streaming: bool = False, use_cache: bool = True,
+                 use_disk_cache: bool = False) -> tuple[Optional[Program], List[str], ScopedSymbolTable]:
     """
     从源代码解析并生成 AST
     
     Args:
         source_code: 源代码字符串
         enable_semantic_check: 是否启用语义检查（默认启用）
+        streaming: 流式模式，Token 边生成边解析，不构建完整 Token 列表；
+                   结果与默认模式相同
+        use_cache: 是否使用 parse_cache。相同源代码直接返回缓存的 AST 和符号表，
+                   它们被所有调用者共享，不得修改（errors 每次返回新的列表）
+        use_disk_cache: 进程内缓存未命中时是否再查 disk_cache（并写入分析结果）；
+                        use_cache 为假时忽略
     
     Returns:
         (ast, errors, symbol_table) 元组
     """
-    lexer = Lexer(source_code)
-    tokens = lexer.tokenize()
+    if not use_cache:
+        return analyze_source(source_code, enable_semantic_check, streaming)
     
-    # 检查词法错误
-    errors = []
-    for token in tokens:
-        if token.type == TokenType.ERROR:
-            errors.append(f"词法错误 [行{token.line}:列{token.column}]: 无法识别的字符 '{token.value}'")
+    digest = source_hash(source_code)
+    key = (digest, enable_semantic_check)
+    result = parse_cache.get(key)
+    if result is None:
+        if use_disk_cache:
+            result = disk_cache.get(disk_cache_key(*key))
+        if result is None:
+            result = analyze_source(source_code, enable_semantic_check, streaming)
+            if use_disk_cache:
+                disk_cache.put(disk_cache_key(*key), result)
+        parse_cache.put(key, result)
+    ast, errors, symbol_table = result
+    return ast, list(errors), symbol_table
+
+
+class Analyzer:
+    """
+    可复用的分析流水线：词法、语法和可选的语义分析
     
-    if errors:
-        return None, errors, None
+    反复分析大量小程序时复用同一组 Lexer、ASTParser 和 SemanticAnalyzer，
+    每次只 reset() 而不重新创建。每次返回的 AST、错误列表和符号表都是新的对象。
+    同一个 Analyzer 不能被多个线程同时使用。
+    """
     
-    # 语法分析
-    parser = ASTParser(tokens, source_code)
-    ast = parser.parse()
+    def __init__(self, engine: str = 'scan'):
+        self.lexer = Lexer("", engine=engine)
+        self.parser: Optional[ASTParser] = None
+        self.recognizer = None
+        self.semantic_analyzer = None
     
-    # 如果语法分析有错误，直接返回
-    if parser.errors:
-        return ast, parser.errors, parser.symbol_table
+    def parser_for(self, tokens, source_code: str, names: NameTable) -> ASTParser:
+        """复用（或首次创建）ASTParser"""
+        if self.parser is None:
+            self.parser = ASTParser(tokens, source_code, names=names)
+        else:
+            self.parser.reset(tokens, source_code, names)
+        return self.parser
     
-    # 语义分析（可选）
-    if enable_semantic_check and ast and parser.symbol_table:
-        from .semantic_analyzer import analyze_semantics
-        semantic_errors = analyze_semantics(ast, parser.symbol_table)
-        if semantic_errors:
-            # 合并错误
-            all_errors = parser.errors + semantic_errors
-            return ast, all_errors, parser.symbol_table
+    def analyze(self, source_code: str, enable_semantic_check: bool = True,
+                streaming: bool = False) -> tuple[Optional[Program], List[str], ScopedSymbolTable]:
+        """分析 source_code，返回 (ast, errors, symbol_table)，参数含义同 parse_to_ast"""
+        lexer = self.lexer
+        lexer.reset(source_code)
+        
+        if streaming:
+            parser = self.parser_for(lexer.iter_tokens(), source_code, lexer.names)
+            ast = parser.parse()
+            # 拉取剩余 Token 以收集全部词法错误
+            parser.stream.drain()
+            errors = [lexical_error_message(token) for token in parser.stream.errors]
+        else:
+            tokens = lexer.tokenize()
+            
+            # 检查词法错误
+            errors = [lexical_error_message(token) for token in tokens
+                      if token.type == TokenType.ERROR]
+            if not errors:
+                # 语法分析
+                parser = self.parser_for(tokens, source_code, lexer.names)
+                ast = parser.parse()
+        
+        if errors:
+            return None, errors, None
+        
+        # 如果语法分析有错误，直接返回
+        if parser.errors:
+            return ast, parser.errors, parser.symbol_table
+        
+        # 语义分析（可选）
+        if enable_semantic_check and ast and parser.symbol_table:
+            from .semantic_analyzer import SemanticAnalyzer
+            if self.semantic_analyzer is None:
+                self.semantic_analyzer = SemanticAnalyzer(parser.symbol_table)
+            else:
+                self.semantic_analyzer.reset(parser.symbol_table)
+            semantic_errors = self.semantic_analyzer.analyze(ast)
+            if semantic_errors:
+                # 合并错误
+                all_errors = parser.errors + semantic_errors
+                return ast, all_errors, parser.symbol_table
+        
+        return ast, parser.errors, parser.symbol_table
     
-    return ast, parser.errors, parser.symbol_table
+    def recognize(self, source_code: str) -> Tuple[bool, List[str]]:
+        """
+        只做词法和语法检查，不构建 AST 和符号表（见 SyntaxRecognizer）
+        
+        返回 (是否符合语法, errors)，errors 与 analyze(source_code, False) 的相同。
+        """
+        lexer = self.lexer
+        lexer.reset(source_code)
+        tokens = lexer.tokenize()
+        errors = [lexical_error_message(token) for token in tokens
+                  if token.type == TokenType.ERROR]
+        if errors:
+            return False, errors
+        
+        from .parser_recognizer import SyntaxRecognizer
+        if self.recognizer is None:
+            self.recognizer = SyntaxRecognizer(tokens, source_code, names=lexer.names)
+        else:
+            self.recognizer.reset(tokens, source_code, lexer.names)
+        recognized = self.recognizer.parse()
+        return bool(recognized), self.recognizer.errors
+
+
+# analyze_source 和 parse_from_source 在每个线程中复用的 Analyzer
+local_analyzers = threading.local()
+
+
+def local_analyzer() -> Analyzer:
+    """当前线程的 Analyzer（首次调用时创建）"""
+    analyzer = getattr(local_analyzers, 'analyzer', None)
+    if analyzer is None:
+        analyzer = local_analyzers.analyzer = Analyzer()
+    return analyzer
+
+
+def analyze_source(source_code: str, enable_semantic_check: bool = True,
+                   streaming: bool = False) -> tuple[Optional[Program], List[str], ScopedSymbolTable]:
+    """parse_to_ast 的实际分析过程（词法、语法和可选的语义分析），不使用缓存"""
+    return local_analyzer().analyze(source_code, enable_semantic_check, streaming)
 
 
 def parse_and_print_ast(source_code: str) -> str:
@@ -755,41 +1123,79 @@ def parse_and_print_ast(source_code: str) -> str:
 
 # ==================== 兼容函数（保持向后兼容）====================
 
-def parse_from_source(source_code: str) -> str:
+def recognize_source(source_code: str, use_disk_cache: bool = False) -> Tuple[bool, List[str]]:
+    """
+    只做词法和语法检查（SyntaxRecognizer），返回 (是否符合语法, errors)
+    
+    不经过 parse_cache；use_disk_cache 为真时结果保存在 disk_cache 中
+    """
+    if not use_disk_cache:
+        return local_analyzer().recognize(source_code)
+    key = disk_cache_key(source_hash(source_code), 'syntax')
+    result = disk_cache.get(key)
+    if result is None:
+        result = local_analyzer().recognize(source_code)
+        disk_cache.put(key, result)
+    return result
+
+
+def parse_from_source(source_code: str, use_disk_cache: bool = False) -> str:
     """
     从源代码解析（兼容旧版接口）
-    只返回语法检查结果，不进行语义检查
+    只返回语法检查结果，不进行语义检查。
+    用 SyntaxRecognizer 检查语法，不构建 AST，也不经过 parse_cache
+    （use_disk_cache 为真时使用 disk_cache）；
+    结果与用 parse_to_ast(source_code, enable_semantic_check=False) 判断的相同
     """
-    ast, errors, _ = parse_to_ast(source_code, enable_semantic_check=False)
+    recognized, errors = recognize_source(source_code, use_disk_cache)
     
     if errors:
         return "\n".join(errors)
     
-    if ast:
+    if recognized:
         return "该程序符合语法要求。"
     else:
         return "解析失败"
 
 
-def parse_from_file(token_file: str) -> str:
-    """从 token 文件读取并解析（兼容旧版接口）"""
+def read_text_token_file(token_file: str) -> List[Token]:
+    """读取旧版制表符分隔的文本 Token 文件（类型、值、行号、列号）"""
     tokens = []
+    with open(token_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            if len(parts) >= 4:
+                token_type = TokenType[parts[0]]
+                value = parts[1]
+                line_num = int(parts[2])
+                column = int(parts[3])
+                tokens.append(Token(token_type, value, line_num, column))
+    return tokens
+
+
+def parse_from_file(token_file: str) -> str:
+    """
+    从 token 文件读取并解析（兼容旧版接口）
+    
+    Lexer.save_tokens_to_file 生成的二进制 Token 文件通过 mmap 加载后直接解析；
+    仍可读取旧版的文本格式。只做语法检查，不构建 AST（SyntaxRecognizer）。
+    """
     try:
-        with open(token_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                parts = line.split('\t')
-                if len(parts) >= 4:
-                    token_type = TokenType[parts[0]]
-                    value = parts[1]
-                    line_num = int(parts[2])
-                    column = int(parts[3])
-                    tokens.append(Token(token_type, value, line_num, column))
+        if TokenBuffer.is_token_file(token_file):
+            tokens = TokenBuffer.load(token_file)
+        else:
+            tokens = read_text_token_file(token_file)
     except Exception as e:
         return f"读取 token 文件失败: {e}"
     
-    parser = ASTParser(tokens)
-    parser.parse()
-    return parser.get_result()
+    from .parser_recognizer import SyntaxRecognizer
+    try:
+        parser = SyntaxRecognizer(tokens)
+        parser.parse()
+        return parser.get_result()
+    finally:
+        if isinstance(tokens, TokenBuffer):
+            tokens.close()
@@ -0,0 +1,257 @@
+"""
+Mini 语言增量语法分析
+记录每条语句和每个语句块覆盖的 Token 范围；源代码编辑后只重新分析包含编辑区的最小语句或语句块，
+其余子树原样复用
+"""
+
+from bisect import bisect_right
+from dataclasses import replace
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .lexer import Lexer, Token, TokenType, NameTable
+from .token_buffer import TokenBuffer
+from .ast_nodes import *
+from .parser_ast import ASTParser
+
+# id(节点) -> Token 范围，见 IncrementalParser
+Spans = Dict[int, tuple]
+
+
+class IncrementalParser(ASTParser):
+    """
+    记录 Token 范围的 ASTParser
+
+    parse() 成功后 spans 记录 AST 中每个 Program、语句块和语句节点覆盖的 Token 范围（以 id(节点) 为键）。
+    范围只保存相对量，编辑后只需更新从编辑点到根的一条路径：
+        Program        (Token 个数, 根语句块的起点)
+        Block          (Token 个数, [各条语句的 Token 个数 + 1（其后的分号）, ...])
+        IfStatement    (Token 个数, then 语句的相对起点, else 语句的相对起点或 None)
+        WhileStatement (Token 个数, 循环体的相对起点)
+        其他语句       (Token 个数,)
+    """
+
+    def reset(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+              source_code: str = "", names: Optional[NameTable] = None):
+        super().reset(tokens, source_code, names)
+        self.spans: Spans = {}
+        self.starts: Dict[int, int] = {}   # 分析过程中各节点的绝对起点
+
+    def parse(self) -> Optional[Program]:
+        ast = super().parse()
+        if ast is not None:
+            self.spans[id(ast)] = (self.pos, self.starts[id(ast.block)])
+        self.starts.clear()
+        return ast
+
+    def block(self) -> Optional[Block]:
+        start = self.pos
+        node = super().block()
+        if self.success:
+            spans = self.spans
+            self.starts[id(node)] = start
+            spans[id(node)] = (self.pos - start,
+                               [spans[id(stmt)][0] + 1 for stmt in node.statements])
+        return node
+
+    def statement(self) -> Optional[Statement]:
+        start = self.pos
+        node = super().statement()
+        kind = node.__class__
+        if not self.success or kind is Block:
+            # 出错后的 AST 不会被使用，不再记录
+            return node
+        width = self.pos - start
+        starts = self.starts
+        starts[id(node)] = start
+        if kind is IfStatement:
+            else_stmt = node.else_statement
+            self.spans[id(node)] = (width, starts[id(node.then_statement)] - start,
+                                    None if else_stmt is None else starts[id(else_stmt)] - start)
+        elif kind is WhileStatement:
+            self.spans[id(node)] = (width, starts[id(node.body)] - start)
+        else:
+            self.spans[id(node)] = (width,)
+        return node
+
+    def parse_at(self, start: int, node_class: type):
+        """从第 start 个 Token 开始单独分析一个语句块或语句，返回新节点（有错误时返回 None）"""
+        self.pos = start - 1
+        self.advance()
+        self.errors = []
+        self.success = True
+        self.spans = {}
+        node = self.block() if node_class is Block else self.statement()
+        self.starts.clear()
+        return node if self.success and not self.errors else None
+
+
+def locate(ast: Program, spans: Spans, start: int, old_end: int) -> List[tuple]:
+    """
+    从根语句块向下找出覆盖旧 Token 区间 [start, old_end) 的语句块和语句，由外到内排列
+
+    每项为 (节点, 起点, 父节点中的字段名, 在父语句块中的下标或 None)
+    """
+    node = ast.block
+    position = spans[id(ast)][1]
+    path = []
+    slot = ('block', None)
+    while position <= start and old_end <= position + spans[id(node)][0]:
+        path.append((node, position, *slot))
+        entry = spans[id(node)]
+        kind = node.__class__
+        if kind is Block:
+            cells = entry[1]
+            starts = list(accumulate(cells, initial=position + 1))
+            index = bisect_right(starts, start, 0, len(cells)) - 1
+            if index < 0:
+                break
+            node, position, slot = node.statements[index], starts[index], ('statements', index)
+        elif kind is IfStatement:
+            _, then_offset, else_offset = entry
+            if else_offset is not None and position + else_offset <= start:
+                node, position, slot = node.else_statement, position + else_offset, ('else_statement', None)
+            else:
+                node, position, slot = node.then_statement, position + then_offset, ('then_statement', None)
+        elif kind is WhileStatement:
+            node, position, slot = node.body, position + entry[1], ('body', None)
+        else:
+            break
+    return path
+
+
+def forget(spans: Spans, node):
+    """删除 node 子树中各语句块和语句的范围"""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if spans.pop(id(node), None) is None:
+            continue
+        kind = node.__class__
+        if kind is Block:
+            pending.extend(node.statements)
+        elif kind is IfStatement:
+            pending.append(node.then_statement)
+            if node.else_statement is not None:
+                pending.append(node.else_statement)
+        elif kind is WhileStatement:
+            pending.append(node.body)
+
+
+def splice(ast: Program, spans: Spans, path: List[tuple], depth: int, node, delta: int) -> Program:
+    """
+    用 node 替换 path[depth] 处的节点：路径上的祖先复制为新节点（只替换一个字段），
+    其余子树原样复用；spans 中祖先的范围随之更新，被替换的旧节点的范围删除
+    """
+    for parent, _, _, _ in reversed(path[:depth]):
+        _, _, field, index = path[depth]
+        entry = spans.pop(id(parent))
+        if index is not None:
+            statements = parent.statements.copy()
+            statements[index] = node
+            cells = entry[1].copy()
+            cells[index] += delta
+            parent = replace(parent, statements=statements)
+            entry = (entry[0] + delta, cells)
+        else:
+            parent = replace(parent, **{field: node})
+            if parent.__class__ is IfStatement and field == 'then_statement' and entry[2] is not None:
+                entry = (entry[0] + delta, entry[1], entry[2] + delta)
+            else:
+                entry = (entry[0] + delta,) + entry[1:]
+        spans[id(parent)] = entry
+        node = parent
+        depth -= 1
+    entry = spans.pop(id(ast))
+    ast = replace(ast, block=node)
+    spans[id(ast)] = (entry[0] + delta, entry[1])
+    return ast
+
+
+def later_subtrees(path: List[tuple], depth: int):
+    """按源代码顺序列出 path[depth] 之后的子树（各层祖先中位于其后的语句）"""
+    for parent_depth in range(depth - 1, -1, -1):
+        parent = path[parent_depth][0]
+        _, _, field, index = path[parent_depth + 1]
+        if index is not None:
+            statements = parent.statements
+            for position in range(index + 1, len(statements)):
+                yield statements[position]
+        elif field == 'then_statement' and parent.else_statement is not None:
+            yield parent.else_statement
+
+
+def shift_positions(nodes, old_line: int, old_column: int, new_line: int, new_column: int,
+                    line_delta: int):
+    """
+    更新编辑点之后复用节点的行号、列号（原地修改）
+
+    编辑所在行上的节点平移列号，之后各行的节点平移 line_delta 行；
+    line_delta 为 0 时遇到编辑所在行之后的第一个节点即可停止
+    """
+    for root in nodes:
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            line = node.line
+            if line == old_line:
+                node.line = new_line
+                node.column += new_column - old_column
+            elif line > old_line:
+                if not line_delta:
+                    return
+                node.line = line + line_delta
+            children = []
+            for value in vars(node).values():
+                if isinstance(value, ASTNode):
+                    children.append(value)
+                elif value.__class__ is list:
+                    children.extend(value)
+            pending.extend(reversed(children))
+
+
+def reparse(lexer: Lexer, ast: Optional[Program], spans: Spans, offset: int, removed: int,
+            inserted: str) -> Tuple[Optional[Program], List[str]]:
+    """
+    把源代码中 [offset, offset + removed) 替换为 inserted，并增量地重新分析
+
+    Args:
+        lexer: 已 tokenize() 的 Lexer，由 apply_edit() 增量更新其 Token
+        ast: 编辑前的 AST（None 表示之前有语法错误，直接完整分析）
+        spans: 编辑前 IncrementalParser.spans，原地更新为新 AST 的范围
+
+    只重新分析包含编辑区的最小语句或语句块；新节点必须无错误且恰好在原来的结束位置
+    （平移后）结束，否则改为分析更外层的节点，直到根语句块，最后退回完整分析。
+    返回 (新 AST, 错误列表)，与完整分析新源代码的结果相同。
+    未受影响的子树与编辑前是同一对象，其中位于编辑点之后的节点的行号、列号原地更新。
+    """
+    lines = lexer.lines
+    old_line, old_column = lines.position(offset + removed)
+    line_delta = inserted.count('\n') - lexer.source.count('\n', offset, offset + removed)
+    start, old_end, new_end = lexer.apply_edit(offset, removed, inserted)
+    delta = new_end - old_end
+    tokens = lexer.tokens
+    parser = IncrementalParser(tokens, lexer.source, names=lexer.names)
+    if ast is not None and id(ast) in spans:
+        path = locate(ast, spans, start, old_end)
+        for depth in range(len(path) - 1, -1, -1):
+            node, position, field, _ = path[depth]
+            if field == 'statements' and tokens[position].type is TokenType.END:
+                # 语句块中 end 之前不会有空语句，需由语句块重新分析
+                continue
+            end = position + spans[id(node)][0] + delta
+            new_node = parser.parse_at(position, node.__class__)
+            if new_node is None or parser.pos != end:
+                continue
+            new_line, new_column = lines.position(offset + len(inserted))
+            shift_positions(later_subtrees(path, depth), old_line, old_column,
+                            new_line, new_column, line_delta)
+            forget(spans, node)
+            spans.update(parser.spans)
+            return splice(ast, spans, path, depth, new_node, delta), []
+
+    parser.reset(tokens, lexer.source, lexer.names)
+    ast = parser.parse()
+    spans.clear()
+    spans.update(parser.spans)
+    return ast, parser.errors
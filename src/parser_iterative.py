@@ -0,0 +1,459 @@
+"""
+Mini 语言迭代式语法分析器
+与 ASTParser 的文法、AST 和错误信息完全相同，但不使用 Python 递归：
+各语法分析函数写成生成器，由 run() 用显式栈驱动，嵌套深度只受 max_depth 限制
+"""
+
+from types import GeneratorType
+from typing import Generator, Iterable, List, Optional, Union
+
+from .lexer import Token, TokenType, NameTable
+from .token_stream import TokenStream
+from .token_buffer import TokenBuffer
+from .ast_nodes import *
+from .parser_ast import (ASTParser, ParseError, BINARY_OPERATORS, RELATIONAL_OPERATORS,
+                         OR_POWER, NOT_POWER, ADDITIVE_POWER,
+                         SYNC_BLOCK_END, SYNC_STATEMENT_END, SYNC_ARGUMENT,
+                         SYNC_THEN, SYNC_DO, SYNC_BODY)
+
+
+class IterativeASTParser(ASTParser):
+    """
+    基于显式栈的 AST 生成器
+
+    program()、statement()、expression() 等语法分析函数都是生成器：需要分析子结构时
+    yield 子生成器，由 run() 压入显式栈执行，再把子结构的结果 send 回来；
+    异常沿栈逐层 throw 回调用者，与递归调用的语义相同。
+    因此解析深度与 Python 递归深度无关，只受 max_depth（显式栈的最大层数，即尚未返回的
+    语法分析函数个数）限制，
+    超过时报告"嵌套层次过深"错误并停止解析。
+
+    与 ASTParser 共享分派表（STATEMENT_RULES / FACTOR_RULES）、运算符结合力表
+    BINARY_OPERATORS 和各同步集，statement()、factor() 和不含嵌套的规则直接沿用；
+    含嵌套的规则（block、statement_list、各语句、condition 到 expression、括号和负号）
+    在这里各有一个生成器版本。修改文法或错误信息时这些方法须与 ASTParser 同步修改，
+    tests/test_parser_modes.py 在随机生成的程序上比较两者的 AST 和错误信息。
+    """
+
+    # 显式栈的默认最大层数；每层 begin 或括号嵌套约占 2 层，if/while 约占 1 层
+    DEFAULT_MAX_DEPTH = 100000
+
+    def __init__(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+                 source_code: str = "", lookahead: int = TokenStream.DEFAULT_LOOKAHEAD,
+                 names: Optional[NameTable] = None, max_depth: int = DEFAULT_MAX_DEPTH):
+        if max_depth < 1:
+            raise ValueError("max_depth 必须为正数")
+        self.max_depth = max_depth
+        super().__init__(tokens, source_code, lookahead, names)
+
+    def run(self, routine: Generator):
+        """
+        用显式栈执行语法分析生成器，返回其结果
+
+        规则方法可以直接返回结果而不是生成器（不含嵌套结构的规则，以及 statement()/
+        factor() 查分派表后调用的这类规则），此时 yield 出的值原样 send 回去。
+        """
+        if not isinstance(routine, GeneratorType):
+            return routine
+        stack = [routine]
+        value = None
+        exception = None
+        while True:
+            top = stack[-1]
+            try:
+                if exception is None:
+                    child = top.send(value)
+                else:
+                    child, exception = top.throw(exception), None
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                value = stop.value
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                exception = e
+                continue
+
+            if not isinstance(child, GeneratorType):
+                value = child
+                continue
+            if len(stack) >= self.max_depth:
+                child.close()
+                exception = ParseError(f"嵌套层次过深（超过 {self.max_depth} 层）",
+                                       self.current_token,
+                                       self.get_source_line(self.current_token.line))
+                continue
+            stack.append(child)
+            value = None
+
+    # ==================== 语法分析函数 (生成 AST) ====================
+
+    def parse(self) -> Optional[Program]:
+        """解析入口：<program>"""
+        try:
+            ast = self.run(self.program())
+            if self.current_type is not TokenType.EOF:
+                self.error(f"程序结束后有多余的内容: {self.current_token.value}")
+            return ast if self.success else None
+        except ParseError as e:
+            self.errors.append(str(e))
+            return None
+
+    def program(self):
+        """
+        <program> ::= "program" IDENTIFIER ";" [<var_declarations>] <block> "."
+        """
+        header = self.program_header()
+        if header is None:
+            return None
+        name_token, var_declarations = header
+
+        # 程序体
+        block = yield self.block()
+
+        if not self.expect(TokenType.DOT, "程序必须以 '.' 结尾"):
+            return None
+
+        return self.Program(
+            name=name_token.value,
+            var_declarations=var_declarations,
+            block=block,
+            line=name_token.line,
+            column=name_token.column
+        )
+
+    def block(self):
+        """
+        <block> ::= "begin" <statement_list> "end"
+        """
+        if not self.expect(TokenType.BEGIN, "缺少 'begin'"):
+            return None
+
+        statements = yield self.statement_list()
+
+        if not self.expect(TokenType.END, "缺少 'end'"):
+            self.synchronize(SYNC_BLOCK_END)
+
+        return self.Block(statements=statements)
+
+    def statement_list(self):
+        """
+        <statement_list> ::= <statement> { ";" <statement> }
+        """
+        statements = []
+
+        # 处理空语句块
+        if self.current_type is TokenType.END:
+            return statements
+
+        stmt = yield self.statement()
+        if stmt:
+            statements.append(stmt)
+
+        # 处理后续语句
+        while self.current_type is TokenType.SEMICOLON:
+            self.advance()
+            # 检查是否为语句块结束（允许末尾多余分号）
+            if self.current_type is TokenType.END:
+                break
+
+            stmt = yield self.statement()
+            if stmt:
+                statements.append(stmt)
+
+        return statements
+
+    def iter_statement_list(self):
+        """逐条产出语句，每条语句由 run() 用显式栈分析（供 iter_statements() 使用）"""
+        if self.current_type is TokenType.END:
+            return
+
+        stmt = self.run(self.statement())
+        if stmt:
+            yield stmt
+
+        while self.current_type is TokenType.SEMICOLON:
+            self.advance()
+            if self.current_type is TokenType.END:
+                break
+
+            stmt = self.run(self.statement())
+            if stmt:
+                yield stmt
+
+    # statement() 沿用 ASTParser 的实现：按 statement_rules 分派到下面的生成器规则，
+    # read_stmt() 和 empty_stmt() 直接返回结果
+
+    def assignment_stmt(self):
+        """
+        <assignment_stmt> ::= IDENTIFIER ":=" <expression>
+        """
+        var_token = self.expect(TokenType.IDENTIFIER)
+        if not var_token:
+            return None
+        var_name = var_token.value
+
+        if not self.expect(TokenType.ASSIGN, "赋值语句缺少 ':=' 运算符"):
+            self.synchronize(SYNC_STATEMENT_END)
+            return None
+
+        expr = yield self.expression()
+        if not expr:
+            self.error("赋值语句右侧表达式错误")
+            self.synchronize(SYNC_STATEMENT_END)
+            return None
+
+        return self.Assignment(
+            variable=var_name,
+            expression=expr,
+            symbol_id=self.names.intern(var_name),
+            line=var_token.line,
+            column=var_token.column
+        )
+
+    def if_stmt(self):
+        """
+        <if_stmt> ::= "if" <condition> "then" <statement> [ "else" <statement> ]
+        """
+        if_token = self.current_token
+        if not self.expect(TokenType.IF):
+            return None
+
+        condition = yield self.condition()
+        if not condition:
+            self.error("if 语句条件表达式错误")
+            self.synchronize(SYNC_THEN)
+
+        if not self.expect(TokenType.THEN, "if 语句缺少 'then'"):
+            self.synchronize(SYNC_BODY)
+            return None
+
+        then_stmt = yield self.statement()
+
+        # 可选的 else 部分
+        else_stmt = None
+        if self.current_type is TokenType.ELSE:
+            self.advance()
+            else_stmt = yield self.statement()
+
+        return self.IfStatement(
+            condition=condition,
+            then_statement=then_stmt,
+            else_statement=else_stmt,
+            line=if_token.line,
+            column=if_token.column
+        )
+
+    def while_stmt(self):
+        """
+        <while_stmt> ::= "while" <condition> "do" <statement>
+        """
+        while_token = self.current_token
+        if not self.expect(TokenType.WHILE):
+            return None
+
+        condition = yield self.condition()
+        if not condition:
+            self.error("while 语句条件表达式错误")
+            self.synchronize(SYNC_DO)
+
+        if not self.expect(TokenType.DO, "while 语句缺少 'do'"):
+            self.synchronize(SYNC_BODY)
+            return None
+
+        body = yield self.statement()
+
+        return self.WhileStatement(
+            condition=condition,
+            body=body,
+            line=while_token.line,
+            column=while_token.column
+        )
+
+    def write_stmt(self):
+        """
+        <write_stmt> ::= "write" "(" <expression> ")"
+        """
+        write_token = self.current_token
+        if not self.expect(TokenType.WRITE):
+            return None
+
+        if not self.expect(TokenType.LPAREN, "write 语句后期望 '('"):
+            self.synchronize(SYNC_STATEMENT_END)
+            return None
+
+        expr = yield self.expression()
+        if not expr:
+            self.error("write 语句中缺少表达式")
+            self.synchronize(SYNC_ARGUMENT)
+            return None
+
+        if not self.expect(TokenType.RPAREN, "write 语句缺少 ')'"):
+            self.synchronize(SYNC_STATEMENT_END)
+
+        return self.WriteStatement(
+            expression=expr,
+            line=write_token.line,
+            column=write_token.column
+        )
+
+    # read_stmt() 和 var_declarations() 不含嵌套结构，直接沿用 ASTParser 的实现
+
+    def condition(self, min_power: int = OR_POWER):
+        """
+        <condition> ::= <or_term> { "or" <or_term> }
+        <or_term>   ::= <not_term> { "and" <not_term> }
+        <not_term>  ::= [ "not" ] <comparison>
+        """
+        if self.current_type is TokenType.NOT:
+            op_token = self.current_token
+            self.advance()
+            operand = yield self.comparison()
+            if not operand:
+                return None
+            left = self.UnaryOp(op=op_token, operand=operand)
+        else:
+            left = yield self.comparison()
+            if not left:
+                return None
+
+        while True:
+            entry = BINARY_OPERATORS.get(self.current_type)
+            if entry is None or not min_power <= entry[0] < NOT_POWER:
+                return left
+            power, message = entry
+            op_token = self.current_token
+            self.advance()
+            right = yield self.condition(power + 1)
+            if not right:
+                self.error(message)
+                return None
+            left = self.BinaryOp(left=left, op=op_token, right=right)
+
+    def comparison(self):
+        """
+        <comparison> ::= <expression> <relop> <expression>
+                       | "(" <condition> ")"
+
+        先尝试按括号条件解析，失败或括号后跟关系运算符时回溯，按表达式重新解析；
+        以 "(" 开头时按 (规则, 位置) 记忆化（策略与 ASTParser.comparison() 相同）。
+        """
+        if self.current_type is not TokenType.LPAREN:
+            return (yield self.relation())
+
+        key = ('comparison', self.pos)
+        entry = self.memo.get(key)
+        if entry is not None:
+            return self.recall(entry)
+        errors_count = len(self.errors)
+        self.speculating += 1
+        try:
+            result = yield self.parenthesized_comparison()
+        finally:
+            self.speculating -= 1
+        self.remember(key, result, errors_count)
+        return result
+
+    def parenthesized_comparison(self):
+        """以 "(" 开头的 <comparison>：先试探 "(" <condition> ")"，不成立时回溯"""
+        saved_pos = self.pos
+        saved_type = self.current_type
+        saved_token = self._current_token
+        saved_errors_count = len(self.errors)
+        saved_success = self.success
+
+        # 流式模式下固定可能需要回溯的 Token
+        if self.stream is not None:
+            self.stream.mark(saved_pos)
+        try:
+            self.advance()  # consume '('
+            cond = yield self.condition()
+
+            if cond and self.current_type is TokenType.RPAREN:
+                self.advance()  # consume ')'
+                if self.current_type not in RELATIONAL_OPERATORS:
+                    return cond
+
+            # 回溯
+            self.pos = saved_pos
+            self.current_type = saved_type
+            self._current_token = saved_token
+            self.errors = self.errors[:saved_errors_count]
+            self.success = saved_success
+        finally:
+            if self.stream is not None:
+                self.stream.release(saved_pos)
+
+        return (yield self.relation())
+
+    def relation(self):
+        """<expression> <relop> <expression>"""
+        left = yield self.expression()
+        if not left:
+            return None
+
+        if self.current_type in RELATIONAL_OPERATORS:
+            op_token = self.current_token
+            self.advance()
+            right = yield self.expression()
+            if not right:
+                self.error(BINARY_OPERATORS[op_token.type][1])
+                return None
+            return self.BinaryOp(left=left, op=op_token, right=right)
+        else:
+            self.error("条件表达式缺少关系运算符")
+            return None
+
+    def expression(self, min_power: int = ADDITIVE_POWER):
+        """
+        <expression> ::= <term> { ("+" | "-") <term> }
+        <term>       ::= <factor> { ("*" | "/") <factor> }
+        """
+        left = yield self.factor()
+        if not left:
+            return None
+
+        while True:
+            entry = BINARY_OPERATORS.get(self.current_type)
+            if entry is None or entry[0] < min_power:
+                return left
+            power, message = entry
+            op_token = self.current_token
+            self.advance()
+            right = yield self.expression(power + 1)
+            if not right:
+                self.error(message)
+                return None
+            left = self.BinaryOp(left=left, op=op_token, right=right)
+
+    # factor() 沿用 ASTParser 的实现：按 factor_rules 分派，
+    # 只有括号和负号两条含嵌套的规则写成生成器
+
+    def parenthesized_factor(self):
+        """括号表达式（记忆化，见 ASTParser.comparison()）"""
+        key = ('factor', self.pos)
+        entry = self.memo.get(key)
+        if entry is not None:
+            return self.recall(entry)
+        errors_count = len(self.errors)
+        self.advance()
+        expr = yield self.expression()
+        if not expr:
+            self.error("括号内表达式错误")
+        elif not self.expect(TokenType.RPAREN, "表达式缺少右括号 ')'"):
+            expr = None
+        self.remember(key, expr, errors_count)
+        return expr
+
+    def negated_factor(self):
+        """负号"""
+        op_token = self.current_token
+        self.advance()
+        operand = yield self.factor()
+        if not operand:
+            return None
+        return self.UnaryOp(op=op_token, operand=operand)
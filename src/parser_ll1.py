@@ -0,0 +1,394 @@
+"""
+Mini 语言表驱动 LL(1) 语法分析器
+由 ll1_grammar 根据文法生成的预测分析表驱动，用显式栈构建与 ASTParser 相同的 AST
+"""
+
+from typing import Dict, Iterable, List, Optional, Union
+
+from .lexer import Token, TokenType, NameTable
+from .token_stream import TokenStream
+from .token_buffer import TokenBuffer
+from .ast_nodes import *
+from .parser_ast import ASTParser, RELATIONAL_OPERATORS
+from .ll1_grammar import Grammar, EPSILON, is_action, mini_grammar
+
+# 结果是条件（而不是算术表达式）的运算符
+CONDITION_OPERATORS = RELATIONAL_OPERATORS | {TokenType.AND, TokenType.OR}
+
+
+def is_condition(node) -> bool:
+    """node 是否为条件：关系运算、and/or 或 not"""
+    kind = node.__class__
+    if kind is BinaryOp:
+        return node.op.type in CONDITION_OPERATORS
+    return kind is UnaryOp and node.op.type is TokenType.NOT
+
+
+class Row(dict):
+    """
+    分析表中非终结符的一行：终结符 -> 要压栈的符号（产生式右部的逆序）
+
+    分析栈中直接存放 Row 对象代表非终结符。sync 是错误恢复的同步集
+    FIRST ∪ FOLLOW，produces 是该非终结符分析完成后在值栈上留下的值的个数。
+    """
+
+    __slots__ = ('name', 'expected', 'sync', 'produces')
+
+
+class LL1Parser(ASTParser):
+    """
+    表驱动的 LL(1) AST 生成器
+
+    分析栈上有三种符号：TokenType（终结符，匹配后把 Token 压入值栈）、Row（非终结符，
+    按当前 Token 查表展开）和语义动作（on_ 开头的方法，从值栈取出子结构构建 AST 节点）。
+    不使用递归，嵌套深度不受限制。
+
+    文法接受的语言和生成的 AST 与 ASTParser 相同，错误恢复则不同：非终结符在当前 Token
+    上没有候选式时，跳过 Token 直到遇到 FIRST ∪ FOLLOW 中的 Token（可空的非终结符
+    直接选用可空的候选式）；终结符不匹配时视为已插入该终结符。
+    同一位置只报告第一个错误，出错后的语义动作不再构建节点。
+    """
+
+    # 语义动作从值栈取出的值的个数和压入的值的个数
+    ACTIONS = {
+        'program': (6, 1), 'declarations': (2, 1), 'list': (0, 1), 'pop': (1, 0), 'none': (0, 1),
+        'names': (1, 1), 'more_names': (2, 0), 'var_decl': (3, 0), 'block': (3, 1),
+        'append': (1, 0), 'assign': (3, 1), 'if': (5, 1), 'while': (4, 1), 'write': (4, 1),
+        'read': (4, 1), 'empty': (0, 1), 'else': (2, 1), 'boolean': (0, 0), 'arithmetic': (0, 0),
+        'binary': (3, 1), 'not': (2, 1), 'negate': (2, 1), 'group': (3, 1), 'variable': (1, 1),
+        'number': (1, 1), 'string': (1, 1), 'true': (1, 1), 'false': (1, 1),
+    }
+
+    def __init__(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+                 source_code: str = "", lookahead: int = TokenStream.DEFAULT_LOOKAHEAD,
+                 names: Optional[NameTable] = None):
+        self.start = load_tables(self.__class__)
+        super().__init__(tokens, source_code, lookahead, names)
+
+    def reset(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+              source_code: str = "", names: Optional[NameTable] = None):
+        super().reset(tokens, source_code, names)
+        self.error_pos = -1
+
+    # ==================== 驱动程序 ====================
+
+    def parse(self) -> Optional[Program]:
+        """解析入口：从开始符号出发按分析表推导"""
+        stack = [TokenType.EOF, self.start]
+        values = []
+        pop, expand, push = stack.pop, stack.extend, values.append
+        while stack:
+            top = pop()
+            kind = top.__class__
+            if kind is Row:
+                symbols = top.get(self.current_type)
+                if symbols is None:
+                    self.recover(top, stack, values)
+                else:
+                    expand(symbols)
+            elif kind is TokenType:
+                if top is self.current_type:
+                    push(self._current_token or self.current_token)
+                    self.advance()
+                else:
+                    self.missing(top, values)
+            elif self.success:
+                top(self, values)
+            else:
+                # 出错后只维持值栈的形状
+                pops, pushes = top.effect
+                if pops:
+                    del values[-pops:]
+                values.extend([None] * pushes)
+        return values[0] if self.success else None
+
+    def report(self, message: str):
+        """记录错误；同一位置只记录第一个错误，避免一个错误引发一串错误"""
+        if self.pos != self.error_pos:
+            self.error_pos = self.pos
+            self.error(message)
+        self.success = False
+
+    def missing(self, terminal: TokenType, values: List):
+        """终结符不匹配：报告错误后视为已插入该终结符"""
+        if terminal is TokenType.EOF:
+            self.report(f"程序结束后有多余的内容: {self.current_token.value}")
+        else:
+            self.report(f"期望 {terminal.name}，但得到 {self.current_type.name}")
+        values.append(None)
+
+    def recover(self, row: Row, stack: List, values: List):
+        """
+        非终结符（不可空）在当前 Token 上没有候选式：跳过 Token 直到遇到同步集
+        FIRST ∪ FOLLOW 中的 Token。遇到 FIRST 中的 Token 时重新展开该非终结符，
+        否则放弃它，由后面的符号继续分析
+        """
+        self.report(f"期望 {row.expected}，但得到 '{self.current_token.value}'")
+        sync = row.sync
+        while self.current_type not in sync and self.current_type is not TokenType.EOF:
+            self.advance()
+        if self.current_type in row:
+            stack.append(row)
+        else:
+            values.extend([None] * row.produces)
+
+    # ==================== 语义动作 (生成 AST) ====================
+
+    def on_program(self, values: List):
+        values.pop()
+        block, var_declarations = values.pop(), values.pop()
+        values.pop()
+        name_token = values.pop()
+        values[-1] = self.Program(name=name_token.value, var_declarations=var_declarations,
+                                  block=block, line=name_token.line, column=name_token.column)
+
+    def on_declarations(self, values: List):
+        declarations = values.pop()
+        values[-1] = self.VarDeclarations(declarations=declarations)
+
+    def on_list(self, values: List):
+        values.append([])
+
+    def on_pop(self, values: List):
+        values.pop()
+
+    def on_none(self, values: List):
+        values.append(None)
+
+    def on_names(self, values: List):
+        values.append([values.pop()])
+
+    def on_more_names(self, values: List):
+        name_token = values.pop()
+        values.pop()
+        values[-1].append(name_token)
+
+    def on_var_decl(self, values: List):
+        type_token = values.pop()
+        values.pop()
+        name_tokens = values.pop()
+        declarations = values[-1]
+        var_type = type_token.value.lower()
+        for name_token in name_tokens:
+            var_name = name_token.value
+            symbol_id = self.names.intern(var_name)
+            declarations.append(self.VarDecl(name=var_name, var_type=var_type, symbol_id=symbol_id,
+                                             line=name_token.line, column=name_token.column))
+            if not self.declare(var_name, var_type, symbol_id, name_token.line, name_token.column):
+                self.error(f"变量 '{var_name}' 重复声明")
+
+    def on_block(self, values: List):
+        values.pop()
+        statements = values.pop()
+        values[-1] = self.Block(statements=statements)
+
+    def on_append(self, values: List):
+        """把语句加入语句列表；语句块末尾（end 之前）的空语句不计入，与 ASTParser 相同"""
+        stmt = values.pop()
+        if stmt.__class__ is not EmptyStatement or self.current_type is not TokenType.END:
+            values[-1].append(stmt)
+
+    def on_assign(self, values: List):
+        expr = values.pop()
+        values.pop()
+        var_token = values.pop()
+        var_name = var_token.value
+        values.append(self.Assignment(variable=var_name, expression=expr,
+                                      symbol_id=self.names.intern(var_name),
+                                      line=var_token.line, column=var_token.column))
+
+    def on_if(self, values: List):
+        else_stmt, then_stmt = values.pop(), values.pop()
+        values.pop()
+        condition = values.pop()
+        if_token = values[-1]
+        values[-1] = self.IfStatement(condition=condition, then_statement=then_stmt,
+                                      else_statement=else_stmt,
+                                      line=if_token.line, column=if_token.column)
+
+    def on_while(self, values: List):
+        body = values.pop()
+        values.pop()
+        condition = values.pop()
+        while_token = values[-1]
+        values[-1] = self.WhileStatement(condition=condition, body=body,
+                                         line=while_token.line, column=while_token.column)
+
+    def on_write(self, values: List):
+        values.pop()
+        expr = values.pop()
+        values.pop()
+        write_token = values[-1]
+        values[-1] = self.WriteStatement(expression=expr, line=write_token.line,
+                                         column=write_token.column)
+
+    def on_read(self, values: List):
+        values.pop()
+        var_token = values.pop()
+        values.pop()
+        read_token = values[-1]
+        var_name = var_token.value
+        values[-1] = self.ReadStatement(variable=var_name, symbol_id=self.names.intern(var_name),
+                                        line=read_token.line, column=read_token.column)
+
+    def on_empty(self, values: List):
+        if self.current_type is TokenType.ELSE:
+            self.report(f"无效的语句开始: '{self.current_token.value}'")
+        values.append(self.EmptyStatement())
+
+    def on_else(self, values: List):
+        else_stmt = values.pop()
+        values[-1] = else_stmt
+
+    def on_boolean(self, values: List):
+        """if/while 的条件必须是条件而不是算术表达式"""
+        if not is_condition(values[-1]):
+            self.report("条件表达式缺少关系运算符")
+
+    def on_arithmetic(self, values: List):
+        """赋值和 write 的表达式不能是条件"""
+        if is_condition(values[-1]):
+            self.report("表达式中不能出现条件运算")
+
+    def on_binary(self, values: List):
+        right = values.pop()
+        op_token = values.pop()
+        left = values[-1]
+        if op_token.type is TokenType.AND or op_token.type is TokenType.OR:
+            if not (is_condition(left) and is_condition(right)):
+                self.report(f"'{op_token.value}' 的两侧必须是条件")
+        elif is_condition(left) or is_condition(right):
+            self.report(f"'{op_token.value}' 的两侧必须是算术表达式")
+        values[-1] = self.BinaryOp(left=left, op=op_token, right=right)
+
+    def on_not(self, values: List):
+        operand = values.pop()
+        if not is_condition(operand):
+            self.report("'not' 之后必须是条件")
+        values[-1] = self.UnaryOp(op=values[-1], operand=operand)
+
+    def on_negate(self, values: List):
+        operand = values.pop()
+        if is_condition(operand):
+            self.report("负号之后必须是算术表达式")
+        values[-1] = self.UnaryOp(op=values[-1], operand=operand)
+
+    def on_group(self, values: List):
+        values.pop()
+        expr = values.pop()
+        values[-1] = expr
+
+    def on_variable(self, values: List):
+        token = values[-1]
+        name = token.value
+        values[-1] = self.Variable(name=name, symbol_id=self.names.intern(name),
+                                   line=token.line, column=token.column)
+
+    def on_number(self, values: List):
+        token = values[-1]
+        values[-1] = self.Number(value=float(token.value), line=token.line, column=token.column)
+
+    def on_string(self, values: List):
+        token = values[-1]
+        values[-1] = self.String(value=token.value, line=token.line, column=token.column)
+
+    def on_true(self, values: List):
+        token = values[-1]
+        values[-1] = self.Boolean(value=True, line=token.line, column=token.column)
+
+    def on_false(self, values: List):
+        token = values[-1]
+        values[-1] = self.Boolean(value=False, line=token.line, column=token.column)
+
+
+_tables: Dict[type, Row] = {}
+
+
+def value_counts(grammar: Grammar, actions: Dict[str, tuple]) -> Dict[str, int]:
+    """
+    各非终结符分析完成后在值栈上留下的值的个数：终结符 +1，语义动作按 actions 中的
+    (取出, 压入)。同一非终结符的各候选式必须一致，否则语义动作与文法不匹配，抛出 ValueError
+    """
+    def total(rhs, counts):
+        result = 0
+        for symbol in rhs:
+            if is_action(symbol):
+                pops, pushes = actions[symbol[1:]]
+                result += pushes - pops
+            elif symbol in counts:
+                result += counts[symbol]
+            elif symbol in grammar.terminals:
+                result += 1
+            else:
+                return None
+        return result
+
+    counts: Dict[str, int] = {}
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in grammar.productions:
+            if lhs not in counts:
+                result = total(rhs, counts)
+                if result is not None:
+                    counts[lhs] = result
+                    changed = True
+    for lhs, rhs in grammar.productions:
+        result = total(rhs, counts)
+        if result != counts.get(lhs):
+            raise ValueError(f"{lhs} 的候选式在值栈上留下的值的个数不一致: "
+                             f"{' '.join(rhs) or EPSILON}")
+    return counts
+
+
+def load_tables(parser_class: type = LL1Parser, grammar: Optional[Grammar] = None) -> Row:
+    """
+    把文法的预测分析表转换为 parser_class 的分析栈符号，返回开始符号的 Row（默认文法按类缓存）
+
+    终结符换成 TokenType，非终结符换成 Row，#名字 换成方法 on_名字（effect 属性为其
+    在值栈上的 (取出, 压入) 个数）
+    """
+    if grammar is None:
+        cached = _tables.get(parser_class)
+        if cached is not None:
+            return cached
+    source = grammar or mini_grammar()
+    actions = parser_class.ACTIONS
+    for symbol in {symbol for _, rhs in source.productions for symbol in rhs if is_action(symbol)}:
+        if symbol[1:] not in actions:
+            raise ValueError(f"未定义的语义动作: {symbol}")
+    for name, effect in actions.items():
+        getattr(parser_class, 'on_' + name).effect = effect
+    counts = value_counts(source, actions)
+
+    rows = {name: Row() for name in source.nonterminals}
+
+    def convert(symbol: str):
+        if symbol in rows:
+            return rows[symbol]
+        if is_action(symbol):
+            return getattr(parser_class, 'on_' + symbol[1:])
+        return TokenType[symbol]
+
+    def expand(index: int) -> tuple:
+        return tuple(convert(symbol) for symbol in reversed(source.productions[index][1]))
+
+    for name, row in rows.items():
+        for terminal, index in source.table[name].items():
+            row[TokenType[terminal]] = expand(index)
+        # 可空的非终结符在其余 Token 上也选用可空的候选式，错误推迟到下一个终结符处报告
+        index = source.nullable_production(name)
+        if index is not None:
+            default = expand(index)
+            for token_type in TokenType:
+                row.setdefault(token_type, default)
+        row.name = name
+        row.expected = ' / '.join(sorted(source.first[name]))
+        row.sync = frozenset(TokenType[terminal]
+                             for terminal in source.first[name] | source.follow[name])
+        row.produces = counts[name]
+
+    start = rows[source.start]
+    if grammar is None:
+        _tables[parser_class] = start
+    return start
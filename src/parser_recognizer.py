@@ -0,0 +1,42 @@
+"""
+Mini 语言语法识别器
+与 ASTParser 的文法和错误信息完全相同，但只判断程序是否符合语法，不构建 AST 和符号表
+"""
+
+from typing import Iterable, List, Optional, Union
+
+from .lexer import Token, NameTable
+from .token_buffer import TokenBuffer
+from .parser_ast import ASTParser
+
+
+def recognized(*args, **kwargs) -> bool:
+    """代替 AST 节点构造函数：不创建对象，只表示该语法成分已识别"""
+    return True
+
+
+class SyntaxRecognizer(ASTParser):
+    """
+    只做语法检查的 ASTParser
+
+    语法分析函数与 ASTParser 共用，只是把 AST 节点的构造函数全部换成 recognized()，
+    变量声明只记录名字以检查重复声明。parse() 在程序符合语法时返回 True，
+    否则返回 None，errors 与 ASTParser 完全相同。
+    """
+
+    Program = VarDeclarations = VarDecl = Block = staticmethod(recognized)
+    Assignment = IfStatement = WhileStatement = EmptyStatement = staticmethod(recognized)
+    WriteStatement = ReadStatement = staticmethod(recognized)
+    BinaryOp = UnaryOp = Number = String = Boolean = Variable = staticmethod(recognized)
+
+    def reset(self, tokens: Union[List[Token], TokenBuffer, Iterable[Token]],
+              source_code: str = "", names: Optional[NameTable] = None):
+        super().reset(tokens, source_code, names)
+        self.declared = set()
+
+    def declare(self, name: str, var_type: str, symbol_id: int, line: int, column: int) -> bool:
+        """只记录变量名，重复声明时返回 False"""
+        if name in self.declared:
+            return False
+        self.declared.add(name)
+        return True
@@ -0,0 +1,266 @@
+"""
+分析结果缓存
+以源代码哈希为键的进程内 LRU 缓存，供 parse_to_ast 复用词法、语法和语义分析结果；
+以及跨进程共享的磁盘缓存（类似 __pycache__），保存序列化的 AST、符号表和诊断信息
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# 磁盘缓存的根目录（DFA 转移表和 DiskCache 共用）
+CACHE_ROOT = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'mini-parser')
+
+
+def source_hash(source_code: str) -> str:
+    """源代码内容的哈希（缓存键）"""
+    return hashlib.blake2b(source_code.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class LRUCache:
+    """
+    有容量上限的 LRU 缓存（线程安全）
+    
+    maxsize 为 0 时不缓存任何内容。hits / misses 记录 get() 的命中和未命中次数。
+    缓存的值会被多个调用者共享，调用者不得修改。
+    """
+    
+    DEFAULT_MAXSIZE = 128
+    
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 0:
+            raise ValueError("缓存容量不能为负数")
+        self.maxsize = maxsize
+        self.entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """查找 key，命中时将其标记为最近使用；未命中返回 None"""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """存入 key，超出容量时淘汰最久未使用的项"""
+        with self.lock:
+            if self.maxsize == 0:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+    
+    def resize(self, maxsize: int):
+        """修改容量上限（缩小时立即淘汰多余的项）"""
+        if maxsize < 0:
+            raise ValueError("缓存容量不能为负数")
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        """清空缓存并重置计数"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def info(self) -> Dict[str, int]:
+        """缓存统计：hits, misses, size, maxsize"""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self.entries), 'maxsize': self.maxsize}
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class DiskCache:
+    """
+    磁盘上的分析结果缓存（跨进程共享）
+    
+    每项是 directory 下的一个 pickle 文件，文件名由键（调用者在其中加入编译器版本）
+    和 FORMAT_VERSION 的哈希得到，命中时只需读一个文件。写入先写临时文件再改名，
+    并发的读者只会看到完整的文件。文件总大小超过 max_bytes 时按修改时间淘汰最旧的项；
+    命中的文件若已超过 REFRESH_SECONDS 未更新，则刷新其修改时间，使常用项不被淘汰。
+    
+    进程内累计写入的字节数，只在估计的总大小超过上限时才扫描目录。
+    directory 为 None 或 max_bytes 为 0 时不读写缓存。目录不可写、文件损坏时
+    视为未命中，不影响分析。
+    
+    读取时会反序列化其中的文件，因此目录以 0o700 权限创建；已有的目录须是当前用户
+    所有、组和其他用户不可写的真实目录（不是符号链接），否则不读写缓存（见 usable()）。
+    """
+    
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    FORMAT_VERSION = 1
+    REFRESH_SECONDS = 3600
+    SUFFIX = '.pkl'
+    
+    def __init__(self, directory: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("缓存容量不能为负数")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total: Optional[int] = None   # 估计的文件总大小，首次写入时扫描目录得到
+        self.trusted: Optional[str] = None  # 已通过 usable() 检查的目录
+    
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+    
+    def usable(self) -> bool:
+        """
+        directory 是否存在且可以信任：真实目录（不是符号链接），在 POSIX 系统上
+        还须属于当前用户且组和其他用户不可写。检查通过的目录不再重复检查。
+        """
+        if self.trusted == self.directory:
+            return True
+        try:
+            info = os.lstat(self.directory)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(info.st_mode):
+            return False
+        if os.name == 'posix' and (info.st_uid != os.getuid() or info.st_mode & 0o022):
+            return False
+        self.trusted = self.directory
+        return True
+    
+    def path(self, key: Hashable) -> str:
+        """key 对应的缓存文件"""
+        digest = hashlib.blake2b(repr((self.FORMAT_VERSION, key)).encode('utf-8', 'surrogatepass'),
+                                 digest_size=16).hexdigest()
+        return os.path.join(self.directory, digest + self.SUFFIX)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取 key 对应的值；未命中（或缓存关闭）时返回 None"""
+        if not self.enabled:
+            return None
+        if not self.usable():
+            self.misses += 1
+            return None
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+                modified = os.fstat(f.fileno()).st_mtime
+        except OSError:
+            self.misses += 1
+            return None
+        except Exception:
+            # 损坏或由不兼容的版本写入
+            self.misses += 1
+            self.remove(path)
+            return None
+        if time.time() - modified > self.REFRESH_SECONDS:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        self.hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: Any):
+        """原子地写入 key 对应的值，超出容量时淘汰最旧的项"""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not self.usable():
+                return
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(temp_path, self.path(key))
+        except BaseException as e:
+            self.remove(temp_path)
+            if isinstance(e, (OSError, pickle.PicklingError)):
+                return
+            raise
+        if self.total is None:
+            self.total = sum(size for _, size, _ in self.entries())
+        else:
+            self.total += size
+        if self.total > self.max_bytes:
+            self.evict()
+    
+    def entries(self):
+        """缓存文件的 (修改时间, 大小, 路径) 列表"""
+        result = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(self.SUFFIX):
+                        try:
+                            info = entry.stat()
+                        except OSError:
+                            continue
+                        result.append((info.st_mtime, info.st_size, entry.path))
+        except OSError:
+            pass
+        return result
+    
+    def evict(self):
+        """删除最旧的项，直到总大小不超过 max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                self.remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self.total = total
+    
+    def resize(self, max_bytes: int):
+        """修改容量上限（缩小时立即淘汰；0 表示关闭缓存）"""
+        if max_bytes < 0:
+            raise ValueError("缓存容量不能为负数")
+        self.max_bytes = max_bytes
+        if self.enabled:
+            self.evict()
+    
+    def clear(self):
+        """删除全部缓存文件并重置计数"""
+        if self.directory is not None:
+            for _, _, path in self.entries():
+                self.remove(path)
+        self.total = None
+        self.hits = 0
+        self.misses = 0
+    
+    def info(self) -> Dict[str, int]:
+        """缓存统计：hits, misses, size（项数）, bytes, max_bytes"""
+        entries = self.entries() if self.directory is not None else []
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(entries),
+                'bytes': sum(size for _, size, _ in entries), 'max_bytes': self.max_bytes}
+    
+    @staticmethod
+    def remove(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
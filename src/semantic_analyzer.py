@@ -30,6 +30,10 @@ class SemanticAnalyzer(ASTVisitor):
     """
     
     def __init__(self, symbol_table: ScopedSymbolTable):
+        self.reset(symbol_table)
+    
+    def reset(self, symbol_table: ScopedSymbolTable):
+        """改为使用另一个符号表，复用同一个分析器"""
         self.symbol_table = symbol_table
         self.errors: List[str] = []
         self.current_expr_type: Optional[SymbolType] = None
@@ -79,7 +83,7 @@ class SemanticAnalyzer(ASTVisitor):
         检查：左侧变量类型 与 右侧表达式类型 是否兼容
         """
         # 获取变量声明的类型
-        symbol = self.symbol_table.lookup(node.variable)
+        symbol = self.symbol_table.resolve(node.variable, node.symbol_id)
         if not symbol:
             self.add_error(f"变量 '{node.variable}' 未声明", node)
             return
@@ -156,7 +160,7 @@ class SemanticAnalyzer(ASTVisitor):
         分析 read 语句
         检查变量是否已声明
         """
-        symbol = self.symbol_table.lookup(node.variable)
+        symbol = self.symbol_table.resolve(node.variable, node.symbol_id)
         if not symbol:
             self.add_error(f"read 语句中的变量 '{node.variable}' 未声明", node)
     
@@ -177,7 +181,7 @@ class SemanticAnalyzer(ASTVisitor):
             return SymbolType.BOOLEAN
         
         elif isinstance(expr, Variable):
-            symbol = self.symbol_table.lookup(expr.name)
+            symbol = self.symbol_table.resolve(expr.name, expr.symbol_id)
             if symbol:
                 # 可选：警告使用未初始化的变量（不作为错误，因为有默认值）
                 # if not symbol.initialized:
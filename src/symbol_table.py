@@ -7,6 +7,8 @@ from typing import Dict, Optional, List
 from dataclasses import dataclass
 from enum import Enum, auto
 
+from .lexer import NameTable
+
 
 class SymbolType(Enum):
     """符号类型"""
@@ -24,6 +26,7 @@ class Symbol:
     line: int = 0
     column: int = 0
     initialized: bool = False  # 是否已初始化
+    symbol_id: int = -1        # 名字表中的 ID（-1 表示未分配）
     
     def __repr__(self):
         return f"Symbol({self.name}: {self.symbol_type.name})"
@@ -34,6 +37,7 @@ class SymbolTable:
     
     def __init__(self, parent: Optional['SymbolTable'] = None):
         self.symbols: Dict[str, Symbol] = {}
+        self.by_id: List[Optional[Symbol]] = []   # 按名字表 ID 索引的符号
         self.parent = parent  # 支持作用域嵌套
     
     def define(self, symbol: Symbol) -> bool:
@@ -41,8 +45,24 @@ class SymbolTable:
         if symbol.name in self.symbols:
             return False
         self.symbols[symbol.name] = symbol
+        if symbol.symbol_id >= 0:
+            by_id = self.by_id
+            if symbol.symbol_id >= len(by_id):
+                by_id.extend([None] * (symbol.symbol_id + 1 - len(by_id)))
+            by_id[symbol.symbol_id] = symbol
         return True
     
+    def lookup_id(self, symbol_id: int) -> Optional[Symbol]:
+        """按名字表 ID 查找符号，支持向上查找父作用域"""
+        scope = self
+        while scope is not None:
+            if symbol_id < len(scope.by_id):
+                symbol = scope.by_id[symbol_id]
+                if symbol is not None:
+                    return symbol
+            scope = scope.parent
+        return None
+    
     def lookup(self, name: str, current_scope_only: bool = False) -> Optional[Symbol]:
         """查找符号，支持向上查找父作用域"""
         symbol = self.symbols.get(name)
@@ -88,7 +108,9 @@ class SymbolTable:
 class ScopedSymbolTable:
     """支持作用域的符号表管理器"""
     
-    def __init__(self):
+    def __init__(self, names: Optional[NameTable] = None):
+        # 本次编译的名字表，符号和 AST 节点中的 symbol_id 都指向它
+        self.names = names if names is not None else NameTable()
         self.global_scope = SymbolTable()
         self.current_scope = self.global_scope
         self.scope_stack: List[SymbolTable] = [self.global_scope]
@@ -113,6 +135,18 @@ class ScopedSymbolTable:
         """查找符号（会向上查找）"""
         return self.current_scope.lookup(name)
     
+    def lookup_id(self, symbol_id: int) -> Optional[Symbol]:
+        """按名字表 ID 查找符号（会向上查找）"""
+        return self.current_scope.lookup_id(symbol_id)
+    
+    def resolve(self, name: str, symbol_id: int = -1) -> Optional[Symbol]:
+        """查找 AST 节点引用的符号：优先按 ID 查找，找不到（没有 ID 或 ID 来自其他名字表）时按名字查找"""
+        if symbol_id >= 0:
+            symbol = self.current_scope.lookup_id(symbol_id)
+            if symbol is not None and symbol.name == name:
+                return symbol
+        return self.current_scope.lookup(name)
+    
     def exists(self, name: str) -> bool:
         """检查符号是否存在"""
         return self.current_scope.exists(name)
@@ -0,0 +1,258 @@
+"""
+列式 Token 缓冲区
+以 array 分列存储 Token 的类型、偏移、长度和值，按需才创建 Token 对象；
+并可保存为二进制 Token 文件（通过 mmap 加载），或编码为 bytes 在进程间传递
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .lexer import Token, TokenType, LineIndex
+
+
+class TokenBuffer:
+    """
+    列式存储的 Token 序列
+    
+    每个 Token 占 kinds(1 字节) + offsets(8 字节) + lengths(4 字节) + values(4 字节)，
+    值存放在去重的字符串表 strings 中，values 记录其下标。
+    下标访问（越过末尾时抛出 IndexError）才创建 Token 对象，
+    ASTParser 可以通过 kind()/value() 直接读取各列而不创建 Token。
+    """
+    
+    # 类型编码 -> TokenType（编码即枚举值）
+    KINDS: Tuple[Optional[TokenType], ...] = (None,) + tuple(TokenType)
+    
+    # 二进制 Token 文件格式（小端序）：
+    #   文件头    magic, 版本, 保留, Token 数 n, 字符串数 s, 行数 l, 字符串表字节数
+    #   offsets   int64  * n
+    #   starts    int64  * l   行起始偏移（LineIndex）
+    #   lengths   uint32 * n
+    #   values    uint32 * n   字符串表下标
+    #   ends      uint32 * s   各字符串在字符串表中的结束位置
+    #   kinds     uint8  * n   TokenType 枚举值
+    #   strings   UTF-8 字符串表
+    # 各段按 8 字节对齐。类型编码即 TokenType 的枚举值，增删 TokenType 时须提升版本号。
+    MAGIC = b'MTKB'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<4sHHQQQQ')
+    # (列名, array 类型码)，按文件中的顺序
+    COLUMNS = (('offsets', 'q'), ('starts', 'q'), ('lengths', 'I'),
+               ('values', 'I'), ('ends', 'I'), ('kinds', 'B'))
+    
+    def __init__(self, lines: Optional[LineIndex] = None):
+        self.kinds = array('B')
+        self.offsets = array('q')
+        self.lengths = array('I')
+        self.values = array('I')
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.lines = lines if lines is not None else LineIndex("")
+        self.mapping: Optional[mmap.mmap] = None   # load() 映射的文件，由 close() 关闭
+    
+    def add(self, token_type: TokenType, value: str, line: int = 0, column: int = 0,
+            offset: int = -1, length: int = 0, lines: Optional[LineIndex] = None):
+        """
+        追加一个 Token
+    
+        参数与 Token 的构造函数相同，可直接作为 Lexer.iter_tokens(make=...) 使用；
+        位置只取 offset，line/column/lines 被忽略（共享 self.lines）。
+        """
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        self.kinds.append(token_type._value_)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.values.append(string_id)
+    
+    def add_token(self, token: Token):
+        """追加一个已有的 Token 对象"""
+        self.add(token.type, token.value, 0, 0, token.offset, token.length)
+    
+    def __len__(self) -> int:
+        return len(self.kinds)
+    
+    def __getitem__(self, index: int) -> Token:
+        return Token(self.KINDS[self.kinds[index]], self.strings[self.values[index]], 0, 0,
+                     self.offsets[index], self.lengths[index], self.lines)
+    
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.kinds)):
+            yield self[index]
+    
+    def kind(self, index: int) -> TokenType:
+        """第 index 个 Token 的类型（不创建 Token）"""
+        return self.KINDS[self.kinds[index]]
+    
+    def value(self, index: int) -> str:
+        """第 index 个 Token 的值（不创建 Token）"""
+        return self.strings[self.values[index]]
+    
+    def position(self, index: int) -> Tuple[int, int]:
+        """第 index 个 Token 的 (行号, 列号)"""
+        return self.lines.position(self.offsets[index])
+    
+    def indices(self, token_type: TokenType) -> List[int]:
+        """类型为 token_type 的所有 Token 的下标（在 C 层按字节查找）"""
+        data = self.kinds.tobytes()
+        code = bytes([token_type._value_])
+        result = []
+        index = data.find(code)
+        while index >= 0:
+            result.append(index)
+            index = data.find(code, index + 1)
+        return result
+    
+    def nbytes(self) -> int:
+        """各列数组占用的字节数（不含字符串表）"""
+        return sum(column.itemsize * len(column)
+                   for column in (self.kinds, self.offsets, self.lengths, self.values))
+    
+    # ==================== 二进制 Token 文件 ====================
+    
+    @classmethod
+    def is_token_file(cls, path: str) -> bool:
+        """path 是否为二进制 Token 文件（检查 magic）"""
+        with open(path, 'rb') as f:
+            return f.read(len(cls.MAGIC)) == cls.MAGIC
+    
+    def to_bytes(self) -> bytes:
+        """编码为二进制 Token 文件的内容"""
+        if self.lines.starts is None:
+            self.lines.build()
+        encoded = [value.encode('utf-8') for value in self.strings]
+        ends = array('I')
+        total = 0
+        for data in encoded:
+            total += len(data)
+            ends.append(total)
+        columns = {'offsets': self.offsets, 'starts': self.lines.starts,
+                   'lengths': self.lengths, 'values': self.values,
+                   'ends': ends, 'kinds': self.kinds}
+        
+        parts = [self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, 0, len(self),
+                                  len(encoded), len(self.lines.starts), total)]
+        for name, typecode in self.COLUMNS:
+            column = array(typecode, columns[name])
+            if sys.byteorder != 'little':
+                column.byteswap()
+            data = column.tobytes()
+            parts.append(data)
+            parts.append(b'\0' * (-len(data) % 8))
+        parts.extend(encoded)
+        return b''.join(parts)
+    
+    def save(self, path: str):
+        """保存为二进制 Token 文件"""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path: str) -> 'TokenBuffer':
+        """
+        通过 mmap 加载二进制 Token 文件
+        
+        各列是直接指向映射内存的 memoryview，不复制数据（大端序平台上除外）；
+        只有字符串表会被解码。加载得到的缓冲区是只读的，不能再 add()。
+        映射在 close() 时关闭，也可以用 with 语句：
+        
+            with TokenBuffer.load(path) as tokens:
+                ASTParser(tokens).parse()
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            buffer = cls.decode(data, path)
+        except BaseException:
+            data.close()
+            raise
+        buffer.mapping = data
+        return buffer
+    
+    def close(self):
+        """关闭 load() 映射的文件；之后不能再访问各列（已创建的 Token 不受影响）"""
+        if self.mapping is None:
+            return
+        for column in (self.kinds, self.offsets, self.lengths, self.values, self.lines.starts):
+            if isinstance(column, memoryview):
+                column.release()
+        self.mapping.close()
+        self.mapping = None
+    
+    def __enter__(self) -> 'TokenBuffer':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TokenBuffer':
+        """从 to_bytes() 的结果还原（各列直接引用 data，缓冲区只读）"""
+        return cls.decode(data, "<bytes>")
+    
+    @classmethod
+    def decode(cls, data, name: str) -> 'TokenBuffer':
+        """解析二进制 Token 文件内容（bytes 或 mmap），name 用于错误信息"""
+        if len(data) < cls.HEADER.size:
+            raise ValueError(f"不是 Token 文件: {name}")
+        magic, version, _, count, string_count, line_count, string_bytes = \
+            cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError(f"不是 Token 文件: {name}")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"不支持的 Token 文件版本 {version}（当前版本 {cls.FORMAT_VERSION}）")
+        
+        lengths = {'offsets': count, 'starts': line_count, 'lengths': count,
+                   'values': count, 'ends': string_count, 'kinds': count}
+        view = memoryview(data)
+        columns = {}
+        try:
+            pos = cls.HEADER.size
+            for column_name, typecode in cls.COLUMNS:
+                size = lengths[column_name] * array(typecode).itemsize
+                if pos + size > len(data):
+                    raise ValueError(f"Token 文件已截断: {name}")
+                column = view[pos:pos + size].cast(typecode)
+                if sys.byteorder != 'little':
+                    column = array(typecode, column)
+                    column.byteswap()
+                columns[column_name] = column
+                pos += size + (-size % 8)
+            if pos + string_bytes > len(data):
+                raise ValueError(f"Token 文件已截断: {name}")
+            # 类型编码和字符串表下标越界时拒绝，而不是在解析时才出错
+            kinds, values, ends = columns['kinds'], columns['values'], columns['ends']
+            if count and (min(kinds) < 1 or max(kinds) >= len(cls.KINDS)):
+                raise ValueError(f"Token 文件中有无效的 Token 类型: {name}")
+            if count and max(values) >= string_count:
+                raise ValueError(f"Token 文件中有无效的字符串下标: {name}")
+            if string_count and max(ends) > string_bytes:
+                raise ValueError(f"Token 文件的字符串表已损坏: {name}")
+            
+            strings = []
+            start = pos
+            for end in columns['ends']:
+                strings.append(str(view[start:pos + end], 'utf-8'))
+                start = pos + end
+        except BaseException:
+            # 释放已创建的视图，否则 load() 无法关闭映射
+            for column in columns.values():
+                if isinstance(column, memoryview):
+                    column.release()
+            view.release()
+            raise
+        
+        lines = LineIndex(None)
+        lines.starts = columns['starts']
+        buffer = cls(lines)
+        buffer.kinds = columns['kinds']
+        buffer.offsets = columns['offsets']
+        buffer.lengths = columns['lengths']
+        buffer.values = columns['values']
+        buffer.strings = strings
+        return buffer
@@ -0,0 +1,79 @@
+"""
+Token 流缓冲区
+为 ASTParser 的流式模式提供有界前瞻的环形缓冲区
+"""
+
+from collections import deque
+from typing import Deque, Iterable, List
+
+from .lexer import Token, TokenType
+
+
+class TokenStream:
+    """
+    按需从 Token 迭代器（如 Lexer.iter_tokens()）拉取 Token 的环形缓冲区
+
+    支持与 List[Token] 相同的绝对下标访问（越过末尾时抛出 IndexError），
+    但只保留最近 lookahead 个 Token。回溯解析前用 mark() 固定起点，
+    固定点之后的 Token 在 release() 之前不会被丢弃。
+    因此峰值占用只与前瞻窗口和最长的回溯片段有关，而与程序长度无关。
+    """
+
+    DEFAULT_LOOKAHEAD = 16
+
+    def __init__(self, tokens: Iterable[Token], lookahead: int = DEFAULT_LOOKAHEAD):
+        if lookahead < 2:
+            raise ValueError("前瞻窗口至少为 2 个 Token")
+        self.lookahead = lookahead
+        self.source = iter(tokens)
+        self.buffer: Deque[Token] = deque()
+        self.base = 0            # buffer[0] 的绝对下标
+        self.marks: List[int] = []
+        self.exhausted = False
+        self.errors: List[Token] = []   # 拉取过程中遇到的 ERROR Token
+        self.max_buffered = 0    # 缓冲区峰值（用于观察内存占用）
+
+    def __getitem__(self, index: int) -> Token:
+        if index < self.base:
+            raise ValueError(f"Token {index} 已移出前瞻窗口（当前窗口起点 {self.base}）")
+        while index - self.base >= len(self.buffer):
+            if not self.fill():
+                raise IndexError(index)
+        return self.buffer[index - self.base]
+
+    def fill(self) -> bool:
+        """拉取一个 Token 并丢弃窗口之外、未被固定的旧 Token"""
+        if self.exhausted:
+            return False
+        token = next(self.source, None)
+        if token is None:
+            self.exhausted = True
+            return False
+        if token.type == TokenType.ERROR:
+            self.errors.append(token)
+
+        buffer = self.buffer
+        buffer.append(token)
+        limit = self.marks[0] if self.marks else None
+        while len(buffer) > self.lookahead and (limit is None or self.base < limit):
+            buffer.popleft()
+            self.base += 1
+        if len(buffer) > self.max_buffered:
+            self.max_buffered = len(buffer)
+        return True
+
+    def mark(self, index: int):
+        """固定 index 及其之后的 Token，供回溯使用"""
+        if index < self.base:
+            raise ValueError(f"Token {index} 已移出前瞻窗口（当前窗口起点 {self.base}）")
+        self.marks.append(index)
+
+    def release(self, index: int):
+        """解除最近一次 mark(index)"""
+        self.marks.remove(index)
+
+    def drain(self):
+        """拉取剩余的全部 Token（只收集词法错误，不保留 Token）"""
+        self.marks.clear()
+        while self.fill():
+            pass
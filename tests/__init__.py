@@ -5,12 +5,18 @@ Mini 语言语法分析器 - 测试模块
 
 from .test_parser_comprehensive import run_all_tests as run_comprehensive_tests
 from .test_cases import run_all_tests as run_case_tests, TEST_CASES
+from .test_lexer import run_all_tests as run_lexer_tests
+from .test_parser_modes import run_all_tests as run_parser_mode_tests
+from .test_result_cache import run_all_tests as run_result_cache_tests
 
 
 def run_all_tests():
     success1 = run_comprehensive_tests()
     success2 = run_case_tests()
-    return success1 and success2
+    success3 = run_lexer_tests()
+    success4 = run_parser_mode_tests()
+    success5 = run_result_cache_tests()
+    return success1 and success2 and success3 and success4 and success5
 
 
 __all__ = ['run_all_tests', 'TEST_CASES']
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Mini 语言词法分析器测试
+验证各词法分析引擎产生完全一致的 Token 流（含行列号、ERROR Token 和长度限制）
+"""
+
+import os
+import random
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.lexer import Lexer, LineIndex, TokenType
+from src import lexer_dfa
+
+
+@contextmanager
+def temporary_dfa_cache():
+    """让 lexer_dfa 的 DFA 表缓存临时使用一个空的临时目录（不读写用户的缓存目录）"""
+    directory, tables = lexer_dfa.CACHE_DIR, lexer_dfa._tables
+    with tempfile.TemporaryDirectory() as temp:
+        try:
+            lexer_dfa.CACHE_DIR = temp
+            lexer_dfa._tables = None
+            yield temp
+        finally:
+            lexer_dfa.CACHE_DIR = directory
+            lexer_dfa._tables = tables
+
+
+_module_context = ExitStack()
+
+
+def setup_module():
+    _module_context.enter_context(temporary_dfa_cache())
+
+
+def teardown_module():
+    _module_context.close()
+
+
+def token_signature(tokens):
+    """Token 流的可比较表示"""
+    return [(t.type, t.value, t.line, t.column) for t in tokens]
+
+
+def assert_engines_agree(source: str):
+    """断言所有引擎对 source 的输出与 scan 引擎一致"""
+    expected = token_signature(Lexer(source).tokenize())
+    for engine in Lexer.ENGINES:
+        actual = token_signature(Lexer(source, engine=engine).tokenize())
+        assert actual == expected, f"引擎 {engine} 输出不一致: {source[:40]!r}"
+
+
+EDGE_CASES = [
+    "",
+    "program p; begin x := 10; y := x * (2 + 3.5) end.",
+    "if a <= b then c := 1 else c := 2; while x <> 0 do x := x - 1",
+    "// 单行注释\nx := 1 { 块注释\n跨行 } y := 2",
+    "x := 1 { 未闭合的块注释",
+    "write('hello'); write(\"world\"); write('a\\'b')",
+    "'未闭合的字符串",
+    "'字符串\n不能跨行'",
+    "'转义换行\\\n可以'",
+    "x := 1 @ 2 # } !",
+    "1.5.3 1. 1.x 12abc",
+    "变量 := 12.5٣ + ٣٣ - 2²",
+    "a\u3000b\tc\rd",
+    "a" * 255,
+    "a" * 256,
+    "a" * 600 + "é",
+    "1" * 100,
+    "1" * 101,
+    "1" * 250,
+    "1" * 98 + ".5",
+    "1" * 99 + ".5",
+    "1" * 100 + ".5",
+    "2147483647 2147483648 9999999999",
+    "'" + "x" * 9999 + "'",
+    "'" + "x" * 10000 + "'",
+    "'" + "x" * 10001 + "'",
+    "'" + "x" * 9999 + "\\'x'",
+]
+
+
+def test_unknown_engine_rejected():
+    """未知引擎名应抛出 ValueError"""
+    try:
+        Lexer("x := 1", engine="nope")
+    except ValueError:
+        return
+    raise AssertionError("未知引擎没有被拒绝")
+
+
+def test_engines_agree_on_edge_cases():
+    """边界情况：注释、字符串、非 ASCII、长度限制与数值范围"""
+    for source in EDGE_CASES:
+        assert_engines_agree(source)
+
+
+def test_engines_agree_on_data_files():
+    """data/ 目录下的全部示例程序"""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+    for name in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+            assert_engines_agree(f.read())
+
+
+def test_operators_come_from_one_table():
+    """每个引擎都按 Lexer.OPERATORS 识别运算符，相邻运算符取最长匹配"""
+    for operator, token_type in Lexer.OPERATORS.items():
+        for engine in Lexer.ENGINES:
+            tokens = Lexer(f"x{operator}y", engine=engine).tokenize()
+            assert [(t.type, t.value) for t in tokens[1:-2]] == [(token_type, operator)], \
+                (engine, operator)
+    operators = "".join(Lexer.OPERATORS)
+    assert_engines_agree(operators)
+    assert_engines_agree(" ".join(operators))
+
+
+def test_engines_agree_on_random_input():
+    """随机拼接的词素片段（固定种子）"""
+    alphabet = list("abcXYZ_019 \t\n\r+-*/();,.:<>={}'\"\\@}!é٣²\u3000")
+    alphabet += ["begin", "end", "if", "//", ":=", "<>", "<=", "\n"]
+    rng = random.Random(2024)
+    for _ in range(3000):
+        source = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert_engines_agree(source)
+
+
+def test_error_tokens_and_positions():
+    """ERROR Token 的内容和位置"""
+    tokens = Lexer("x := 1 @\n  'abc", engine="regex").tokenize()
+    errors = [(t.value, t.line, t.column) for t in tokens if t.type == TokenType.ERROR]
+    assert errors == [("@", 1, 8), ("未闭合的字符串", 2, 3)]
+    assert tokens[-1].type == TokenType.EOF
+
+
+def test_string_and_comment_errors():
+    """字符串的长度限制、跨行和未闭合错误，以及注释的整段跳过"""
+    limit = Lexer.MAX_STRING_LENGTH
+    too_long = f"字符串过长（超过 {limit} 字符）"
+    cases = [
+        ("'" + "x" * limit + "'", (TokenType.STRING, "x" * limit, 0, limit + 2)),
+        ("'" + "x" * (limit + 1) + "'", (TokenType.ERROR, too_long, 0, limit + 1)),
+        ("'" + "x" * (limit - 1) + "\\'x'", (TokenType.ERROR, too_long, 0, limit + 2)),
+        ("'" + "x" * limit + "\n'", (TokenType.ERROR, too_long, 0, limit + 1)),
+        ("'ab\ncd'", (TokenType.ERROR, "字符串不能跨行", 0, 3)),
+        ("'a\\\nb'", (TokenType.STRING, "a\\\nb", 0, 6)),
+        ('"a\\"b"', (TokenType.STRING, 'a\\"b', 0, 6)),
+        ("'abc\\", (TokenType.ERROR, "未闭合的字符串", 0, 5)),
+        ("{ 注释 'x' } // 注释 \"y\n'z'", (TokenType.STRING, "z", 20, 3)),
+        ("{ 未闭合的注释 'x'", (TokenType.EOF, "", 12, 0)),
+    ]
+    for source, expected in cases:
+        for engine in Lexer.ENGINES:
+            token = Lexer(source, engine=engine).tokenize()[0]
+            assert (token.type, token.value, token.offset, token.length) == expected, \
+                (engine, source[:20], token)
+
+
+def test_identifiers_are_interned():
+    """标识符登记到名字表（连续 ID），同名 Token 共享同一个字符串，关键字不登记"""
+    for engine in Lexer.ENGINES:
+        lexer = Lexer("x := y + x; BEGIN Begin total := x end", engine=engine)
+        tokens = lexer.tokenize()
+        assert lexer.names.names == ["x", "y", "total"]
+        assert [lexer.names.get(name) for name in ("x", "y", "total", "begin")] == [0, 1, 2, None]
+        xs = [t for t in tokens if t.value == "x"]
+        assert len(xs) == 3 and all(t.value is xs[0].value for t in xs)
+        assert [t.type for t in tokens[6:8]] == [TokenType.BEGIN, TokenType.BEGIN]
+        assert [t.value for t in tokens[6:8]] == ["BEGIN", "Begin"]
+
+
+def test_tokens_record_offsets():
+    """Token 记录偏移和长度，行列号由 LineIndex 计算"""
+    source = "program p;\r\nbegin\n  x := 'a b' + 12.5 { c\n } ; y\nend."
+    for engine in Lexer.ENGINES:
+        for token in Lexer(source, engine=engine).tokenize():
+            lexeme = source[token.offset:token.offset + token.length]
+            if token.type == TokenType.STRING:
+                assert lexeme == "'" + token.value + "'"
+            else:
+                assert lexeme == token.value, (engine, token)
+            line_start = source.rfind("\n", 0, token.offset) + 1
+            assert token.position == (source.count("\n", 0, token.offset) + 1,
+                                      token.offset - line_start + 1)
+
+
+def test_line_index():
+    """LineIndex 的行文本与 str.split('\\n') 一致"""
+    for source in ("", "a", "a\n", "\n\nb\r\nc", "x := 1;\n  y := 2\n"):
+        index = LineIndex(source)
+        lines = source.split("\n")
+        assert index.line_count() == len(lines)
+        assert [index.line_text(n) for n in range(1, len(lines) + 1)] == lines
+        assert index.line_text(0) == "" and index.line_text(len(lines) + 1) == ""
+        assert index.position(len(source)) == (len(lines), len(lines[-1]) + 1)
+
+
+def test_token_buffer_matches_tokens():
+    """TokenBuffer 按需创建的 Token 与 tokenize() 一致"""
+    for source in EDGE_CASES + ["x := x + 1; y := x; write('x')"]:
+        for engine in Lexer.ENGINES:
+            tokens = Lexer(source, engine=engine).tokenize()
+            buffer = Lexer(source, engine=engine).tokenize_buffer()
+            assert len(buffer) == len(tokens)
+            assert token_signature(buffer) == token_signature(tokens), (engine, source[:40])
+            assert [(t.offset, t.length) for t in buffer] == [(t.offset, t.length) for t in tokens]
+            assert [buffer.kind(i) for i in range(len(buffer))] == [t.type for t in tokens]
+            assert buffer.indices(TokenType.ERROR) == [
+                i for i, t in enumerate(tokens) if t.type == TokenType.ERROR]
+    buffer = Lexer("x := x + x").tokenize_buffer()
+    assert len(buffer.strings) == 4    # x、:=、+ 和 EOF 的空串各存一次
+    try:
+        buffer[len(buffer)]
+        assert False, "越界访问应抛出 IndexError"
+    except IndexError:
+        pass
+
+
+def test_token_file_round_trip():
+    """二进制 Token 文件保存后通过 mmap 加载，Token 流不变"""
+    from src.token_buffer import TokenBuffer
+    for source in EDGE_CASES + ["x := 'tab\there';\n\n  y := x", "字符串 := '中文'"]:
+        lexer = Lexer(source, engine="regex")
+        tokens = lexer.tokenize()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tokens.bin")
+            lexer.save_tokens_to_file(path)
+            assert TokenBuffer.is_token_file(path)
+            with TokenBuffer.load(path) as loaded:
+                assert token_signature(loaded) == token_signature(tokens), repr(source[:40])
+                assert [(t.offset, t.length) for t in loaded] == \
+                    [(t.offset, t.length) for t in tokens]
+            assert loaded.mapping is None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tokens.bin")
+        Lexer("x := 1").tokenize_buffer().save(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        for broken in (data[:10], b"XXXX" + data[4:], data[:4] + b"\x63\x00" + data[6:], data[:-3]):
+            with open(path, "wb") as f:
+                f.write(broken)
+            try:
+                TokenBuffer.load(path)
+                assert False, "损坏的 Token 文件应被拒绝"
+            except ValueError:
+                pass
+    # 类型编码或字符串下标越界
+    for column, value in (("kinds", 0), ("kinds", 250), ("values", 99)):
+        buffer = Lexer("x := 1").tokenize_buffer()
+        getattr(buffer, column)[1] = value
+        try:
+            TokenBuffer.from_bytes(buffer.to_bytes())
+            assert False, f"{column} 越界的 Token 文件应被拒绝"
+        except ValueError:
+            pass
+
+
+def test_apply_edit_matches_full_relex():
+    """增量编辑后的 Token 流（含偏移和行列号）与重新分析整个源代码相同"""
+    fragments = ["x", "1", "2.5", ".", ":", "=", "<", ">", "'", '"', "{", "}", "//",
+                 "\n", " ", "end", ";", "é", "\\"]
+    rng = random.Random(11)
+    for _ in range(300):
+        source = rng.choice(EDGE_CASES[:13] + ["program p;\nbegin\n  x := 1.5;\n  y := x\nend."])
+        for engine in Lexer.ENGINES:
+            lexer = Lexer(source, engine=engine)
+            lexer.tokenize()
+            for _ in range(4):
+                offset = rng.randint(0, len(lexer.source))
+                removed = rng.randint(0, min(8, len(lexer.source) - offset))
+                inserted = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 3)))
+                before = list(lexer.tokens)
+                start, old_end, new_end = lexer.apply_edit(offset, removed, inserted)
+                expected = Lexer(lexer.source, engine=engine).tokenize()
+                assert token_signature(lexer.tokens) == token_signature(expected)
+                assert [(t.offset, t.length) for t in lexer.tokens] == \
+                    [(t.offset, t.length) for t in expected]
+                # 替换区间之外的 Token 对象被原样复用
+                assert lexer.tokens[:start] == before[:start]
+                assert lexer.tokens[new_end:] == before[old_end:]
+    
+    lexer = Lexer("x := 1")
+    lexer.tokenize()
+    for edit in ((-1, 0, ""), (7, 0, "a"), (3, 5, ""), (0, -1, "")):
+        try:
+            lexer.apply_edit(*edit)
+            assert False, f"非法编辑 {edit} 应被拒绝"
+        except ValueError:
+            pass
+
+
+def lex_file(source: str, **kwargs):
+    """
+    把 source 原样写入临时文件，返回 (Lexer.from_path 的结果, 整串分析文件内容的结果)
+    读写都不转换换行符，'\r\n' 和 '\r' 保留在文件内容中。
+    """
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", newline="",
+                                     delete=False) as f:
+        f.write(source)
+    try:
+        with open(f.name, encoding="utf-8", newline="") as g:
+            content = g.read()
+        expected = token_signature(Lexer(content).tokenize()) if len(content) <= Lexer.MAX_SOURCE_LENGTH else None
+        return token_signature(Lexer.from_path(f.name, **kwargs).tokenize()), expected
+    finally:
+        os.unlink(f.name)
+
+
+def test_from_path_matches_in_memory_lexing():
+    """分块读取：跨块的词素、字符串和注释与整串分析结果一致"""
+    pieces = [
+        "x := 12.5;\n", "y:=x<>3;", "{ " + "块注释" * 300 + "\n }", "// " + "单行" * 400 + "\n",
+        "'" + "s" * 900 + "'", "'" + "未闭合", "é٣ ", "abc" * 100 + " ", "1" * 150, " @ ",
+    ]
+    rng = random.Random(7)
+    for _ in range(15):
+        source = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 40)))
+        for chunk_size in (1, 13, 512, 65536):
+            actual, expected = lex_file(source, chunk_size=chunk_size)
+            assert actual == expected, f"chunk_size={chunk_size}"
+    for source in EDGE_CASES + ["x := 1 { 未闭合的块注释", "x // 文件末尾的注释"]:
+        actual, expected = lex_file(source, chunk_size=3)
+        assert actual == expected, repr(source[:40])
+    
+    # CRLF 和单独的 CR 换行：偏移和行列号与整串分析相同（'\r' 不算换行）
+    crlf = "program p;\r\nvar x: integer;\r\nbegin\r\n  x := 'a';\r\n  x := @\r\nend.\r\n"
+    for source in (crlf, crlf.replace("\r\n", "\r")):
+        for chunk_size in (1, 2, 5, 65536):
+            actual, expected = lex_file(source, chunk_size=chunk_size)
+            assert actual == expected, f"chunk_size={chunk_size}"
+        assert actual == token_signature(Lexer(source).tokenize())
+
+
+def test_from_path_beyond_source_limit():
+    """超过 MAX_SOURCE_LENGTH 的文件可以分块分析"""
+    line = "x := x + 1; { 注释 } write('abc');\n"
+    lines = Lexer.MAX_SOURCE_LENGTH // len(line) + 10
+    tokens, _ = lex_file(line * lines)
+    assert len(tokens) == 11 * lines + 1
+    assert tokens[-2][1:] == (";", lines, 32)
+
+
+def test_feed_matches_whole_input():
+    """推送式分析：任意切分输入，feed()/close() 产生的 Token 与整串分析相同"""
+    pieces = [
+        "x := 12.5;\n", "y:=x<>3;", "a<=b", "{ 块注释\n }", "// 单行\n", "'字符串 s'",
+        "'未闭合", "\"a\\\"b\"", "é٣ ", "abc" * 30 + " ", "1" * 120, " @ ", "1.", "5 ",
+    ]
+    rng = random.Random(11)
+    sources = EDGE_CASES + ["".join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+                            for _ in range(40)]
+    for source in sources:
+        expected = Lexer(source, engine="regex").tokenize()
+        cuts = sorted(rng.sample(range(len(source) + 1), min(len(source) + 1, rng.randint(1, 12))))
+        lexer = Lexer("")
+        tokens = []
+        for start, end in zip([0] + cuts, cuts + [len(source)]):
+            tokens.extend(lexer.feed(source[start:end]))
+        tokens.extend(lexer.close())
+        assert token_signature(tokens) == token_signature(expected), repr(source[:40])
+        assert [(t.offset, t.length) for t in tokens] == [(t.offset, t.length) for t in expected]
+    
+    lexer = Lexer("")
+    assert [t.value for t in lexer.feed("x := 1; y")] == ["x", ":=", "1", ";"]
+    assert [t.value for t in lexer.feed("z :")] == ["yz"]
+    assert [t.value for t in lexer.feed("= 'a")] == [":="]
+    assert [(t.value, t.type) for t in lexer.close()] == [("未闭合的字符串", TokenType.ERROR),
+                                                         ("", TokenType.EOF)]
+    for misuse in (lambda: lexer.feed("x"), lexer.close, lexer.tokenize, Lexer("x").close):
+        try:
+            misuse()
+            assert False, "误用应抛出 ValueError"
+        except ValueError:
+            pass
+
+
+def test_dfa_spec_and_table_cache():
+    """DFA 由规则表编译，磁盘缓存与编译结果相同，损坏或过期的缓存被忽略"""
+    compiled = lexer_dfa.compile_spec()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dfa.bin")
+        assert lexer_dfa.read_tables(path) is None
+        lexer_dfa.save_tables(compiled, path)
+        loaded = lexer_dfa.read_tables(path)
+        assert (loaded.classes, loaded.table, loaded.accept) == \
+            (compiled.classes, compiled.table, compiled.accept)
+        assert lexer_dfa.read_tables(path, lexer_dfa.TOKEN_SPEC[1:]) is None
+        with open(path, "r+b") as f:
+            f.truncate(100)
+        assert lexer_dfa.read_tables(path) is None
+        assert os.listdir(tmp) == ["dfa.bin"]
+        
+        # 缓存目录与 DiskCache 共用，同样只允许当前用户访问
+        directory = os.path.join(tmp, "cache", "mini-parser")
+        lexer_dfa.save_tables(compiled, os.path.join(directory, "dfa.bin"))
+        if os.name == "posix":
+            assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    # 增加运算符只需修改规则表
+    spec = lexer_dfa.TOKEN_SPEC + ((lexer_dfa.OPERATOR, lexer_dfa.literal("**")),)
+    dfa = lexer_dfa.compile_spec(spec)
+    codes = dfa.encode("**")
+    state = dfa.start
+    for code in codes[:2]:
+        state = dfa.table[state + code]
+    assert dfa.accept[state] == lexer_dfa.OPERATOR
+    assert dfa.table[state + codes[2]] == 0    # 哨兵转到死状态
+
+
+def test_lex_files_in_parallel():
+    """进程池批量分析与逐个分析结果一致，错误按文件报告"""
+    from src.batch_lexer import lex_files
+    sources = EDGE_CASES + ["x := 'tab\there';\n\n  y := x", "x := 1 @ 2;\n  y := 'abc"]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index, source in enumerate(sources):
+            paths.append(os.path.join(tmp, f"{index}.mini"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(source)
+        missing = os.path.join(tmp, "missing.mini")
+        huge = os.path.join(tmp, "huge.mini")
+        with open(huge, "w", encoding="utf-8") as f:
+            f.write("x" * (Lexer.MAX_SOURCE_LENGTH + 1))
+        for workers, chunksize in ((1, 1), (2, 1), (3, 4)):
+            results = lex_files(paths + [huge, missing], workers=workers, chunksize=chunksize)
+            assert [result.path for result in results] == paths + [huge, missing]
+            for path, result in zip(paths, results):
+                with open(path, encoding="utf-8") as f:
+                    tokens = Lexer(f.read()).tokenize()
+                assert token_signature(result.tokens) == token_signature(tokens)
+                assert result.ok == all(t.type != TokenType.ERROR for t in tokens)
+            assert results[-1].tokens is None and "读取文件失败" in results[-1].errors[0]
+            # 超长的源文件可以读取，报告为无法分析而不是读取失败
+            assert results[-2].tokens is None and results[-2].errors[0].startswith("无法分析: 源代码过长")
+            assert results[-3].errors == [
+                "词法错误 [行1:列8]: 无法识别的字符 '@'",
+                "词法错误 [行2:列8]: 无法识别的字符 '未闭合的字符串'",
+            ], results[-3].errors
+    try:
+        lex_files([], workers=0)
+        assert False, "workers=0 应被拒绝"
+    except ValueError:
+        pass
+
+
+def run_all_tests():
+    """运行本文件中的全部测试"""
+    tests = [value for name, value in sorted(globals().items())
+             if name.startswith("test_") and callable(value)]
+    passed = 0
+    with temporary_dfa_cache():
+        for test in tests:
+            try:
+                test()
+                print(f"  通过: {test.__name__}")
+                passed += 1
+            except AssertionError as e:
+                print(f"  失败: {test.__name__} - {e}")
+    print(f"测试总结: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    run_all_tests()
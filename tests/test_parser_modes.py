@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+Mini 语言语法分析器 - 解析模式一致性测试
+各种解析模式必须与默认的列表模式产生相同的 AST 和错误信息
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import Lexer, ASTParser, parse_to_ast, parse_from_file, ast_to_dict
+from src import Block, IfStatement, WhileStatement, Assignment, BinaryOp, UnaryOp
+from tests.test_cases import TEST_CASES
+# setup_module/teardown_module：本文件的测试同样不读写用户缓存目录中的 DFA 表
+from tests.test_lexer import setup_module, teardown_module, temporary_dfa_cache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def corpus():
+    """测试语料：TEST_CASES 中的全部程序和 data/ 下的示例文件"""
+    sources = [case["code"] for cases in TEST_CASES.values() for case in cases]
+    for name in sorted(os.listdir(DATA_DIR)):
+        with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+            sources.append(f.read())
+    return sources
+
+
+def result_signature(result):
+    """parse_to_ast 结果的可比较表示"""
+    ast, errors, _ = result
+    return ast_to_dict(ast), errors
+
+
+def generate_program(statements: int) -> str:
+    """生成包含 statements 条语句的长程序"""
+    body = []
+    for i in range(statements):
+        if i % 3 == 0:
+            body.append(f"    x := (x + {i}) * 2")
+        elif i % 3 == 1:
+            body.append(f"    if ((x > {i}) and (y < x)) then y := y - 1 else y := y + 1")
+        else:
+            body.append("    while (x + 1) >= y do x := x - 1")
+    return ("program big;\nvar x, y: integer;\nbegin\n"
+            + ";\n".join(body) + "\nend.\n")
+
+
+def test_streaming_matches_list_mode():
+    """流式模式与列表模式结果相同（含语法、词法和语义错误）"""
+    for source in corpus():
+        for semantic in (True, False):
+            expected = result_signature(parse_to_ast(source, enable_semantic_check=semantic,
+                                                     use_cache=False))
+            actual = result_signature(parse_to_ast(source, enable_semantic_check=semantic,
+                                                   streaming=True, use_cache=False))
+            assert actual == expected, f"流式模式结果不一致: {source[:60]!r}"
+
+
+def test_streaming_buffer_is_bounded():
+    """流式模式的缓冲区峰值与程序长度无关"""
+    for statements in (100, 5000):
+        source = generate_program(statements)
+        parser = ASTParser(Lexer(source).iter_tokens(), source, lookahead=8)
+        assert parser.parse() is not None, parser.get_result()
+        # 只有括号条件的回溯片段会暂时超过前瞻窗口
+        assert parser.stream.max_buffered <= 32, parser.stream.max_buffered
+
+
+def test_token_buffer_matches_list_mode():
+    """TokenBuffer 模式与列表模式的语法分析结果相同"""
+    for source in corpus():
+        expected = ASTParser(Lexer(source).tokenize(), source)
+        actual = ASTParser(Lexer(source, engine="regex").tokenize_buffer(), source)
+        assert ast_to_dict(actual.parse()) == ast_to_dict(expected.parse())
+        assert actual.errors == expected.errors, f"TokenBuffer 模式结果不一致: {source[:60]!r}"
+
+
+def test_parse_from_token_file():
+    """parse_from_file 读取二进制 Token 文件与直接解析 Token 列表的结果相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tokens.bin")
+        for source in corpus():
+            lexer = Lexer(source)
+            tokens = lexer.tokenize()
+            lexer.save_tokens_to_file(path)
+            parser = ASTParser(tokens)
+            parser.parse()
+            assert parse_from_file(path) == parser.get_result(), source[:60]
+        
+        # 旧版文本格式仍可读取
+        with open(path, "w", encoding="utf-8") as f:
+            for token in Lexer("program p; begin x := 1 end.").tokenize():
+                f.write(f"{token.type.name}\t{token.value}\t{token.line}\t{token.column}\n")
+        assert parse_from_file(path) == "该程序符合语法要求。"
+
+
+def test_symbol_ids():
+    """Variable/Assignment 等节点携带名字表 ID，符号表和解释器按 ID 查找"""
+    from src import Interpreter, Program, Block, VarDeclarations, VarDecl, Assignment, \
+        BinaryOp, Variable, Number, Token, TokenType
+    source = "program p; var a, b: integer; begin a := 1; b := a + 2; read(b) end."
+    for streaming in (False, True):
+        ast, errors, symbol_table = parse_to_ast(source, streaming=streaming, use_cache=False)
+        assert not errors, errors
+        names = symbol_table.names
+        decls = ast.var_declarations.declarations
+        first, second, read = ast.block.statements
+        assert [(d.name, d.symbol_id) for d in decls] == [("a", names.get("a")), ("b", names.get("b"))]
+        assert first.symbol_id == names.get("a") and second.symbol_id == names.get("b")
+        assert second.expression.left.symbol_id == names.get("a")
+        assert read.symbol_id == names.get("b")
+        assert symbol_table.lookup_id(names.get("b")) is symbol_table.lookup("b")
+    
+    # 手工构造、没有 symbol_id 的 AST 仍可执行
+    plus = Token(TokenType.PLUS, "+")
+    ast = Program(name="p", var_declarations=VarDeclarations(declarations=[VarDecl(name="a")]),
+                  block=Block(statements=[Assignment(variable="a", expression=Number(value=1)),
+                               Assignment(variable="b", expression=BinaryOp(
+                                   left=Variable(name="a"), op=plus, right=Number(value=2)))]))
+    assert Interpreter().interpret(ast) == {"a": 1, "b": 3}
+    
+    # 执行这样的 AST 不修改（可能在缓存中共享的）分析结果的名字表
+    _, _, symbol_table = parse_to_ast(source, use_cache=False)
+    size = len(symbol_table.names)
+    ast.block.statements.append(Assignment(variable="c", expression=Variable(name="b")))
+    assert Interpreter(symbol_table).interpret(ast) == {"a": 1, "b": 3, "c": 3}
+    assert len(symbol_table.names) == size and symbol_table.names.get("c") is None
+    
+    # 解析得到的 AST 在没有符号表或使用其他编译的符号表时按名字执行
+    parsed, _, _ = parse_to_ast(source.replace("; read(b)", ""), use_cache=False)
+    assert Interpreter().interpret(parsed) == {"a": 1, "b": 3}
+    _, _, other = parse_to_ast("program q; var x, b, a: integer; begin x := 7 end.", use_cache=False)
+    assert Interpreter(other).interpret(parsed) == {"a": 1, "b": 3}
+
+
+def test_reused_analyzer_matches_fresh_instances():
+    """reset() 复用的 Lexer/ASTParser/SemanticAnalyzer 与每次新建的结果相同，且不影响之前的结果"""
+    from src.parser_ast import Analyzer
+    reused = Analyzer()
+    kept = []
+    for source in corpus():
+        for semantic in (True, False):
+            for streaming in (False, True):
+                kept.append((source, semantic, streaming,
+                             reused.analyze(source, semantic, streaming)))
+    for source, semantic, streaming, result in kept:
+        expected = Analyzer().analyze(source, semantic, streaming)
+        assert result_signature(result) == result_signature(expected), source[:60]
+        if result[2] is not None:
+            assert result[2].names.names == expected[2].names.names
+    
+    lexer = Lexer("x := 1; BEGIN")
+    lexer.tokenize()
+    first_names = lexer.names
+    lexer.reset("y := 2; Begin")
+    assert [t.value for t in lexer.tokenize()] == ["y", ":=", "2", ";", "Begin", ""]
+    assert lexer.names.names == ["y"] and first_names.names == ["x"]
+    assert set(lexer.words) == {"BEGIN", "Begin", "y"}
+
+
+def test_iterative_parser_matches_recursive():
+    """显式栈的 IterativeASTParser 与 ASTParser 的 AST 和错误信息相同（三种 Token 输入）"""
+    from src import IterativeASTParser
+    for source in corpus():
+        inputs = (lambda: Lexer(source).tokenize(),
+                  lambda: Lexer(source).iter_tokens(),
+                  lambda: Lexer(source, engine="regex").tokenize_buffer())
+        for make_tokens in inputs:
+            expected = ASTParser(make_tokens(), source)
+            actual = IterativeASTParser(make_tokens(), source)
+            assert ast_to_dict(actual.parse()) == ast_to_dict(expected.parse()), source[:60]
+            assert actual.errors == expected.errors, f"错误信息不一致: {source[:60]!r}"
+
+
+def random_program(rng) -> str:
+    """按文法随机生成的程序，一部分再随机插入、删除或替换词素以覆盖错误恢复"""
+    def expression(depth):
+        choice = rng.random()
+        if depth > 3 or choice < 0.3:
+            return rng.choice(["a", "b", "1", "2.5", "true", "'s'", "-a"])
+        if choice < 0.5:
+            return f"({expression(depth + 1)})"
+        if choice < 0.6:
+            return f"-{expression(depth + 1)}"
+        return f"{expression(depth + 1)} {rng.choice('+-*/')} {expression(depth + 1)}"
+
+    def condition(depth):
+        choice = rng.random()
+        if depth > 2 or choice < 0.4:
+            relop = rng.choice(["<", "<=", ">", ">=", "=", "<>"])
+            return f"{expression(depth)} {relop} {expression(depth)}"
+        if choice < 0.55:
+            return f"({condition(depth + 1)})"
+        if choice < 0.7:
+            return f"not ({condition(depth + 1)})"
+        return f"{condition(depth + 1)} {rng.choice(['and', 'or'])} {condition(depth + 1)}"
+
+    def statement(depth):
+        choice = rng.random()
+        if depth > 3 or choice < 0.3:
+            return f"x := {expression(0)}"
+        if choice < 0.45:
+            tail = f" else {statement(depth + 1)}" if rng.random() < 0.5 else ""
+            return f"if {condition(0)} then {statement(depth + 1)}{tail}"
+        if choice < 0.55:
+            return f"while {condition(0)} do {statement(depth + 1)}"
+        if choice < 0.7:
+            body = " ; ".join(statement(depth + 1) for _ in range(rng.randint(0, 3)))
+            return f"begin {body}{rng.choice(['', ' ;'])} end"
+        return rng.choice(["", "read(x)", f"write({expression(0)})"])
+
+    statements = " ; ".join(statement(0) for _ in range(rng.randint(1, 4)))
+    words = f"program p; var a, b: integer; x: real; begin {statements} end.".split()
+    lexemes = ["a", "1", "(", ")", "+", "*", "<", "=", "and", "not", "begin", "end", ";",
+               "if", "then", "else", "while", "do", ":=", "write", ","]
+    for _ in range(rng.choice([0, 0, 1, 2])):
+        index = rng.randrange(len(words))
+        action = rng.random()
+        if action < 0.4:
+            words.insert(index, rng.choice(lexemes))
+        elif action < 0.7:
+            del words[index]
+        else:
+            words[index] = rng.choice(lexemes)
+    return " ".join(words)
+
+
+def test_iterative_parser_matches_recursive_on_generated_programs():
+    """差分测试：随机生成（含随机损坏）的程序上两种语法分析器的 AST 和错误信息相同"""
+    import random
+    from src import IterativeASTParser
+    rng = random.Random(16)
+    for _ in range(600):
+        source = random_program(rng)
+        expected = ASTParser(Lexer(source).tokenize(), source)
+        actual = IterativeASTParser(Lexer(source).tokenize(), source)
+        assert ast_to_dict(actual.parse()) == ast_to_dict(expected.parse()), source
+        assert actual.errors == expected.errors, source
+
+
+def test_iterative_parser_deep_nesting():
+    """嵌套数千层的程序不触发 RecursionError，超过 max_depth 时报告语法错误"""
+    from src import IterativeASTParser
+    depth = 3000
+    source = ("program deep; var x: integer; begin "
+              + "begin " * depth + "x := " + "(" * depth + "-1" + ")" * depth + " end" * depth
+              + "; " + "if x > 0 then " * depth + "while x > 0 do " * depth + "x := 1 end.")
+    parser = IterativeASTParser(Lexer(source).tokenize(), source)
+    ast = parser.parse()
+    assert ast is not None and parser.errors == [], parser.errors[:1]
+
+    # 逐层确认嵌套结构（ast_to_dict 等递归遍历无法处理这样的深度）
+    node = ast.block
+    for _ in range(depth):
+        node = node.statements[0]
+        assert isinstance(node, Block)
+    assert isinstance(node.statements[0].expression, UnaryOp)
+    node = ast.block.statements[1]
+    for _ in range(depth):
+        assert isinstance(node, IfStatement)
+        node = node.then_statement
+    for _ in range(depth):
+        assert isinstance(node, WhileStatement)
+        node = node.body
+    assert isinstance(node, Assignment)
+
+    parser = IterativeASTParser(Lexer(source).tokenize(), source, max_depth=1000)
+    assert parser.parse() is None
+    assert len(parser.errors) == 1
+    assert parser.errors[0].startswith("语法错误 [行1:") and "嵌套层次过深（超过 1000 层）" in parser.errors[0]
+
+
+def render(node) -> str:
+    """把表达式 AST 写成完全加括号的形式"""
+    if isinstance(node, BinaryOp):
+        return f"({render(node.left)} {node.op.value} {render(node.right)})"
+    if isinstance(node, UnaryOp):
+        return f"({node.op.value} {render(node.operand)})"
+    return str(getattr(node, "name", None) or int(node.value))
+
+
+def test_operator_precedence_and_errors():
+    """优先级爬升得到的 BinaryOp/UnaryOp 树和缺少操作数时的错误信息（两种解析器一致）"""
+    from src import IterativeASTParser
+    cases = [
+        ("x := a - b - c * d / e + -f", "(((a - b) - ((c * d) / e)) + (- f))"),
+        ("x := -(a + b) * -c", "((- (a + b)) * (- c))"),
+        ("if not a > b and c < d or e = f + 1 then x := 1",
+         "(((not (a > b)) and (c < d)) or (e = (f + 1)))"),
+        ("if a > 1 or b > 2 or (c > 3 and (d + 1) * 2 <> 4) then x := 1",
+         "(((a > 1) or (b > 2)) or ((c > 3) and (((d + 1) * 2) <> 4)))"),
+    ]
+    for statement, expected in cases:
+        source = f"program p; begin {statement} end."
+        for parser_class in (ASTParser, IterativeASTParser):
+            parser = parser_class(Lexer(source).tokenize(), source)
+            ast = parser.parse()
+            assert ast is not None, parser.errors
+            node = ast.block.statements[0]
+            node = node.expression if isinstance(node, Assignment) else node.condition
+            assert render(node) == expected, (parser_class.__name__, render(node))
+
+    errors = [
+        ("x := a + b *", ["运算符 '*'/'/' 后缺少因子", "运算符 '+'/'-' 后缺少项"]),
+        ("if a > 1 or b > 2 and then x := 1", ["'and' 运算符后缺少有效的条件表达式",
+                                               "'or' 运算符后缺少有效的条件表达式"]),
+        ("if a > then x := 1", ["关系运算符后缺少表达式"]),
+    ]
+    for statement, messages in errors:
+        source = f"program p; begin {statement} end."
+        for parser_class in (ASTParser, IterativeASTParser):
+            parser = parser_class(Lexer(source).tokenize(), source)
+            parser.parse()
+            found = [message for message in messages for error in parser.errors if message in error]
+            assert found == messages, (statement, parser.errors)
+            # 错误按发现的先后排列：内层的运算符先报告
+            order = [next(i for i, error in enumerate(parser.errors) if message in error)
+                     for message in messages]
+            assert order == sorted(order), parser.errors
+
+
+
+def test_parenthesized_backtracking_is_linear():
+    """嵌套括号的回溯解析按 (规则, 位置) 记忆化，消费的 Token 数与嵌套深度成线性"""
+    from src import IterativeASTParser
+
+    def chained(depth):
+        text = "a"
+        for _ in range(depth):
+            text = f"({text} + 1)"
+        return f"{text} > 0"
+
+    shapes = (chained, lambda depth: "(" * depth + "a + b" + ")" * depth + " > c",
+              lambda depth: "(a > b and " * depth + "c < d" + ")" * depth)
+    for parser_class in (ASTParser, IterativeASTParser):
+        class Counting(parser_class):
+            advances = 0
+
+            def advance(self):
+                Counting.advances += 1
+                super().advance()
+
+        for shape in shapes:
+            counts = []
+            for depth in (50, 100):
+                source = f"program p; begin if {shape(depth)} then x := 1 end."
+                Counting.advances = 0
+                parser = Counting(Lexer(source).tokenize(), source)
+                assert parser.parse() is not None, parser.errors[:1]
+                assert parser.memo == {} and parser.speculating == 0
+                counts.append(Counting.advances)
+            assert counts[1] < counts[0] * 2.5, (parser_class.__name__, shape(2), counts)
+
+
+
+def test_syntax_recognizer_matches_ast_parser():
+    """SyntaxRecognizer 不构建 AST，错误信息和 parse_from_source 的结果与构建 AST 时相同"""
+    from src import SyntaxRecognizer, parse_from_source
+    sources = corpus() + ["program p; var a, b: integer; a: real; begin a := 1 end.",
+                          "program p; var a: integer; begin a := (1 + end."]
+    for source in sources:
+        for make_tokens in (lambda: Lexer(source).tokenize(),
+                            lambda: Lexer(source, engine="regex").tokenize_buffer()):
+            expected = ASTParser(make_tokens(), source)
+            ast = expected.parse()
+            actual = SyntaxRecognizer(make_tokens(), source)
+            recognized = actual.parse()
+            assert recognized is (True if ast is not None else None), source[:60]
+            assert actual.errors == expected.errors, f"错误信息不一致: {source[:60]!r}"
+        
+        ast, errors, _ = parse_to_ast(source, enable_semantic_check=False, use_cache=False)
+        verdict = "\n".join(errors) if errors else "该程序符合语法要求。"
+        assert parse_from_source(source) == verdict, source[:60]
+    
+    assert "变量 'a' 重复声明" in parse_from_source(sources[-2])
+
+
+def test_ll1_tables_from_grammar():
+    """由文法计算的 FIRST/FOLLOW 集、悬空 else 冲突的处理，以及非 LL(1) 文法的检测"""
+    from src.ll1_grammar import Grammar, mini_grammar
+    from src.parser_ll1 import LL1Parser, load_tables
+    grammar = mini_grammar()
+    assert grammar.first["statement"] == {"IDENTIFIER", "IF", "WHILE", "BEGIN", "WRITE", "READ"}
+    assert "statement" in grammar.nullable and "expression" not in grammar.nullable
+    assert grammar.follow["statement"] == {"SEMICOLON", "END", "ELSE"}
+    assert grammar.follow["expression"] >= {"RPAREN", "LT", "NE", "AND", "OR", "THEN", "DO"}
+    assert [conflict[:2] for conflict in grammar.conflicts] == [("else_part", "ELSE")]
+    assert grammar.format_production(grammar.table["else_part"]["ELSE"]).startswith("else_part -> ELSE")
+
+    # docs/GRAMMAR.md 中 <comparison> 的两个候选式都以 "(" 开头
+    try:
+        Grammar.parse("comparison -> expr LT expr | LPAREN comparison RPAREN\n"
+                      "expr -> IDENTIFIER | LPAREN expr RPAREN")
+        assert False, "应检测出 LL(1) 冲突"
+    except ValueError as e:
+        assert "不是 LL(1)" in str(e)
+
+    # 语义动作在值栈上的效果与文法不一致
+    try:
+        load_tables(LL1Parser, Grammar.parse("program -> PROGRAM #none | DOT"))
+        assert False, "应检测出值栈不一致"
+    except ValueError as e:
+        assert "不一致" in str(e)
+
+
+def test_ll1_parser_matches_ast_parser():
+    """表驱动的 LL1Parser 与 ASTParser 接受相同的程序并生成相同的 AST（三种 Token 输入）"""
+    from src import LL1Parser
+    statements = [
+        "if (a) + 1 > 2 then x := 1", "if not (a) > b then x := 1", "if ((a + b)) > c then x := 1",
+        "if (not a > b) or ((c < d)) then x := 1 else begin ; x := 2;; end",
+        "x := a > b", "if a then x := 1", "if (a > b) + 1 > 2 then x := 1",
+        "if not not a > b then x := 1", "if (a > b) = c then x := 1", "x := -(a > b)",
+        "if a > b then else x := 1", "if a > b and c then x := 1", "if a > b > c then x := 1",
+    ]
+    sources = corpus() + [f"program p; begin {statement} end." for statement in statements]
+    for source in sources:
+        for make_tokens in (lambda: Lexer(source).tokenize(),
+                            lambda: Lexer(source).iter_tokens(),
+                            lambda: Lexer(source, engine="regex").tokenize_buffer()):
+            expected = ASTParser(make_tokens(), source)
+            actual = LL1Parser(make_tokens(), source)
+            assert ast_to_dict(actual.parse()) == ast_to_dict(expected.parse()), source[:60]
+            assert bool(actual.errors) == bool(expected.errors), (source[:60], actual.errors)
+
+
+def test_ll1_error_recovery():
+    """出错后跳到 FIRST ∪ FOLLOW 同步集继续分析，每条出错的语句各报告一次"""
+    from src import LL1Parser
+    source = ("program p;\nbegin\n  x := ;\n  if a > then y := 1;\n"
+              "  while do z := 2;\n  w := 3 +\nend.")
+    parser = LL1Parser(Lexer(source).tokenize(), source)
+    assert parser.parse() is None
+    assert [error.split("]")[0] for error in parser.errors] == [
+        "语法错误 [行3:列8", "语法错误 [行4:列10", "语法错误 [行5:列9", "语法错误 [行7:列1"]
+
+    # 深层嵌套不受 Python 递归深度限制
+    depth = 3000
+    source = ("program deep; var x: integer; begin " + "begin " * depth
+              + "x := " + "(" * depth + "-1" + ")" * depth + " end" * depth + " end.")
+    parser = LL1Parser(Lexer(source).tokenize(), source)
+    assert parser.parse() is not None and parser.errors == [], parser.errors[:1]
+
+
+def test_incremental_reparse_matches_full_parse():
+    """增量重新分析的结果与完整分析新源代码相同，未受影响的语句原样复用"""
+    from src import IncrementalParser, reparse
+    source = ("program p;\nvar x, y: integer;\nbegin\n  x := 1;\n"
+              "  if x > 0 then y := 2 else begin y := 3; x := 4 end;\n"
+              "  while x < 10 do x := x + 1;\n  write(x)\nend.")
+    lexer = Lexer(source)
+    parser = IncrementalParser(lexer.tokenize(), source)
+    ast = parser.parse()
+    spans = parser.spans
+    edits = [   # (编辑位置前的文本, 删除字符数, 插入文本)
+        ("y := 3", 6, "y := 30 + x"),      # else 分支中的一条语句
+        ("1;", 1, "\n\n  1"),              # 换行：之后的语句行号平移
+        ("x := 4", 0, "x := ; "),          # 语法错误：退回完整分析
+        ("x := ; ", 7, ""),
+    ]
+    for anchor, removed, inserted in edits:
+        old_statements = ast.block.statements if ast else []
+        ast, errors = reparse(lexer, ast, spans, lexer.source.index(anchor), removed, inserted)
+        source = lexer.source
+        expected = ASTParser(Lexer(source).tokenize(), source)
+        assert ast_to_dict(ast) == ast_to_dict(expected.parse()), source
+        assert bool(errors) == bool(expected.errors), errors
+        if not errors and old_statements:
+            reused = sum(new is old for new, old in zip(ast.block.statements, old_statements))
+            assert reused == len(old_statements) - 1, (reused, source)
+
+
+def test_iter_statements_streams_top_level_statements():
+    """iter_statements() 逐条产出与 parse() 相同的顶层语句，不必等到读完整个程序"""
+    from src.parser_iterative import IterativeASTParser
+    for source in corpus():
+        for parser_class in (ASTParser, IterativeASTParser):
+            expected = ASTParser(Lexer(source).tokenize(), source)
+            ast = expected.parse()
+            parser = parser_class(Lexer(source).iter_tokens(), source)
+            statements = [ast_to_dict(stmt) for stmt in parser.iter_statements()]
+            assert parser.errors == expected.errors, source[:60]
+            if ast is not None:
+                assert statements == [ast_to_dict(stmt) for stmt in ast.block.statements]
+                assert parser.header.name == ast.name and parser.header.block is None
+
+    # 第一条语句产出时只读入了它附近的 Token
+    source = "program p; var x: integer; begin " + "x := x + 1; " * 1000 + "write(x) end."
+    consumed = []
+    def counted(tokens):
+        for token in tokens:
+            consumed.append(token)
+            yield token
+    parser = ASTParser(counted(Lexer(source).iter_tokens()), source)
+    statements = parser.iter_statements()
+    first = next(statements)
+    assert isinstance(first, Assignment) and parser.header.var_declarations is not None
+    assert len(consumed) < 50, len(consumed)
+    assert sum(1 for _ in statements) == 1000 and parser.errors == []
+
+    # 出错后不再产出语句，但错误与 parse() 相同
+    source = "program p; begin x := 1; y := ; z := 2; w := end."
+    parser = ASTParser(Lexer(source).tokenize(), source)
+    assert [stmt.variable for stmt in parser.iter_statements()] == ["x"]
+    expected = ASTParser(Lexer(source).tokenize(), source)
+    assert expected.parse() is None and parser.errors == expected.errors and len(parser.errors) == 4
+
+
+def test_check_files_in_parallel():
+    """批量检查与逐个 parse_from_source 的结果一致；按输入顺序或完成顺序输出 JSON Lines"""
+    import json
+    import subprocess
+    from src import parse_from_source
+    from src.batch_check import check_files, expand_paths
+    from tests.test_result_cache import temporary_disk_cache
+    sources = corpus()[:40]
+    with tempfile.TemporaryDirectory() as tmp, temporary_disk_cache():
+        os.mkdir(os.path.join(tmp, "sub"))
+        paths = []
+        for index, source in enumerate(sources):
+            paths.append(os.path.join(tmp, "sub" if index % 2 else "", f"{index:02d}.mini"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(source)
+        with open(os.path.join(tmp, ".hidden.mini"), "w", encoding="utf-8") as f:
+            f.write("不是程序")
+        missing = os.path.join(tmp, "missing.mini")
+
+        assert expand_paths([tmp]) == sorted(paths)
+        assert expand_paths([os.path.join(tmp, "**", "*.mini"), paths[1], missing]) == \
+            sorted(paths) + [missing]
+
+        expected = {path: parse_from_source(source) for path, source in zip(paths, sources)}
+        for workers, chunksize, ordered in ((1, 1, True), (2, 1, True), (3, 4, False)):
+            results = list(check_files(paths + [missing], workers=workers, chunksize=chunksize,
+                                       ordered=ordered))
+            if ordered:
+                assert [result.path for result in results] == paths + [missing]
+            assert sorted(result.path for result in results) == sorted(paths + [missing])
+            for result in results:
+                if result.path == missing:
+                    assert result.status == "failed" and "读取文件失败" in result.errors[0]
+                    continue
+                report = expected[result.path]
+                assert result.ok == (report == "该程序符合语法要求。"), result.path
+                assert result.ok or "\n".join(result.errors) == report
+                assert json.loads(result.to_json())["errors"] == result.errors
+
+        # 命令行：每个文件一行 JSON，最后一行是汇总，有文件未通过时退出码为 1
+        main = os.path.join(os.path.dirname(DATA_DIR), "main.py")
+        # 子进程的磁盘缓存写在临时目录中
+        environment = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmp, ".cache"))
+        process = subprocess.run([sys.executable, main, "--batch", "--workers", "2", tmp],
+                                 capture_output=True, text=True, encoding="utf-8",
+                                 env=environment)
+        lines = [json.loads(line) for line in process.stdout.splitlines()]
+        summary = lines.pop()
+        assert [line["path"] for line in lines] == sorted(paths)
+        assert summary["files"] == len(paths) and summary["failed"] == 0
+        assert summary["ok"] == sum(line["status"] == "ok" for line in lines)
+        assert process.returncode == (0 if summary["error"] == 0 else 1)
+    try:
+        check_files([], workers=0)
+        assert False, "workers=0 应被拒绝"
+    except ValueError:
+        pass
+
+
+def test_check_files_cache_and_failures():
+    """--no-cache 对 spawn 启动的工作进程同样有效；超长源代码单独报告，不算读取失败"""
+    import glob
+    import subprocess
+    from src.batch_check import check_files
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = os.path.join(tmp, "sources")
+        os.mkdir(sources)
+        for index, source in enumerate(corpus()[:6]):
+            with open(os.path.join(sources, f"{index}.mini"), "w", encoding="utf-8") as f:
+                f.write(source)
+        root = os.path.dirname(DATA_DIR)
+        code = ("import multiprocessing, sys\n"
+                "multiprocessing.set_start_method('spawn')\n"
+                "import main\n"
+                "sys.argv = ['main.py', '--batch', '--workers', '2', '--chunksize', '1'] + sys.argv[1:]\n"
+                "main.main()\n")
+        for flags, expected in ((["--no-cache"], 0), ([], 6)):
+            cache_home = os.path.join(tmp, "cache" if flags else "cache-on")
+            environment = dict(os.environ, XDG_CACHE_HOME=cache_home)
+            process = subprocess.run([sys.executable, "-c", code, *flags, sources], cwd=root,
+                                     capture_output=True, text=True, encoding="utf-8",
+                                     env=environment)
+            assert process.stdout.count("\n") == 7, process.stderr[-500:]
+            written = glob.glob(os.path.join(cache_home, "**", "*.pkl"), recursive=True)
+            assert len(written) == expected, (flags, written)
+
+        huge = os.path.join(tmp, "huge.mini")
+        with open(huge, "w", encoding="utf-8") as f:
+            f.write("x" * (Lexer.MAX_SOURCE_LENGTH + 1))
+        result, = check_files([huge], workers=1)
+        assert result.status == "failed" and result.errors[0].startswith("无法分析: 源代码过长")
+
+
+def test_rule_dispatch_tables():
+    """statement() / factor() 按 Token 种类分派；子类覆盖的规则方法同样进入分派表"""
+    from src.lexer import TokenType
+    from src.parser_incremental import IncrementalParser
+    from src.parser_iterative import IterativeASTParser
+    for parser_class in (ASTParser, IncrementalParser, IterativeASTParser):
+        for kind, name in parser_class.STATEMENT_RULES.items():
+            assert parser_class.statement_rules[kind] is getattr(parser_class, name)
+        for kind, name in parser_class.FACTOR_RULES.items():
+            assert parser_class.factor_rules[kind] is getattr(parser_class, name)
+    assert IncrementalParser.statement_rules[TokenType.BEGIN] is IncrementalParser.block
+
+    class CountingParser(ASTParser):
+        whiles = 0
+
+        def while_stmt(self):
+            CountingParser.whiles += 1
+            return super().while_stmt()
+
+    source = "program p; var i: integer; begin while i < 3 do begin while i < 2 do i := i + 1 end end."
+    ast = CountingParser(Lexer(source).tokenize(), source).parse()
+    assert ast is not None and CountingParser.whiles == 2
+    assert ASTParser.statement_rules[TokenType.BEGIN] is ASTParser.block
+
+
+def run_all_tests():
+    """运行本文件中的全部测试"""
+    tests = [value for name, value in sorted(globals().items())
+             if name.startswith("test_") and callable(value)]
+    passed = 0
+    with temporary_dfa_cache():
+        for test in tests:
+            try:
+                test()
+                print(f"  通过: {test.__name__}")
+                passed += 1
+            except AssertionError as e:
+                print(f"  失败: {test.__name__} - {e}")
+    print(f"测试总结: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Mini 语言语法分析器 - 结果缓存测试
+验证 LRU 淘汰、命中计数，以及缓存结果与重新分析一致且可安全共享
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import LRUCache, DiskCache, parse_cache, disk_cache, parse_to_ast, parse_from_source
+from src import run_program, ast_to_dict
+from tests.test_parser_modes import corpus
+
+PROGRAM = """
+program demo;
+var x, y: integer; s: string;
+begin
+    x := 10;
+    y := x * 2;
+    s := 'done';
+    while x > 0 do x := x - 1
+end.
+"""
+
+
+@contextmanager
+def temporary_disk_cache():
+    """让 disk_cache 临时使用一个空的临时目录（不读写用户的缓存目录）"""
+    directory, max_bytes = disk_cache.directory, disk_cache.max_bytes
+    with tempfile.TemporaryDirectory() as temp:
+        try:
+            disk_cache.directory = temp
+            disk_cache.resize(DiskCache.DEFAULT_MAX_BYTES)
+            disk_cache.clear()
+            yield disk_cache
+        finally:
+            disk_cache.clear()
+            disk_cache.directory = directory
+            disk_cache.resize(max_bytes)
+            parse_cache.clear()
+
+
+def symbol_state(symbol_table):
+    """符号表中全部符号的可比较表示"""
+    scope = symbol_table.get_global_scope()
+    return sorted((name, symbol.symbol_type, symbol.line, symbol.column, symbol.initialized)
+                  for name, symbol in scope.symbols.items())
+
+
+def test_lru_eviction_and_counters():
+    """超出容量时淘汰最久未使用的项，get() 计入命中/未命中"""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # a 变为最近使用
+    cache.put("c", 3)               # 淘汰 b
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.info() == {"hits": 2, "misses": 1, "size": 2, "maxsize": 2}
+    cache.resize(1)
+    assert len(cache) == 1 and cache.get("c") == 3
+    cache.resize(0)
+    cache.put("d", 4)
+    assert len(cache) == 0
+    try:
+        LRUCache(maxsize=-1)
+        assert False, "负数容量应被拒绝"
+    except ValueError:
+        pass
+
+
+def test_cached_results_match_fresh_analysis():
+    """命中缓存的结果与不使用缓存时相同，只分析一次"""
+    parse_cache.clear()
+    sources = corpus()
+    for source in sources:
+        for semantic in (True, False):
+            expected = parse_to_ast(source, enable_semantic_check=semantic, use_cache=False)
+            first = parse_to_ast(source, enable_semantic_check=semantic)
+            second = parse_to_ast(source, enable_semantic_check=semantic)
+            assert second[0] is first[0] and second[2] is first[2]
+            assert ast_to_dict(second[0]) == ast_to_dict(expected[0])
+            assert second[1] == expected[1]
+    distinct = len({(source, semantic) for source in sources for semantic in (True, False)})
+    info = parse_cache.info()
+    assert info["misses"] == distinct, info
+    assert info["hits"] == 2 * len(sources) * 2 - distinct, info
+
+
+def test_cache_bound():
+    """缓存项数不超过 maxsize"""
+    parse_cache.clear()
+    maxsize = parse_cache.maxsize
+    try:
+        parse_cache.resize(3)
+        for i in range(10):
+            parse_to_ast(f"program p{i}; begin x := {i} end.")
+        assert len(parse_cache) == 3
+        parse_to_ast("program p9; begin x := 9 end.")
+        assert parse_cache.info()["hits"] == 1
+    finally:
+        parse_cache.resize(maxsize)
+        parse_cache.clear()
+
+
+def test_cached_results_are_not_mutated():
+    """执行程序不修改缓存的 AST 和符号表，重复执行结果相同"""
+    with temporary_disk_cache():
+        ast, errors, symbol_table = parse_to_ast(PROGRAM)
+        assert not errors, errors
+        tree, symbols = ast_to_dict(ast), symbol_state(symbol_table)
+
+        state, output = run_program(PROGRAM)
+        state["x"] = 42                  # 调用者修改返回的变量表
+        errors.append("调用者修改返回的错误列表")
+        again, output_again = run_program(PROGRAM)
+
+        assert again == {"x": 0, "y": 20, "s": "done"}, again
+        assert output_again == output
+        assert ast_to_dict(ast) == tree and symbol_state(symbol_table) == symbols
+        assert parse_to_ast(PROGRAM)[1] == []
+        assert parse_cache.info()["hits"] == 3
+
+
+def test_disk_cache_atomic_writes_and_eviction():
+    """磁盘缓存：读写往返、损坏文件视为未命中、按修改时间淘汰、容量为 0 时关闭"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCache(os.path.join(directory, "results"), max_bytes=10000)
+        assert cache.get("a") is None
+        cache.put("a", ("ast", ["error"], None))
+        assert cache.get("a") == ("ast", ["error"], None)
+        assert not [name for name in os.listdir(cache.directory) if name.endswith(".tmp")]
+
+        with open(cache.path("a"), "wb") as f:
+            f.write(b"not a pickle")
+        assert cache.get("a") is None and not os.path.exists(cache.path("a"))
+
+        # 每项约 1 KB，超过 3 KB 时淘汰修改时间最早的项
+        cache.resize(3000)
+        for index, key in enumerate("bcd"):
+            cache.put(key, "x" * 900)
+            os.utime(cache.path(key), (index, index))
+        cache.put("e", "x" * 900)
+        assert cache.get("b") is None
+        assert all(cache.get(key) is not None for key in "cde")
+        assert cache.info()["size"] == 3 and cache.info()["bytes"] <= 3000
+
+        cache.resize(0)
+        cache.put("f", 1)
+        assert cache.get("c") is None and not os.path.exists(cache.path("f"))
+        cache.clear()
+        assert os.listdir(cache.directory) == []
+        try:
+            DiskCache(directory, max_bytes=-1)
+            assert False, "负数容量应被拒绝"
+        except ValueError:
+            pass
+
+
+def test_disk_cache_results_match_fresh_analysis():
+    """从磁盘缓存读出的结果（另一个进程写入时同理）与重新分析相同"""
+    with temporary_disk_cache():
+        sources = corpus()
+        for source in sources:
+            expected = parse_to_ast(source, use_cache=False)
+            for _ in range(2):
+                parse_cache.clear()   # 模拟新的进程
+                ast, errors, symbol_table = parse_to_ast(source, use_disk_cache=True)
+                assert ast_to_dict(ast) == ast_to_dict(expected[0]) and errors == expected[1]
+                if symbol_table is not None:
+                    assert symbol_state(symbol_table) == symbol_state(expected[2])
+                assert (parse_from_source(source, use_disk_cache=True)
+                        == parse_from_source(source))
+        info = disk_cache.info()
+        assert info["misses"] == info["size"] == len(set(sources)) * 2, info
+        assert info["hits"] == len(sources) * 4 - info["misses"], info
+
+
+def test_disk_cache_is_opt_in():
+    """库函数默认不读写磁盘缓存，run_program 默认使用"""
+    with temporary_disk_cache():
+        source = "program opt_in; var x: integer; begin x := 1 end."
+        parse_to_ast(source)
+        parse_to_ast(source, enable_semantic_check=False, use_cache=False)
+        parse_from_source(source)
+        assert disk_cache.info()["size"] == 0
+        parse_cache.clear()
+        run_program(source)
+        assert disk_cache.info()["size"] == 1
+        parse_cache.clear()
+        run_program(source, use_cache=False)
+        assert disk_cache.info()["size"] == 1 and disk_cache.info()["hits"] == 0
+
+
+def test_disk_cache_directory_permissions():
+    """缓存目录以 0o700 创建；其他用户可写的目录或符号链接不被信任"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCache(os.path.join(directory, "results"))
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        if os.name != "posix":
+            return
+        assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+        shared = os.path.join(directory, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        cache = DiskCache(shared)
+        cache.put("a", 1)
+        assert os.listdir(shared) == [] and cache.get("a") is None
+
+        link = os.path.join(directory, "link")
+        os.symlink(os.path.join(directory, "results"), link)
+        cache = DiskCache(link)
+        assert cache.get("a") is None
+        cache.put("b", 2)
+        assert not os.path.exists(cache.path("b"))
+
+
+def run_all_tests():
+    """运行本文件中的全部测试"""
+    tests = [value for name, value in sorted(globals().items())
+             if name.startswith("test_") and callable(value)]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  通过: {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  失败: {test.__name__} - {e}")
+    print(f"测试总结: {passed}/{len(tests)} 通过")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    run_all_tests()